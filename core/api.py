@@ -0,0 +1,240 @@
+import orjson
+
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse
+
+from .models import Campaign, Component, ComponentActivity, ComponentFeature, Requirement, Software, Standard
+from .pagination import decode_cursor, encode_cursor
+
+
+# Nesting allowed in ?include=, e.g. component_features.campaigns.component_features.
+MAX_INCLUDE_DEPTH = 3
+
+
+class ApiError(ValueError):
+    pass
+
+
+class Resource:
+    # An API type: its model, the fields serialized by default (foreign keys
+    # as ids) and the relations ?include= can embed, mapped to their type.
+    def __init__(self, name, model, fields, relations):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.relations = relations
+
+    def field(self, name):
+        return self.model._meta.get_field(name)
+
+
+RESOURCES = {resource.name: resource for resource in [
+    Resource('software', Software, ['name', 'description', 'creation_datetime', 'modification_datetime'], {
+        'components': 'components',
+    }),
+    Resource('components', Component, [
+        'name', 'description', 'git_repo_url', 'software', 'engineering_contact', 'business_contact', 'psrd_contact',
+        'jira_ticket_url', 'dev_preview_date', 'tech_preview_date', 'general_availability_date',
+        'creation_datetime', 'modification_datetime',
+    ], {
+        'software': 'software',
+        'component_features': 'component-features',
+        'component_activities': 'component-activities',
+        'standards': 'standards',
+    }),
+    Resource('component-features', ComponentFeature, [
+        'component', 'feature', 'description', 'priority', 'status', 'jira_ticket_url',
+        'creation_datetime', 'modification_datetime',
+    ], {
+        'component': 'components',
+        'campaigns': 'campaigns',
+    }),
+    Resource('component-activities', ComponentActivity, [
+        'component', 'activity', 'status', 'component_version', 'estimated_completion_date', 'execution_start_date',
+        'execution_end_date', 'notes', 'creation_datetime', 'modification_datetime',
+    ], {
+        'component': 'components',
+        'campaigns': 'campaigns',
+    }),
+    Resource('campaigns', Campaign, [
+        'name', 'description', 'status', 'due_date', 'jira_ticket_url', 'creation_datetime', 'modification_datetime',
+    ], {
+        'component_features': 'component-features',
+        'component_activities': 'component-activities',
+    }),
+    Resource('standards', Standard, ['name', 'code', 'description', 'creation_datetime', 'modification_datetime'], {
+        'requirements': 'requirements',
+        'components': 'components',
+    }),
+    Resource('requirements', Requirement, [
+        'standard', 'code', 'name', 'definition', 'creation_datetime', 'modification_datetime',
+    ], {
+        'standard': 'standards',
+    }),
+]}
+
+RESOURCES_BY_MODEL = {resource.model: resource for resource in RESOURCES.values()}
+
+
+def split(value):
+    return [item for item in value.split(',') if item]
+
+
+def parse_fieldsets(resource, params):
+    # ?fields=a,b for the requested type and ?fields[type]=a,b for any type.
+    fieldsets = {}
+    for key, value in params.items():
+        if key == 'fields':
+            name = resource.name
+        elif key.startswith('fields[') and key.endswith(']'):
+            name = key[len('fields['):-1]
+            if name not in RESOURCES:
+                raise ApiError(f'unknown type {name!r} in {key}')
+        else:
+            continue
+        fields = split(value)
+        unknown = [field for field in fields if field not in RESOURCES[name].fields]
+        if unknown:
+            raise ApiError(f'unknown {name} fields: {", ".join(unknown)}')
+        fieldsets[name] = fields
+    return fieldsets
+
+
+def parse_includes(resource, value):
+    # "a.b,a.c,d" as the tree {'a': {'b': {}, 'c': {}}, 'd': {}}.
+    tree = {}
+    for path in split(value):
+        names = path.split('.')
+        if len(names) > MAX_INCLUDE_DEPTH:
+            raise ApiError(f'{path!r} is nested more than {MAX_INCLUDE_DEPTH} levels')
+        node, current = tree, resource
+        for name in names:
+            if name not in current.relations:
+                raise ApiError(f'unknown {current.name} relation {name!r}')
+            node = node.setdefault(name, {})
+            current = RESOURCES[current.relations[name]]
+    return tree
+
+
+class ApiQuery:
+    # The parsed ?fields= and ?include= of a request, turned into a queryset
+    # that loads the whole response with one query per included relation.
+    def __init__(self, resource, params):
+        self.resource = resource
+        self.fieldsets = parse_fieldsets(resource, params)
+        self.includes = parse_includes(resource, params.get('include', ''))
+
+    def keys(self, resource, tree):
+        fields = self.fieldsets.get(resource.name, resource.fields)
+        return fields + [name for name in tree if name not in fields]
+
+    def columns(self, resource, tree, prefix=''):
+        # Arguments of only(): the serialized fields and the foreign keys
+        # prefetching follows, plus those of the select_related relations.
+        columns = [prefix + resource.model._meta.pk.name]
+        for name in self.keys(resource, tree):
+            field = resource.field(name)
+            if field.concrete and not field.many_to_many:
+                columns.append(prefix + name)
+            if name in tree and field.many_to_one and not tree[name]:
+                columns += self.columns(RESOURCES[resource.relations[name]], {}, f'{prefix}{name}__')
+        return columns
+
+    def queryset(self, resource=None, tree=None, columns=()):
+        resource = resource or self.resource
+        tree = self.includes if tree is None else tree
+        queryset = resource.model._default_manager.only(*self.columns(resource, tree), *columns)
+        for name, subtree in tree.items():
+            field = resource.field(name)
+            child = RESOURCES[resource.relations[name]]
+            if field.many_to_one and not subtree:
+                queryset = queryset.select_related(name)
+                continue
+            # Rows of a reverse foreign key are matched on their own column.
+            extra = [field.field.name] if field.one_to_many else []
+            queryset = queryset.prefetch_related(Prefetch(name, queryset=self.queryset(child, subtree, extra)))
+        return queryset
+
+    def validator_sources(self, rows):
+        # Every row the response reads, for ConditionalGetMixin: the given
+        # rows and, relation by relation, the rows they include and the links
+        # to those.
+        sources = [rows]
+        pending = [(self.resource, self.includes, rows)]
+        while pending:
+            resource, tree, parents = pending.pop()
+            for name, subtree in tree.items():
+                field = resource.field(name)
+                child = RESOURCES[resource.relations[name]]
+                children = child.model._default_manager.filter(pk__in=parents.values(name))
+                sources.append(children)
+                if field.many_to_many:
+                    if field.concrete:
+                        through, source = field.remote_field.through, field.m2m_field_name()
+                    else:
+                        through, source = field.through, field.field.m2m_reverse_field_name()
+                    sources.append(through._default_manager.filter(**{f'{source}__in': parents}))
+                pending.append((child, subtree, children))
+        return sources
+
+    def serializer(self, resource=None, tree=None):
+        # A function turning an object into a dict, with the attribute
+        # lookups resolved once instead of per object.
+        resource = resource or self.resource
+        tree = self.includes if tree is None else tree
+        plain = []
+        nested = []
+        for name in self.keys(resource, tree):
+            field = resource.field(name)
+            if name in tree:
+                nested.append((name, field.many_to_one, self.serializer(RESOURCES[resource.relations[name]], tree[name])))
+            else:
+                plain.append((name, field.attname))
+
+        def serialize(obj):
+            data = {'id': obj.pk}
+            for name, attname in plain:
+                data[name] = getattr(obj, attname)
+            for name, single, child in nested:
+                if single:
+                    related = getattr(obj, name)
+                    data[name] = related and child(related)
+                else:
+                    data[name] = [child(related) for related in getattr(obj, name).all()]
+            return data
+        return serialize
+
+    def page_queryset(self, params, default_size, max_size):
+        # Rows in primary key order after the ?after= cursor, and the page
+        # size.
+        try:
+            size = int(params.get('limit', default_size))
+        except ValueError:
+            raise ApiError('limit must be a number')
+        if not 1 <= size <= max_size:
+            raise ApiError(f'limit must be between 1 and {max_size}')
+        queryset = self.queryset().order_by('pk')
+        if params.get('after'):
+            try:
+                after, = decode_cursor(params['after'], 1)
+            except Http404:
+                raise ApiError('invalid cursor')
+            if not isinstance(after, int) or isinstance(after, bool):
+                raise ApiError('invalid cursor')
+            queryset = queryset.filter(pk__gt=after)
+        return queryset, size
+
+    def page(self, params, path, default_size, max_size):
+        # The rows of the page and the URL of the next one.
+        queryset, size = self.page_queryset(params, default_size, max_size)
+        rows = list(queryset[:size + 1])
+        next_url = None
+        if len(rows) > size:
+            rows = rows[:size]
+            query = params.copy()
+            query['after'] = encode_cursor([rows[-1].pk])
+            next_url = f'{path}?{query.urlencode()}'
+        return rows, next_url
+
+def json_response(data, status=200):
+    return HttpResponse(orjson.dumps(data), content_type='application/json', status=status)
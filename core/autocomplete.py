@@ -0,0 +1,89 @@
+import functools
+import operator
+
+from django import forms
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .models import Contact, Requirement, Software
+
+
+AUTOCOMPLETE_LIMIT = 20
+# The trigram indexes only serve terms of at least one trigram; shorter ones
+# would scan the whole table.
+MIN_TERM_LENGTH = 3
+
+
+class AutocompleteSource:
+    # The fields matched against the typed term, each with a trigram index on
+    # UPPER(field), and the query parameters allowed to narrow the results.
+    def __init__(self, fields, filters=(), select_related=()):
+        self.fields = fields
+        self.filters = filters
+        self.select_related = select_related
+
+
+SOURCES = {
+    Software: AutocompleteSource(['name']),
+    Contact: AutocompleteSource(['name', 'email'], filters=['type']),
+    Requirement: AutocompleteSource(['code', 'name', 'definition'], select_related=['standard']),
+}
+
+
+def autocomplete(model, term, params=None):
+    # The objects with a field containing ``term``, closest matches first.
+    source = SOURCES[model]
+    term = term.strip()
+    if len(term) < MIN_TERM_LENGTH:
+        return []
+    queryset = model._default_manager.filter(
+        functools.reduce(operator.or_, [Q(**{f'{field}__icontains': term}) for field in source.fields]),
+        **{name: value for name, value in (params or {}).items() if name in source.filters},
+    )
+    similarities = [TrigramWordSimilarity(term, field) for field in source.fields]
+    queryset = queryset.annotate(similarity=Greatest(*similarities) if len(similarities) > 1 else similarities[0])
+    return list(queryset.select_related(*source.select_related).order_by('-similarity', 'pk')[:AUTOCOMPLETE_LIMIT])
+
+
+class AutocompleteMixin:
+    # Select widgets that render only their selected options, with the URL
+    # of the matching autocomplete view for autocomplete.js to load the rest.
+    def __init__(self, url_name, params=None, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+        self.params = params or {}
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        url = reverse(self.url_name)
+        if self.params:
+            url += '?' + urlencode(self.params)
+        attrs['data-autocomplete-url'] = url
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = [item for item in value if item]
+        options = []
+        if not self.allow_multiple_selected and field.empty_label is not None:
+            options.append(self.create_option(name, '', field.empty_label, not selected, 0))
+        try:
+            objects = list(field.queryset.filter(pk__in=selected)) if selected else []
+        except (ValueError, ValidationError):
+            # Submitted values that are not primary keys; the field reports them.
+            objects = []
+        for obj in objects:
+            options.append(self.create_option(name, field.prepare_value(obj), field.label_from_instance(obj), True, len(options)))
+        return [(None, options, 0)]
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
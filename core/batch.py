@@ -0,0 +1,286 @@
+import functools
+import hmac
+import operator
+
+import orjson
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .api import ApiError
+from .compliance import refresh_compliance
+from .fragments import invalidate, invalidate_rows
+from .models import Campaign, ComponentActivity, ComponentActivityCampaign, ComponentFeature, ComponentFeatureCampaign, Link
+from .portfolio_import import KEEP, RowError, choice, date, text, url
+
+
+BATCH_SIZE = 1000
+MAX_OPERATIONS = 10000
+
+OPERATIONS = ('update', 'add_link', 'remove_link', 'add_campaign', 'remove_campaign')
+LINK_KINDS = [kind for kind, _ in Link.KIND_CHOICES]
+
+
+class Target:
+    # A type of row the batch API writes to: the fields "update" may set with
+    # their parsers, and the name of its foreign key on Link and on its
+    # campaign through model.
+    def __init__(self, name, model, fields, through, field):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.through = through
+        self.field = field
+
+
+TARGETS = {target.name: target for target in [
+    Target('component-activities', ComponentActivity, {
+        'status': choice(ComponentActivity.STATUS_CHOICES),
+        'estimated_completion_date': date,
+        'execution_start_date': date,
+        'execution_end_date': date,
+    }, ComponentActivityCampaign, 'component_activity'),
+    Target('component-features', ComponentFeature, {
+        'status': choice(ComponentFeature.STATUS_CHOICES),
+    }, ComponentFeatureCampaign, 'component_feature'),
+]}
+
+
+def authenticate(header):
+    # "Authorization: Bearer <token>" with one of settings.API_TOKENS.
+    scheme, _, token = header.partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return False
+    return any(hmac.compare_digest(token.encode(), allowed.encode()) for allowed in settings.API_TOKENS)
+
+
+def integer(value, name):
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise RowError(f'{name} must be an integer')
+    return value
+
+
+class Batch:
+    # Write operations on component activities and features, each an object
+    # with an "op" of OPERATIONS, the "type" and "id" of its row and:
+    #   update: "values", e.g. {"status": "Done", "execution_end_date": "2025-06-30"}, null clearing a date
+    #   add_link, remove_link: "kind" (jira_ticket, result or document), "url" and, to add, "name"
+    #   add_campaign, remove_campaign: "campaign", an id or a name
+    # Rows and campaigns are loaded with one query per type, then every
+    # operation is applied with bulk statements, all in one transaction.
+    # Nothing is written when any operation has an error. results holds one entry
+    # per operation, in order.
+    def __init__(self, operations):
+        if not isinstance(operations, list) or not operations:
+            raise ApiError('"operations" must be a non-empty list')
+        if len(operations) > MAX_OPERATIONS:
+            raise ApiError(f'at most {MAX_OPERATIONS} operations are allowed per batch')
+        self.operations = operations
+        self.results = [{'ok': True} for _ in operations]
+
+    @classmethod
+    def from_json(cls, body):
+        try:
+            document = orjson.loads(body)
+        except orjson.JSONDecodeError as error:
+            raise ApiError(f'invalid JSON: {error}')
+        if not isinstance(document, dict) or 'operations' not in document:
+            raise ApiError('expected an object with "operations"')
+        return cls(document['operations'])
+
+    @property
+    def errors(self):
+        return sum(not result['ok'] for result in self.results)
+
+    def error(self, index, message):
+        self.results[index] = {'ok': False, 'error': message}
+
+    def parse(self, operation):
+        if not isinstance(operation, dict):
+            raise RowError('expected an object')
+        op = operation.get('op')
+        if op not in OPERATIONS:
+            raise RowError(f'unknown op {op!r}, expected one of {", ".join(OPERATIONS)}')
+        type_ = operation.get('type')
+        target = TARGETS.get(type_) if isinstance(type_, str) else None
+        if target is None:
+            raise RowError(f'unknown type {operation.get("type")!r}, expected one of {", ".join(TARGETS)}')
+        parsed = {'op': op, 'target': target, 'id': integer(operation.get('id'), 'id')}
+        if op == 'update':
+            values = operation.get('values')
+            if not isinstance(values, dict) or not values:
+                raise RowError('values must be a non-empty object')
+            unknown = sorted(set(values) - set(target.fields))
+            if unknown:
+                raise RowError(f'{", ".join(unknown)} cannot be updated, expected {", ".join(target.fields)}')
+            parsed['values'] = {}
+            for name, value in values.items():
+                # An explicit null clears the field; a blank status is ignored.
+                if value is None:
+                    if not target.model._meta.get_field(name).null:
+                        raise RowError(f'{name} cannot be cleared')
+                else:
+                    value = target.fields[name](value)
+                    if value is KEEP:
+                        continue
+                parsed['values'][name] = value
+            if not parsed['values']:
+                raise RowError('values must set at least one field, empty values are ignored')
+        elif op in ('add_link', 'remove_link'):
+            if operation.get('kind') not in LINK_KINDS:
+                raise RowError(f'kind must be one of {", ".join(LINK_KINDS)}')
+            parsed['kind'] = operation['kind']
+            parsed['url'] = url(operation.get('url') or '')
+            if not parsed['url']:
+                raise RowError('url is required')
+            if op == 'add_link':
+                parsed['name'] = text(operation.get('name') or '')
+                if not parsed['name']:
+                    raise RowError('name is required')
+                if len(parsed['name']) > Link._meta.get_field('name').max_length:
+                    raise RowError('name is too long')
+        else:
+            campaign = operation.get('campaign')
+            if isinstance(campaign, str):
+                campaign = campaign.strip()
+            elif not isinstance(campaign, int) or isinstance(campaign, bool):
+                campaign = None
+            if not campaign:
+                raise RowError('campaign must be an id or a name')
+            parsed['campaign'] = campaign
+        return parsed
+
+    def run(self):
+        # Applies the batch, unless an operation has an error. Returns whether
+        # it was applied.
+        parsed = []
+        for index, operation in enumerate(self.operations):
+            try:
+                parsed.append((index, self.parse(operation)))
+            except RowError as error:
+                self.error(index, str(error))
+
+        with transaction.atomic():
+            if not self.apply(parsed):
+                transaction.set_rollback(True)
+                return False
+        return True
+
+    def apply(self, parsed):
+        # The rows are locked as they are loaded, so the values written by
+        # update() are the ones of the rows as they are being changed.
+        ids = {}
+        for _, operation in parsed:
+            ids.setdefault(operation['target'], set()).add(operation['id'])
+        rows = {target: target.model.objects.select_for_update(of=('self',)).order_by().in_bulk(pks) for target, pks in ids.items()}
+        references = {operation['campaign'] for _, operation in parsed if 'campaign' in operation}
+        campaigns = {}
+        if references:
+            for campaign in Campaign.objects.filter(
+                Q(pk__in=[ref for ref in references if isinstance(ref, int)])
+                | Q(name__in=[ref for ref in references if isinstance(ref, str)])
+            ):
+                campaigns[campaign.pk] = campaigns[campaign.name] = campaign
+
+        resolved = []
+        for index, operation in parsed:
+            operation['row'] = rows[operation['target']].get(operation['id'])
+            if operation['row'] is None:
+                self.error(index, f'{operation["target"].name} {operation["id"]} not found')
+                continue
+            if 'campaign' in operation:
+                operation['campaign'] = campaigns.get(operation['campaign'])
+                if operation['campaign'] is None:
+                    self.error(index, f'unknown campaign {self.operations[index]["campaign"]!r}')
+                    continue
+            resolved.append((index, operation))
+        if self.errors:
+            return False
+
+        self.update([(index, operation) for index, operation in resolved if operation['op'] == 'update'])
+        self.add_links([(index, operation) for index, operation in resolved if operation['op'] == 'add_link'])
+        self.remove_links([(index, operation) for index, operation in resolved if operation['op'] == 'remove_link'])
+        for target in TARGETS.values():
+            self.change_campaigns(target, [
+                (index, operation) for index, operation in resolved
+                if operation['op'] in ('add_campaign', 'remove_campaign') and operation['target'] is target
+            ])
+        # Bulk statements skip the signals, so the compliance and the
+        # cached pages are refreshed here, once for the whole batch.
+        touched = {target: {operation['id'] for _, operation in resolved if operation['target'] is target} for target in TARGETS.values()}
+        activities = [operation['row'] for _, operation in resolved if operation['op'] == 'update' and operation['target'].model is ComponentActivity]
+        if activities:
+            refresh_compliance(component_ids={activity.component_id for activity in activities})
+        invalidate_rows(touched[TARGETS['component-features']], touched[TARGETS['component-activities']])
+        # Campaigns the rows just left are no longer found by invalidate_rows().
+        invalidate('campaign', [operation['campaign'].pk for _, operation in resolved if operation['op'] == 'remove_campaign'])
+        return True
+
+    def update(self, operations):
+        now = timezone.now()
+        changed = {}
+        for index, operation in operations:
+            row = operation['row']
+            for name, value in operation['values'].items():
+                setattr(row, name, value)
+            # bulk_update() skips auto_now, which the conditional GETs rely on.
+            row.modification_datetime = now
+            rows, fields = changed.setdefault(operation['target'], ({}, {'modification_datetime'}))
+            rows[row.pk] = row
+            fields.update(operation['values'])
+        for target, (rows, fields) in changed.items():
+            target.model.objects.bulk_update(rows.values(), sorted(fields), batch_size=BATCH_SIZE)
+
+    def add_links(self, operations):
+        links = [
+            Link(kind=operation['kind'], name=operation['name'], url=operation['url'], **{f'{operation["target"].field}_id': operation['id']})
+            for _, operation in operations
+        ]
+        Link.objects.bulk_create(links, batch_size=BATCH_SIZE)
+        for (index, _), link in zip(operations, links):
+            self.results[index]['id'] = link.pk
+
+    def remove_links(self, operations):
+        if not operations:
+            return
+        keys = {(operation['target'].field, operation['id'], operation['kind'], operation['url']) for _, operation in operations}
+        links = Link.objects.filter(functools.reduce(operator.or_, [
+            Q(**{f'{field}_id': pk}, kind=kind, url=link_url) for field, pk, kind, link_url in keys
+        ]))
+        removed = {}
+        for pk, activity_id, feature_id, kind, link_url in links.values_list('pk', 'component_activity_id', 'component_feature_id', 'kind', 'url'):
+            key = ('component_activity', activity_id, kind, link_url) if activity_id else ('component_feature', feature_id, kind, link_url)
+            removed.setdefault(key, []).append(pk)
+        Link.objects.filter(pk__in=[pk for pks in removed.values() for pk in pks]).delete()
+        for index, operation in operations:
+            self.results[index]['removed'] = len(removed.get((operation['target'].field, operation['id'], operation['kind'], operation['url']), []))
+
+    def change_campaigns(self, target, operations):
+        if not operations:
+            return
+        field = f'{target.field}_id'
+        pairs = {(operation['id'], operation['campaign'].pk) for _, operation in operations}
+        current = set(target.through.objects.filter(
+            **{f'{field}__in': {pk for pk, _ in pairs}}, campaign__in={campaign_pk for _, campaign_pk in pairs},
+        ).values_list(field, 'campaign_id'))
+        # Operations on the same pair apply in order; only the end state is written.
+        final = set(current)
+        for index, operation in operations:
+            pair = (operation['id'], operation['campaign'].pk)
+            if operation['op'] == 'add_campaign':
+                self.results[index]['changed'] = pair not in final
+                final.add(pair)
+            else:
+                self.results[index]['changed'] = pair in final
+                final.discard(pair)
+        target.through.objects.bulk_create(
+            [target.through(**{field: pk}, campaign_id=campaign_pk) for pk, campaign_pk in final - current],
+            batch_size=BATCH_SIZE,
+        )
+        removed = current - final
+        if removed:
+            target.through.objects.filter(functools.reduce(operator.or_, [
+                Q(**{field: pk}, campaign_id=campaign_pk) for pk, campaign_pk in removed
+            ])).delete()
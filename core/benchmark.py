@@ -0,0 +1,225 @@
+import datetime
+import math
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.views.generic.edit import CreateView
+
+from . import urls as core_urls
+from .middleware import QueryRecorder
+from .models import Campaign, Component, Software, Standard
+
+
+# seed_portfolio options of each benchmark portfolio size.
+SIZES = {
+    'small': {'software': 2, 'components': 5, 'features': 50, 'activities': 10, 'campaigns': 3, 'standards': 2, 'requirements': 20, 'contacts': 10},
+    'medium': {'software': 10, 'components': 20, 'features': 200, 'activities': 30, 'campaigns': 10, 'standards': 5, 'requirements': 100, 'contacts': 50},
+    'large': {'software': 20, 'components': 50, 'features': 500, 'activities': 60, 'campaigns': 20, 'standards': 8, 'requirements': 400, 'contacts': 200},
+}
+
+# Models of the URL arguments that do not name the view's own model.
+URL_ARGUMENT_MODELS = {
+    'software_pk': Software,
+    'component_pk': Component,
+    'standard_pk': Standard,
+}
+
+
+def pick(model):
+    # Benchmark the heaviest pages: the component and campaign with the most
+    # rows, anything else by primary key.
+    if model is Component:
+        return Component.objects.annotate(
+            size=Count('component_features', distinct=True) + Count('component_activities', distinct=True),
+        ).order_by('-size', 'pk').first()
+    if model is Campaign:
+        return Campaign.objects.annotate(
+            size=Count('component_features', distinct=True) + Count('component_activities', distinct=True),
+        ).order_by('-size', 'pk').first()
+    return model.objects.order_by('pk').first()
+
+
+def create_source(model, kwargs):
+    # An existing row for a create view to re-create, under the parent the
+    # URL names if any.
+    queryset = model.objects.order_by('pk')
+    for argument, pk in kwargs.items():
+        parent = URL_ARGUMENT_MODELS[argument]
+        field = next(field for field in model._meta.concrete_fields if field.is_relation and field.related_model is parent)
+        queryset = queryset.filter(**{field.name: pk})
+    return queryset.first()
+
+
+def update_url(obj):
+    for pattern in core_urls.urlpatterns:
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if pattern.name.endswith('_update') and getattr(view_class, 'model', None) is type(obj):
+            return reverse(pattern.name, kwargs={'pk': obj.pk})
+
+
+def benchmark_targets():
+    # (label, url, method, source) for every named URL of core.urls that can
+    # be resolved against the current data. Update views are also POSTed with
+    # their own current values, create views with the values of an existing
+    # row, their source; delete views are only rendered.
+    targets = []
+    for pattern in core_urls.urlpatterns:
+        view_class = getattr(pattern.callback, 'view_class', None)
+        kwargs = {}
+        for argument in pattern.pattern.converters:
+            model = URL_ARGUMENT_MODELS.get(argument) or pattern.callback.view_initkwargs.get('model') or view_class.model
+            obj = pick(model)
+            if obj is None:
+                break
+            kwargs[argument] = obj.pk
+        else:
+            url = reverse(pattern.name, kwargs=kwargs)
+            targets.append((f'{pattern.name} GET', url, 'get', None))
+            if pattern.name.endswith('_update'):
+                targets.append((f'{pattern.name} POST', url, 'post', None))
+            elif view_class is not None and issubclass(view_class, CreateView):
+                source = create_source(view_class.model, kwargs)
+                if source is not None:
+                    targets.append((f'{pattern.name} POST', url, 'post', source))
+    return targets
+
+
+@contextmanager
+def rolled_back(source):
+    # A create runs in a transaction rolled back afterwards, with the row it
+    # re-creates deleted first so that it passes the unique checks.
+    with transaction.atomic():
+        type(source)._default_manager.filter(pk=source.pk).delete()
+        yield
+        transaction.set_rollback(True)
+
+
+def form_data(context):
+    # The data a browser would submit for the unchanged forms and formsets of
+    # a rendered edit page.
+    data = {}
+    forms = [context['form']]
+    for key in context.keys():
+        value = context[key]
+        if hasattr(value, 'management_form'):
+            forms.append(value.management_form)
+            forms.extend(value.forms)
+    for form in forms:
+        for bound_field in form:
+            value = bound_field.value()
+            if value is None or value is False:
+                continue
+            if not isinstance(value, str) and hasattr(value, '__iter__'):
+                data[bound_field.html_name] = [str(item) for item in value]
+            elif isinstance(value, (datetime.date, datetime.datetime)):
+                data[bound_field.html_name] = value.isoformat()
+            else:
+                data[bound_field.html_name] = str(value)
+    return data
+
+
+def accepted_values(form, values):
+    # The values the form's fields accept, e.g. without the finished
+    # campaigns a row can no longer be added to.
+    def accepts(field, value):
+        try:
+            field.clean(value)
+        except ValidationError:
+            return False
+        return True
+
+    accepted = {}
+    for bound_field in form:
+        value = values.get(bound_field.html_name)
+        if isinstance(value, list):
+            accepted[bound_field.html_name] = [item for item in value if accepts(bound_field.field, [item])]
+        elif value is not None and accepts(bound_field.field, value):
+            accepted[bound_field.html_name] = value
+    return accepted
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, math.ceil(fraction * len(samples)) - 1)]
+
+
+def measure(client, url, method, repeat, source=None):
+    data = None
+    if method == 'post':
+        context = client.get(url).context
+        data = form_data(context)
+        if source is not None:
+            # The empty create form filled in with the values of its source.
+            values = form_data({'form': client.get(update_url(source)).context['form']})
+            data.update(accepted_values(context['form'], values))
+
+    def request(around=nullcontext):
+        # Only the request itself runs inside around(), not the set up and
+        # roll back of creates.
+        with rolled_back(source) if source is not None else nullcontext():
+            with around():
+                response = client.post(url, data) if method == 'post' else client.get(url)
+                # Streaming responses only run their queries while being read.
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+        return response
+
+    @contextmanager
+    def traced():
+        nonlocal peak_memory
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    @contextmanager
+    def timed():
+        start = time.perf_counter()
+        yield
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # The first request warms up caches and connections and counts queries,
+    # the second counts them again with warm caches; the timed ones run
+    # without tracemalloc, which would skew latencies.
+    cache.clear()
+    queries = QueryRecorder()
+    response = request(lambda: connection.execute_wrapper(queries))
+    warm_queries = QueryRecorder()
+    request(lambda: connection.execute_wrapper(warm_queries))
+    peak_memory = 0
+    request(traced)
+    timings = []
+    for _ in range(repeat):
+        request(timed)
+    return {
+        'url': url,
+        'method': method.upper(),
+        'status': response.status_code,
+        'queries': queries.count,
+        'warm_queries': warm_queries.count,
+        'db_ms': round(queries.duration * 1000, 3),
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'peak_memory_kb': round(peak_memory / 1024, 1),
+    }
+
+
+def run_benchmark(repeat=10, only=None):
+    client = Client(raise_request_exception=False)
+    results = {}
+    for label, url, method, source in benchmark_targets():
+        if only and not any(name in label for name in only):
+            continue
+        results[label] = measure(client, url, method, repeat, source)
+    return results
@@ -0,0 +1,131 @@
+import functools
+import operator
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Count, F, Q
+
+from .models import ComponentActivity, ComponentStandard, Requirement
+
+
+STATUS_LABELS = dict(ComponentActivity.STATUS_CHOICES)
+
+
+def aggregate_status(statuses):
+    # Roll the statuses of the component activities covering a requirement up
+    # into a single one: Done only when every activity is done, To Do only when
+    # none has started, In Progress otherwise. None means not covered at all.
+    statuses = set(statuses)
+    if not statuses:
+        return None
+    if statuses == {ComponentActivity.DONE}:
+        return ComponentActivity.DONE
+    if statuses == {ComponentActivity.TO_DO}:
+        return ComponentActivity.TO_DO
+    return ComponentActivity.IN_PROGRESS
+
+
+def statement_of_applicability(component, standard):
+    # One row per requirement of the standard, in the requirement ordering,
+    # with the component activities covering it and their aggregated status.
+    # The activities of every requirement come from a single join over
+    # Requirement -> ActivityRequirement -> ComponentActivity.
+    component_activities = (
+        ComponentActivity.objects
+        .filter(component=component, activity__requirements__standard=standard)
+        .select_related('activity')
+        .annotate(requirement_id=F('activity__requirements'))
+        .order_by('activity__name')
+    )
+    by_requirement = {}
+    for component_activity in component_activities:
+        by_requirement.setdefault(component_activity.requirement_id, []).append(component_activity)
+
+    rows = []
+    for requirement in Requirement.objects.filter(standard=standard):
+        covering = by_requirement.get(requirement.pk, [])
+        status = aggregate_status(ca.status for ca in covering)
+        rows.append({
+            'requirement': requirement,
+            'component_activities': covering,
+            'status': status,
+            'status_display': STATUS_LABELS.get(status, ''),
+        })
+    return rows
+
+
+# Filters of the refreshes requested inside batched_refresh(), per thread.
+_batch = threading.local()
+
+
+@contextmanager
+def batched_refresh():
+    # Runs the refreshes requested by the signals of a multi-statement write,
+    # e.g. a form saving a row and setting its many-to-many fields, once on
+    # exit instead of once per statement.
+    if getattr(_batch, 'filters', None) is not None:
+        yield
+        return
+    _batch.filters = []
+    try:
+        yield
+        filters = _batch.filters
+    finally:
+        _batch.filters = None
+    if filters:
+        refresh_links(functools.reduce(operator.or_, filters) if all(filters) else Q())
+
+
+def refresh_compliance(component_ids=None, standard_ids=None, requirement_ids=None):
+    # Recompute the materialized compliance of the ComponentStandard links of
+    # the given components and/or standards, or of the standards of the given
+    # requirements (all links when none is given).
+    links = Q()
+    if component_ids is not None:
+        links &= Q(component_id__in=component_ids)
+    if standard_ids is not None:
+        links &= Q(standard_id__in=standard_ids)
+    if requirement_ids is not None:
+        links &= Q(standard_id__in=Requirement.objects.filter(pk__in=requirement_ids).values('standard_id'))
+    if getattr(_batch, 'filters', None) is not None:
+        _batch.filters.append(links)
+        return 0
+    return refresh_links(links)
+
+
+def refresh_links(links):
+    # Two grouped queries and a bulk update.
+    links = list(ComponentStandard.objects.filter(links).order_by())
+    if not links:
+        return 0
+
+    component_ids = {link.component_id for link in links}
+    standard_ids = {link.standard_id for link in links}
+    requirement_counts = dict(
+        Requirement.objects
+        .filter(standard_id__in=standard_ids)
+        .order_by()
+        .values_list('standard_id')
+        .annotate(Count('pk'))
+    )
+    # A requirement is covered when the component has activities covering it
+    # and none of them is still open, the same rule as aggregate_status().
+    covered_counts = {}
+    for component_id, standard_id, _, open_count in (
+        ComponentActivity.objects
+        .filter(
+            component_id__in=component_ids,
+            activity__requirements__standard_id__in=standard_ids,
+        )
+        .order_by()
+        .values_list('component_id', 'activity__requirements__standard_id', 'activity__requirements')
+        .annotate(open_count=Count('pk', filter=~Q(status=ComponentActivity.DONE)))
+    ):
+        if not open_count:
+            key = (component_id, standard_id)
+            covered_counts[key] = covered_counts.get(key, 0) + 1
+    for link in links:
+        link.requirement_count = requirement_counts.get(link.standard_id, 0)
+        link.covered_requirement_count = covered_counts.get((link.component_id, link.standard_id), 0)
+    ComponentStandard.objects.bulk_update(links, ['requirement_count', 'covered_requirement_count'], batch_size=1000)
+    return len(links)
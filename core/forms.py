@@ -1,12 +1,23 @@
 from django import forms
-from django.forms import inlineformset_factory
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.forms import inlineformset_factory, modelformset_factory
+from django.utils import timezone
+from .autocomplete import AutocompleteSelect, AutocompleteSelectMultiple
+from .compliance import batched_refresh, refresh_compliance
+from .fragments import invalidate_rows
 from .models import Component, ComponentFeature, ComponentActivity, JiraTicket, Result, Document, Software, Requirement, ActivityRequirement, Campaign, Activity, Contact
 
 class ComponentForm(forms.ModelForm):
     class Meta:
         model = Component
         fields = ['name', 'description', 'git_repo_url', 'software', 'engineering_contact', 'business_contact', 'psrd_contact', 'jira_ticket_url', 'dev_preview_date', 'tech_preview_date', 'general_availability_date']
+        # Software and contacts are loaded on demand instead of listed in full.
         widgets = {
+            'software': AutocompleteSelect('autocomplete_software'),
+            'engineering_contact': AutocompleteSelect('autocomplete_contacts', {'type': Contact.ENGINEERING}),
+            'business_contact': AutocompleteSelect('autocomplete_contacts', {'type': Contact.BUSINESS}),
+            'psrd_contact': AutocompleteSelect('autocomplete_contacts', {'type': Contact.PSRD}),
             'dev_preview_date': forms.DateInput(attrs={'type': 'date'}),
             'tech_preview_date': forms.DateInput(attrs={'type': 'date'}),
             'general_availability_date': forms.DateInput(attrs={'type': 'date'}),
@@ -43,16 +54,14 @@ class ComponentFeatureForm(forms.ModelForm):
         if self.instance and self.instance.pk:
             self.initial['campaigns'] = self.instance.campaigns.values_list('pk', flat=True)
 
+    @transaction.atomic
     def save(self, commit=True):
         instance = super().save(commit=commit)
-        # Only save campaigns after we have a primary key (i.e. instance is saved)
+        # Only save campaigns after we have a primary key (i.e. instance is saved).
+        # set() only writes the difference: one DELETE for the campaigns no
+        # longer selected and one INSERT for the new ones.
         if commit and 'campaigns' in self.cleaned_data:
-            selected_campaigns = self.cleaned_data['campaigns']
-            # Remove all existing campaign links for this feature
-            instance.campaigns.clear()
-            # Add all selected campaigns
-            for campaign in selected_campaigns:
-                instance.campaigns.add(campaign)
+            instance.campaigns.set(self.cleaned_data['campaigns'])
         return instance
 
 
@@ -65,7 +74,7 @@ class ComponentActivityForm(forms.ModelForm):
     requirements = forms.ModelMultipleChoiceField(
         queryset=None,
         required=False,
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple('autocomplete_requirements'),
         label="Requirements",
     )
 
@@ -94,23 +103,20 @@ class ComponentActivityForm(forms.ModelForm):
         if self.instance and self.instance.pk:
             self.initial['campaigns'] = self.instance.campaigns.values_list('pk', flat=True)
 
+    @transaction.atomic
     def save(self, commit=True):
-        instance = super().save(commit=commit)
-        # Only save campaigns after instance saved
-        if commit and 'campaigns' in self.cleaned_data:
-            selected_campaigns = self.cleaned_data['campaigns']
-            instance.campaigns.clear()
-            for campaign in selected_campaigns:
-                instance.campaigns.add(campaign)
-        # Save requirements to the linked activity using ActivityRequirement
-        if commit and 'requirements' in self.cleaned_data:
-            activity = instance.activity
-            if activity:
-                # Remove current links
-                activity.requirements.clear()
-                # Add all selected requirements
-                for req in self.cleaned_data['requirements']:
-                    activity.requirements.add(req)
+        # The compliance is refreshed once for the row and both sets.
+        with batched_refresh():
+            instance = super().save(commit=commit)
+            # Only save campaigns after instance saved; set() only writes the
+            # difference with the current links.
+            if commit and 'campaigns' in self.cleaned_data:
+                instance.campaigns.set(self.cleaned_data['campaigns'])
+            # Save requirements to the linked activity using ActivityRequirement
+            if commit and 'requirements' in self.cleaned_data:
+                activity = instance.activity
+                if activity:
+                    activity.requirements.set(self.cleaned_data['requirements'])
         return instance
 
 class SoftwareForm(forms.ModelForm):
@@ -126,7 +132,7 @@ class ActivityForm(forms.ModelForm):
     requirements = forms.ModelMultipleChoiceField(
         queryset=None,
         required=False,
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple('autocomplete_requirements'),
         label="Requirements",
     )
 
@@ -140,44 +146,172 @@ class ActivityForm(forms.ModelForm):
         if self.instance and self.instance.pk:
             self.initial['requirements'] = self.instance.requirements.values_list('pk', flat=True)
 
+    @transaction.atomic
     def save(self, commit=True):
-        instance = super().save(commit=commit)
-        if commit and 'requirements' in self.cleaned_data:
-            instance.requirements.set(self.cleaned_data['requirements'])
+        with batched_refresh():
+            instance = super().save(commit=commit)
+            if commit and 'requirements' in self.cleaned_data:
+                instance.requirements.set(self.cleaned_data['requirements'])
         return instance
 
+class BaseLinkFormSet(forms.BaseInlineFormSet):
+    # The Jira tickets, results or documents of a component feature or
+    # activity. New links are written with one bulk INSERT instead of one
+    # save() each; bulk_create() skips Link.save() and the post_save signal,
+    # so the kind is set and the cached pages invalidated here.
+    def save_new_objects(self, commit=True):
+        if not commit:
+            return super().save_new_objects(commit)
+        self.saved_forms = []
+        objects = super().save_new_objects(commit=False)
+        if objects:
+            for obj in objects:
+                obj.kind = obj.link_kind
+            self.model.objects.bulk_create(objects)
+            invalidate_rows([objects[0].component_feature_id], [objects[0].component_activity_id])
+        return objects
+
+
 ComponentActivityJiraTicketFormSet = inlineformset_factory(
     ComponentActivity, JiraTicket,
-    fields=['name', 'url'],
+    fields=['name', 'url'], formset=BaseLinkFormSet,
     extra=1, can_delete=True
 )
 
 ComponentActivityResultFormSet = inlineformset_factory(
     ComponentActivity, Result,
-    fields=['name', 'url'],
+    fields=['name', 'url'], formset=BaseLinkFormSet,
     extra=1, can_delete=True
 )
 
 ComponentActivityDocumentFormSet = inlineformset_factory(
     ComponentActivity, Document,
-    fields=['name', 'url'],
+    fields=['name', 'url'], formset=BaseLinkFormSet,
     extra=1, can_delete=True
 )
 
 ComponentFeatureDocumentFormSet = inlineformset_factory(
     ComponentFeature, Document,
-    fields=['name', 'url'],
+    fields=['name', 'url'], formset=BaseLinkFormSet,
     extra=1, can_delete=True
 )
 
 ComponentFeatureJiraTicketFormSet = inlineformset_factory(
     ComponentFeature, JiraTicket,
-    fields=['name', 'url'],
+    fields=['name', 'url'], formset=BaseLinkFormSet,
     extra=1, can_delete=True
 )
 
 ComponentFeatureResultFormSet = inlineformset_factory(
     ComponentFeature, Result,
-    fields=['name', 'url'],
+    fields=['name', 'url'], formset=BaseLinkFormSet,
     extra=1, can_delete=True
 )
+
+class StatusGridForm(forms.ModelForm):
+    # A row of the status grid editor. The values the row was shown with are
+    # posted back with it, so a row is only written when the user changed it,
+    # and so is its modification time, so that a row changed by someone else
+    # since the grid was loaded is rejected instead of overwritten.
+    loaded = forms.CharField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in self._meta.fields:
+            self.fields[name].show_hidden_initial = True
+        if self.instance.pk:
+            self.initial['loaded'] = self.instance.modification_datetime.isoformat()
+
+    def has_changed(self):
+        return any(name != 'loaded' for name in self.changed_data)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.instance.pk and self.has_changed() and cleaned_data.get('loaded') != self.initial['loaded']:
+            raise ValidationError('Changed by someone else since the page was loaded, reload it to see the changes.', code='stale')
+        return cleaned_data
+
+
+class ComponentActivityStatusForm(StatusGridForm):
+    class Meta:
+        model = ComponentActivity
+        fields = ['status', 'execution_start_date', 'execution_end_date', 'estimated_completion_date']
+        widgets = {
+            'status': forms.Select(attrs={'class': 'form-select form-select-sm'}),
+            'execution_start_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm'}),
+            'execution_end_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm'}),
+            'estimated_completion_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm'}),
+        }
+
+
+class ComponentFeatureStatusForm(StatusGridForm):
+    class Meta:
+        model = ComponentFeature
+        fields = ['status']
+        widgets = {
+            'status': forms.Select(attrs={'class': 'form-select form-select-sm'}),
+        }
+
+
+class GridRowField(forms.ModelChoiceField):
+    # The hidden primary key of a grid row, looked up among the rows already
+    # loaded by the formset instead of with one query per row.
+    def __init__(self, rows, queryset, **kwargs):
+        super().__init__(queryset, **kwargs)
+        self.rows = rows
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.rows[str(value)]
+        except KeyError:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+
+
+class BaseStatusFormSet(forms.BaseModelFormSet):
+    # The rows of the status grid editor. Only the rows whose values changed
+    # are written, with bulk UPDATEs instead of one save() per row, so the
+    # compliance refresh and fragment invalidation done by the post_save
+    # signals happen here, once for all rows.
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        if not hasattr(self, '_rows'):
+            self._rows = {str(row.pk): row for row in self.get_queryset()}
+        name = self.model._meta.pk.name
+        field = form.fields[name]
+        form.fields[name] = GridRowField(self._rows, field.queryset, initial=field.initial, required=field.required, widget=field.widget)
+
+    def save(self, commit=True):
+        changed = [form.instance for form in self.initial_forms if form.has_changed()]
+        if not commit or not changed:
+            return changed
+        # bulk_update() skips auto_now, which the conditional GETs rely on.
+        now = timezone.now()
+        for instance in changed:
+            instance.modification_datetime = now
+        fields = [*self.form._meta.fields, 'modification_datetime']
+        with transaction.atomic():
+            self.model.objects.bulk_update(changed, fields, batch_size=500)
+            pks = [instance.pk for instance in changed]
+            if self.model is ComponentActivity:
+                refresh_compliance(component_ids={instance.component_id for instance in changed})
+                invalidate_rows(component_activity_ids=pks)
+            else:
+                invalidate_rows(component_feature_ids=pks)
+        return changed
+
+
+ComponentActivityStatusFormSet = modelformset_factory(
+    ComponentActivity, form=ComponentActivityStatusForm, formset=BaseStatusFormSet,
+    extra=0, edit_only=True
+)
+
+ComponentFeatureStatusFormSet = modelformset_factory(
+    ComponentFeature, form=ComponentFeatureStatusForm, formset=BaseStatusFormSet,
+    extra=0, edit_only=True
+)
+
+class PortfolioImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV file with a header row, JSON array or JSON Lines file.")
+    dry_run = forms.BooleanField(required=False, initial=True, help_text="Only report the changes.")
@@ -0,0 +1,84 @@
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+from .models import ComponentActivity, ComponentActivityCampaign, ComponentFeature, ComponentFeatureCampaign
+
+
+# Cached template fragments of a component or campaign page are keyed on a
+# per-object version token. Invalidating the object replaces the token, so
+# every fragment rendered before is ignored and expires on its own. A missing
+# token (evicted or never set) simply starts a new version.
+
+def version_key(kind, pk):
+    return f'fragment-version:{kind}:{pk}'
+
+
+def fragment_version(kind, pk):
+    key = version_key(kind, pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+# Version keys to delete once the current transaction commits, per thread.
+_pending = threading.local()
+
+
+def invalidate(kind, pks):
+    # Collected and deleted together after the commit: deleting them inside
+    # the transaction would let a concurrent request cache the old rows under
+    # the new version. Outside a transaction, on_commit() runs at once.
+    keys = {version_key(kind, pk) for pk in pks if pk is not None}
+    if keys:
+        _pending.__dict__.setdefault('keys', set()).update(keys)
+        transaction.on_commit(flush_invalidations)
+
+
+def flush_invalidations():
+    # Every callback registered by the transaction runs at commit; the first
+    # one deletes all the keys. Keys left over by a rolled back transaction
+    # are deleted with the next commit, which only costs a re-render.
+    keys = _pending.__dict__.pop('keys', None)
+    if keys:
+        cache.delete_many(sorted(keys))
+
+
+def invalidate_rows(component_feature_ids=(), component_activity_ids=()):
+    # Component features and activities are shown on their component page and
+    # on the page of every campaign they belong to.
+    component_feature_ids = [pk for pk in component_feature_ids if pk is not None]
+    component_activity_ids = [pk for pk in component_activity_ids if pk is not None]
+    component_ids = set()
+    campaign_ids = set()
+    if component_feature_ids:
+        component_ids.update(ComponentFeature.objects.filter(pk__in=component_feature_ids).values_list('component_id', flat=True))
+        campaign_ids.update(ComponentFeatureCampaign.objects.filter(component_feature_id__in=component_feature_ids).values_list('campaign_id', flat=True))
+    if component_activity_ids:
+        component_ids.update(ComponentActivity.objects.filter(pk__in=component_activity_ids).values_list('component_id', flat=True))
+        campaign_ids.update(ComponentActivityCampaign.objects.filter(component_activity_id__in=component_activity_ids).values_list('campaign_id', flat=True))
+    invalidate('component', component_ids)
+    invalidate('campaign', campaign_ids)
+
+
+def invalidate_components(component_ids):
+    # Component, software and contact details are shown on the component page
+    # and on the campaign pages listing its features and activities.
+    component_ids = list(component_ids)
+    invalidate('component', component_ids)
+    invalidate('campaign', ComponentFeatureCampaign.objects.filter(component_feature__component_id__in=component_ids).values_list('campaign_id', flat=True))
+    invalidate('campaign', ComponentActivityCampaign.objects.filter(component_activity__component_id__in=component_ids).values_list('campaign_id', flat=True))
+
+
+def lazy_rows(queryset):
+    # Evaluated only when a template fragment misses the cache.
+    return SimpleLazyObject(lambda: list(queryset))
+
+
+def lazy_status_rows(rows, *statuses):
+    return SimpleLazyObject(lambda: [row for row in rows if row.status in statuses])
@@ -0,0 +1,219 @@
+import orjson
+
+from django.db.models import F
+
+from .api import RESOURCES, ApiError
+from .models import Contact, Document, JiraTicket, Result
+
+
+# Levels of "include" below the queried type.
+MAX_DEPTH = 5
+
+LINK_FIELDS = ['name', 'url', 'component_feature', 'component_activity', 'creation_datetime', 'modification_datetime']
+
+
+class One:
+    # A foreign key of the parent: its column holds the key of one row.
+    def __init__(self, type):
+        self.type = type
+        self.lookup = 'pk'
+
+
+class Many:
+    # The rows whose ``lookup`` leads back to the parent.
+    def __init__(self, type, lookup):
+        self.type = type
+        self.lookup = lookup
+
+
+class QueryType:
+    def __init__(self, model, fields, relations=None):
+        self.model = model
+        self.fields = fields
+        self.relations = relations or {}
+
+
+def api_type(name, relations):
+    return QueryType(RESOURCES[name].model, RESOURCES[name].fields, relations)
+
+
+def links(lookup):
+    return {
+        'jira_tickets': Many('jira-tickets', lookup),
+        'results': Many('results', lookup),
+        'documents': Many('documents', lookup),
+    }
+
+
+# The types of the REST API, plus contacts and links.
+QUERY_TYPES = {
+    'software': api_type('software', {
+        'components': Many('components', 'software'),
+    }),
+    'components': api_type('components', {
+        'software': One('software'),
+        'engineering_contact': One('contacts'),
+        'business_contact': One('contacts'),
+        'psrd_contact': One('contacts'),
+        'component_features': Many('component-features', 'component'),
+        'component_activities': Many('component-activities', 'component'),
+        'standards': Many('standards', 'components'),
+    }),
+    'component-features': api_type('component-features', {
+        'component': One('components'),
+        'campaigns': Many('campaigns', 'component_features'),
+        **links('component_feature'),
+    }),
+    'component-activities': api_type('component-activities', {
+        'component': One('components'),
+        'campaigns': Many('campaigns', 'component_activities'),
+        **links('component_activity'),
+    }),
+    'campaigns': api_type('campaigns', {
+        'component_features': Many('component-features', 'campaigns'),
+        'component_activities': Many('component-activities', 'campaigns'),
+    }),
+    'standards': api_type('standards', {
+        'requirements': Many('requirements', 'standard'),
+        'components': Many('components', 'standards'),
+    }),
+    'requirements': api_type('requirements', {
+        'standard': One('standards'),
+    }),
+    'contacts': QueryType(Contact, ['name', 'email', 'type', 'creation_datetime', 'modification_datetime']),
+    'jira-tickets': QueryType(JiraTicket, LINK_FIELDS),
+    'results': QueryType(Result, LINK_FIELDS),
+    'documents': QueryType(Document, LINK_FIELDS),
+}
+
+
+class DataLoader:
+    # Rows of a type by the value of ``lookup``. Keys are collected with
+    # load() and fetched together by dispatch() with a single IN query; keys
+    # fetched earlier in the request are not fetched again.
+    def __init__(self, model, lookup, columns):
+        self.model = model
+        self.lookup = lookup
+        self.columns = columns
+        self.pending = set()
+        self.rows = {}
+
+    def load(self, key):
+        if key is not None and key not in self.rows:
+            self.pending.add(key)
+
+    def dispatch(self):
+        if not self.pending:
+            return
+        keys, self.pending = self.pending, set()
+        for key in keys:
+            self.rows[key] = []
+        queryset = self.model._default_manager.filter(**{f'{self.lookup}__in': keys})
+        for row in queryset.values(*self.columns, loader_key=F(self.lookup)):
+            self.rows[row.pop('loader_key')].append(row)
+
+    def get(self, key):
+        return self.rows.get(key, [])
+
+
+class Node:
+    # One level of the query document: a type, its fields and includes.
+    def __init__(self, type_name, spec, depth=0, extra_keys=()):
+        if not isinstance(spec, dict):
+            raise ApiError(f'{type_name} query must be an object')
+        unknown = set(spec) - {'fields', 'include', *extra_keys}
+        if unknown:
+            raise ApiError(f'unknown keys in {type_name} query: {", ".join(sorted(unknown))}')
+        self.type_name = type_name
+        self.type = QUERY_TYPES[type_name]
+        fields = spec.get('fields', self.type.fields)
+        if not isinstance(fields, list) or not all(field in self.type.fields for field in fields):
+            raise ApiError(f'fields of {type_name} must be a list of {", ".join(self.type.fields)}')
+        include = spec.get('include', {})
+        if not isinstance(include, dict):
+            raise ApiError(f'include of {type_name} must be an object')
+        if include and depth >= MAX_DEPTH:
+            raise ApiError(f'queries are nested at most {MAX_DEPTH} levels')
+        self.children = {}
+        for name, child in include.items():
+            if name not in self.type.relations:
+                raise ApiError(f'unknown {type_name} relation {name!r}')
+            relation = self.type.relations[name]
+            self.children[name] = (relation, Node(relation.type, child, depth + 1))
+        # Foreign keys that are included are read to find the related row.
+        self.columns = ['id'] + fields + [
+            name for name, (relation, _) in self.children.items() if isinstance(relation, One) and name not in fields
+        ]
+
+
+class NestedQuery:
+    # A JSON query document such as
+    #
+    #   {"type": "campaigns", "ids": [1], "fields": ["name"], "include": {
+    #       "component_activities": {"include": {"component": {"include": {"software": {}}}}}}}
+    #
+    # resolved level by level: the keys of every relation at a depth are
+    # collected from all the rows above and fetched with one query per
+    # relation, so the cost grows with the depth of the document, not with
+    # the number of rows.
+    default_limit = 100
+    max_limit = 500
+
+    def __init__(self, document):
+        if not isinstance(document, dict) or document.get('type') not in QUERY_TYPES:
+            raise ApiError(f'the query needs a "type", one of {", ".join(QUERY_TYPES)}')
+        self.root = Node(document['type'], document, extra_keys=('type', 'ids', 'limit'))
+        self.ids = document.get('ids')
+        if self.ids is not None and not (isinstance(self.ids, list) and all(isinstance(pk, int) for pk in self.ids)):
+            raise ApiError('ids must be a list of numbers')
+        self.limit = document.get('limit', self.default_limit)
+        if not isinstance(self.limit, int) or not 1 <= self.limit <= self.max_limit:
+            raise ApiError(f'limit must be between 1 and {self.max_limit}')
+        self.loaders = {}
+
+    @classmethod
+    def from_json(cls, text):
+        try:
+            return cls(orjson.loads(text))
+        except orjson.JSONDecodeError as error:
+            raise ApiError(f'invalid JSON: {error}')
+
+    def loader(self, relation, node):
+        # One loader per type, lookup and columns, shared by every place of
+        # the document that asks for the same rows.
+        key = (node.type_name, relation.lookup, tuple(node.columns))
+        if key not in self.loaders:
+            self.loaders[key] = DataLoader(node.type.model, relation.lookup, node.columns)
+        return self.loaders[key]
+
+    def run(self):
+        queryset = self.root.type.model._default_manager.order_by('pk')
+        if self.ids is not None:
+            queryset = queryset.filter(pk__in=self.ids)
+        rows = list(queryset.values(*self.root.columns)[:self.limit])
+
+        level = [(self.root, rows)]
+        while level:
+            for node, parents in level:
+                for name, (relation, child) in node.children.items():
+                    loader = self.loader(relation, child)
+                    for parent in parents:
+                        loader.load(parent[name] if isinstance(relation, One) else parent['id'])
+            for loader in self.loaders.values():
+                loader.dispatch()
+
+            next_level = []
+            for node, parents in level:
+                for name, (relation, child) in node.children.items():
+                    loader = self.loader(relation, child)
+                    # A row shared by several parents is resolved once.
+                    copies = {}
+                    for parent in parents:
+                        if isinstance(relation, One):
+                            found = loader.get(parent[name])
+                            parent[name] = copies.setdefault(id(found[0]), dict(found[0])) if found else None
+                        else:
+                            parent[name] = [copies.setdefault(id(row), dict(row)) for row in loader.get(parent['id'])]
+                    next_level.append((child, list(copies.values())))
+            level = next_level
+        return rows
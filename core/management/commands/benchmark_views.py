@@ -0,0 +1,72 @@
+import json
+import subprocess
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from core.benchmark import SIZES, run_benchmark
+
+
+BENCHMARK_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with portfolios of increasing size and time every core URL "
+        "through the test client. Reports p50/p95 latency, query count and peak memory per view as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES), help="Portfolio sizes to benchmark.")
+        parser.add_argument('--repeat', type=int, default=10, help="Timed requests per view.")
+        parser.add_argument('--only', nargs='+', help="Only benchmark the views whose label contains one of these strings, e.g. component_detail.")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+        parser.add_argument('--compare', help="A previous JSON report to print p50 and query count changes against.")
+
+    def handle(self, *args, **options):
+        report = {'commit': self.get_commit(), 'repeat': options['repeat'], 'sizes': {}}
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            # The benchmark clears the cache before every view, which must not
+            # flush the one shared with the running site.
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                for size in options['sizes']:
+                    call_command('flush', interactive=False, verbosity=0)
+                    call_command('seed_portfolio', stdout=StringIO(), **SIZES[size])
+                    report['sizes'][size] = run_benchmark(options['repeat'], options['only'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+        if options['compare']:
+            with open(options['compare']) as f:
+                self.print_comparison(json.load(f), report)
+
+    def get_commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def print_comparison(self, baseline, report):
+        self.stderr.write(f"Compared with {baseline.get('commit')}:")
+        for size, results in report['sizes'].items():
+            for label, result in results.items():
+                before = baseline.get('sizes', {}).get(size, {}).get(label)
+                if not before:
+                    continue
+                change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+                self.stderr.write(
+                    f"{size:6} {label:45} p50 {before['p50_ms']:9.2f} -> {result['p50_ms']:9.2f} ms ({change:+.0f}%)"
+                    f"  queries {before['queries']} -> {result['queries']}"
+                    f"  warm queries {before.get('warm_queries', before['queries'])} -> {result['warm_queries']}"
+                )
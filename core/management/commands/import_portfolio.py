@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.portfolio_import import BATCH_SIZE, READERS, PortfolioImporter, detect_format
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update components, component features and component activities from a CSV or JSON file. "
+        "Each row has a type (component, feature or activity) and refers to software, contacts, features, "
+        "activities and campaigns by name. Nothing is written when a row has an error."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header row, JSON array or JSON Lines file.")
+        parser.add_argument('--format', choices=list(READERS), help="File format; guessed from the extension by default.")
+        parser.add_argument('--dry-run', action='store_true', help="Report the changes without writing them.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Rows per lookup and write batch.")
+
+    def handle(self, *args, **options):
+        read = READERS[options['format'] or detect_format(options['path'])]
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as f:
+                report = PortfolioImporter(options['batch_size']).run(read(f), dry_run=options['dry_run'])
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        for line in report.lines():
+            self.stdout.write(line)
+        if report.errors:
+            raise CommandError(f"{len(report.errors)} rows have errors, nothing was imported.")
+        if report.dry_run:
+            self.stdout.write(self.style.WARNING("Dry run, nothing was imported."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Portfolio imported."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.compliance import refresh_compliance
+from core.models import Standard
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored component x standard compliance matrix from scratch."
+
+    def handle(self, *args, **options):
+        total = 0
+        # One standard at a time keeps memory bounded on large portfolios.
+        for standard_id in Standard.objects.values_list('pk', flat=True).iterator():
+            with transaction.atomic():
+                total += refresh_compliance(standard_ids=[standard_id])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {total} compliance cells."))
@@ -0,0 +1,176 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.compliance import refresh_compliance
+from core.models import (
+    Activity, ActivityRequirement, Campaign, Component, ComponentActivity, ComponentActivityCampaign,
+    ComponentFeature, ComponentFeatureCampaign, ComponentStandard, Contact, Document, Feature,
+    FeatureCategory, FeatureRequirement, JiraTicket, Requirement, Result, Software, Standard,
+)
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic portfolio of software, components, features, activities, campaigns and standards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--software', type=int, default=10, help="Number of software.")
+        parser.add_argument('--components', type=int, default=20, help="Components per software.")
+        parser.add_argument('--features', type=int, default=200, help="Number of features.")
+        parser.add_argument('--categories', type=int, default=10, help="Number of feature categories.")
+        parser.add_argument('--activities', type=int, default=30, help="Number of activities.")
+        parser.add_argument('--campaigns', type=int, default=10, help="Number of campaigns.")
+        parser.add_argument('--standards', type=int, default=5, help="Number of standards.")
+        parser.add_argument('--requirements', type=int, default=100, help="Requirements per standard.")
+        parser.add_argument('--contacts', type=int, default=100, help="Contacts per contact type.")
+        parser.add_argument('--features-per-component', type=int, default=10, help="Mean features per component.")
+        parser.add_argument('--activities-per-component', type=int, default=10, help="Mean activities per component.")
+        parser.add_argument('--requirements-per-activity', type=int, default=5, help="Mean requirements per activity.")
+        parser.add_argument('--requirements-per-feature', type=int, default=2, help="Mean requirements per feature.")
+        parser.add_argument('--standards-per-component', type=int, default=2, help="Mean standards per component.")
+        parser.add_argument('--links-per-row', type=int, default=1, help="Mean Jira tickets, results and documents per component feature/activity.")
+        parser.add_argument('--campaign-ratio', type=float, default=0.3, help="Share of component features/activities added to a campaign.")
+        parser.add_argument('--status-weights', default='3,2,5', help="Relative weights of the To Do, In Progress and Done statuses.")
+        parser.add_argument('--prefix', default='seed', help="Prefix of every generated name, to seed several portfolios side by side.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed generates the same portfolio.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per INSERT.")
+
+    def handle(self, *args, **options):
+        try:
+            self.status_weights = [float(weight) for weight in options['status_weights'].split(',')]
+        except ValueError:
+            raise CommandError("--status-weights must be three comma-separated numbers.")
+        if len(self.status_weights) != 3:
+            raise CommandError("--status-weights must be three comma-separated numbers.")
+        self.rng = random.Random(options['seed'])
+        self.options = options
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        self.counts = {}
+
+        with transaction.atomic():
+            self.seed_catalog()
+            for software in self.create(Software, [
+                Software(name=f'{self.prefix} software {i}', description=f'Synthetic software {i}')
+                for i in range(options['software'])
+            ]):
+                self.seed_software(software)
+            for standard in self.standards:
+                refresh_compliance(standard_ids=[standard.pk])
+
+        for model, count in self.counts.items():
+            self.stdout.write(f"{model}: {count}")
+        self.stdout.write(self.style.SUCCESS("Portfolio seeded."))
+
+    def create(self, model, objs):
+        created = []
+        for chunk in chunks(objs, self.batch_size):
+            created.extend(model.objects.bulk_create(chunk))
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(created)
+        return created
+
+    def around(self, mean):
+        return self.rng.randint(0, 2 * mean) if mean > 0 else 0
+
+    def status(self):
+        return self.rng.choices([1, 2, 3], weights=self.status_weights)[0]
+
+    def seed_catalog(self):
+        options = self.options
+        prefix = self.prefix
+        self.contacts = {
+            contact_type: self.create(Contact, [
+                Contact(name=f'{prefix} {contact_type} contact {i}', email=f'{prefix}.{contact_type.lower()}.{i}@example.com', type=contact_type)
+                for i in range(options['contacts'])
+            ])
+            for contact_type in (Contact.ENGINEERING, Contact.BUSINESS, Contact.PSRD)
+        }
+        categories = self.create(FeatureCategory, [
+            FeatureCategory(name=f'{prefix} category {i}') for i in range(options['categories'])
+        ])
+        self.features = self.create(Feature, [
+            Feature(name=f'{prefix} feature {i}', category=self.rng.choice(categories) if categories else None)
+            for i in range(options['features'])
+        ])
+        self.activities = self.create(Activity, [
+            Activity(name=f'{prefix} activity {i}') for i in range(options['activities'])
+        ])
+        self.campaigns = self.create(Campaign, [
+            Campaign(name=f'{prefix} campaign {i}', status=self.status()) for i in range(options['campaigns'])
+        ])
+        self.standards = self.create(Standard, [
+            Standard(name=f'{prefix} standard {i}', code=f'{prefix}-STD-{i}') for i in range(options['standards'])
+        ])
+        requirements = self.create(Requirement, [
+            Requirement(standard=standard, name=f'{standard.code}-{i}', code=f'{standard.code}-{i}', definition=f'Requirement {i} of {standard.name}')
+            for standard in self.standards
+            for i in range(options['requirements'])
+        ])
+        if requirements:
+            self.create(ActivityRequirement, [
+                ActivityRequirement(activity=activity, requirement=requirement)
+                for activity in self.activities
+                for requirement in self.rng.sample(requirements, min(len(requirements), self.around(options['requirements_per_activity'])))
+            ])
+            self.create(FeatureRequirement, [
+                FeatureRequirement(feature=feature, requirement=requirement)
+                for feature in self.features
+                for requirement in self.rng.sample(requirements, min(len(requirements), self.around(options['requirements_per_feature'])))
+            ])
+
+    def seed_software(self, software):
+        options = self.options
+        components = self.create(Component, [
+            Component(
+                name=f'{software.name} component {i}',
+                software=software,
+                engineering_contact=self.rng.choice(self.contacts[Contact.ENGINEERING]) if self.contacts[Contact.ENGINEERING] else None,
+                business_contact=self.rng.choice(self.contacts[Contact.BUSINESS]) if self.contacts[Contact.BUSINESS] else None,
+                psrd_contact=self.rng.choice(self.contacts[Contact.PSRD]) if self.contacts[Contact.PSRD] else None,
+            )
+            for i in range(options['components'])
+        ])
+        self.create(ComponentStandard, [
+            ComponentStandard(component=component, standard=standard)
+            for component in components
+            for standard in self.rng.sample(self.standards, min(len(self.standards), self.around(options['standards_per_component'])))
+        ])
+        component_features = self.create(ComponentFeature, [
+            ComponentFeature(component=component, feature=feature, status=self.status(), priority=self.rng.randint(1, 3))
+            for component in components
+            for feature in self.rng.sample(self.features, min(len(self.features), self.around(options['features_per_component'])))
+        ])
+        component_activities = self.create(ComponentActivity, [
+            ComponentActivity(component=component, activity=activity, status=self.status())
+            for component in components
+            for activity in self.rng.sample(self.activities, min(len(self.activities), self.around(options['activities_per_component'])))
+        ])
+        if self.campaigns:
+            self.create(ComponentFeatureCampaign, [
+                ComponentFeatureCampaign(component_feature=cf, campaign=self.rng.choice(self.campaigns))
+                for cf in component_features
+                if self.rng.random() < options['campaign_ratio']
+            ])
+            self.create(ComponentActivityCampaign, [
+                ComponentActivityCampaign(component_activity=ca, campaign=self.rng.choice(self.campaigns))
+                for ca in component_activities
+                if self.rng.random() < options['campaign_ratio']
+            ])
+        for model in (JiraTicket, Result, Document):
+            self.create(model, [
+                model(
+                    name=f'{model.__name__} {i} of {row.pk}',
+                    url=f'https://example.com/{model.__name__.lower()}/{row.pk}/{i}',
+                    kind=model.link_kind,
+                    **{parent_field: row},
+                )
+                for parent_field, rows in (('component_feature', component_features), ('component_activity', component_activities))
+                for row in rows
+                for i in range(self.around(options['links_per_row']))
+            ])
@@ -0,0 +1,114 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger('core.querybudget')
+
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def fingerprint(sql):
+    # Queries differing only by the length of an IN (...) list are the same
+    # statement for N+1 detection purposes.
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, limit=5):
+        return [(sql, count) for sql, count in self.fingerprints.most_common(limit) if count > 1]
+
+
+class QueryBudgetMiddleware:
+    # Counts the SQL queries of every request and logs the ones going over the
+    # budget of their URL name, taken from settings.QUERY_BUDGETS with
+    # settings.QUERY_BUDGET_DEFAULT as fallback (None disables the check).
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        request.query_stats = recorder
+
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(url_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
+        logger.debug('%s %s: %d queries in %.1f ms', url_name, request.path, recorder.count, recorder.duration * 1000)
+        if budget is not None and recorder.count > budget:
+            repeated = ''.join(f'\n  {count}x {sql[:300]}' for sql, count in recorder.repeated())
+            logger.warning(
+                'Query budget exceeded for %s (%s): %d queries, budget %d, %.1f ms in the database.%s',
+                url_name, request.path, recorder.count, budget, recorder.duration * 1000,
+                f'\nMost repeated statements:{repeated}' if repeated else '',
+            )
+        return response
+
+
+class ServerTimingMiddleware:
+    # Adds a Server-Timing header splitting the request time into view code,
+    # template rendering, the rest of the middleware chain and database
+    # execution (which overlaps the view and render phases). Enabled by
+    # settings.SERVER_TIMING; when disabled the middleware unloads itself.
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        marks = request.server_timing_marks = {}
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        end = time.perf_counter()
+
+        view_start = marks.get('view_start', end)
+        view_end = marks.get('view_end', end)
+        render = marks.get('render_end', view_end) - view_end
+        view = view_end - view_start
+        metrics = [
+            ('total', end - start, None),
+            ('view', view, None),
+            ('render', render, None),
+            ('middleware', end - start - view - render, None),
+            ('db', recorder.duration, f'{recorder.count} queries'),
+        ]
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration * 1000:.1f}' + (f';desc="{desc}"' if desc else '')
+            for name, duration, desc in metrics
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.server_timing_marks['view_start'] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        marks = request.server_timing_marks
+        marks['view_end'] = time.perf_counter()
+        response.add_post_render_callback(lambda response: marks.__setitem__('render_end', time.perf_counter()))
+        return response
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:00
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_compliance(apps, schema_editor):
+    ComponentStandard = apps.get_model("core", "ComponentStandard")
+    ComponentActivity = apps.get_model("core", "ComponentActivity")
+    Requirement = apps.get_model("core", "Requirement")
+
+    requirement_counts = dict(
+        Requirement.objects.order_by().values_list("standard_id").annotate(Count("pk"))
+    )
+    # A requirement is covered when none of the component's activities
+    # covering it is still open, the same rule as compliance.refresh_links().
+    covered_counts = {}
+    for component_id, standard_id, _, open_count in (
+        ComponentActivity.objects.order_by()
+        .values_list("component_id", "activity__requirements__standard_id", "activity__requirements")
+        .annotate(open_count=Count("pk", filter=~Q(status=3)))
+    ):
+        if standard_id is not None and not open_count:
+            key = (component_id, standard_id)
+            covered_counts[key] = covered_counts.get(key, 0) + 1
+    links = list(ComponentStandard.objects.all())
+    for link in links:
+        link.requirement_count = requirement_counts.get(link.standard_id, 0)
+        link.covered_requirement_count = covered_counts.get((link.component_id, link.standard_id), 0)
+    ComponentStandard.objects.bulk_update(links, ["requirement_count", "covered_requirement_count"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0035_remove_component_business_contact_fk_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="componentstandard",
+            name="covered_requirement_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="componentstandard",
+            name="requirement_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_compliance, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+LINK_KINDS = [("JiraTicket", "jira_ticket"), ("Result", "result"), ("Document", "document")]
+
+
+def flatten_links(apps, schema_editor):
+    # One UPDATE per link type copying the child row into its Link row.
+    Link = apps.get_model("core", "Link")
+    for model_name, kind in LINK_KINDS:
+        model = apps.get_model("core", model_name)
+        child = model.objects.filter(link_ptr=OuterRef("pk"))
+        Link.objects.filter(pk__in=model.objects.values("link_ptr")).update(
+            kind=kind,
+            flat_component_activity=Subquery(child.values("component_activity")[:1]),
+            flat_component_feature=Subquery(child.values("component_feature")[:1]),
+        )
+
+
+def unflatten_links(apps, schema_editor):
+    # The child models cannot be bulk created, insert their rows directly.
+    Link = apps.get_model("core", "Link")
+    link_table = schema_editor.quote_name(Link._meta.db_table)
+    activity_column = schema_editor.quote_name(Link._meta.get_field("flat_component_activity").column)
+    feature_column = schema_editor.quote_name(Link._meta.get_field("flat_component_feature").column)
+    for model_name, kind in LINK_KINDS:
+        model = apps.get_model("core", model_name)
+        schema_editor.execute(
+            f"INSERT INTO {schema_editor.quote_name(model._meta.db_table)} (link_ptr_id, component_activity_id, component_feature_id) "
+            f"SELECT id, {activity_column}, {feature_column} FROM {link_table} WHERE kind = %s",
+            [kind],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0036_componentstandard_compliance"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="link",
+            name="kind",
+            field=models.CharField(choices=[("jira_ticket", "Jira Ticket"), ("result", "Result"), ("document", "Document")], default="document", max_length=20),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="link",
+            name="flat_component_activity",
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="links", to="core.componentactivity"),
+        ),
+        migrations.AddField(
+            model_name="link",
+            name="flat_component_feature",
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="links", to="core.componentfeature"),
+        ),
+        migrations.RunPython(flatten_links, unflatten_links),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0037_link_kind"),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name="Document",
+        ),
+        migrations.DeleteModel(
+            name="JiraTicket",
+        ),
+        migrations.DeleteModel(
+            name="Result",
+        ),
+        migrations.RenameField(
+            model_name="link",
+            old_name="flat_component_activity",
+            new_name="component_activity",
+        ),
+        migrations.RenameField(
+            model_name="link",
+            old_name="flat_component_feature",
+            new_name="component_feature",
+        ),
+        migrations.AddIndex(
+            model_name="link",
+            index=models.Index(fields=["component_activity", "kind"], name="core_link_activity_kind_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="link",
+            index=models.Index(fields=["component_feature", "kind"], name="core_link_feature_kind_idx"),
+        ),
+        migrations.CreateModel(
+            name="Document",
+            fields=[],
+            options={
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("core.link",),
+        ),
+        migrations.CreateModel(
+            name="JiraTicket",
+            fields=[],
+            options={
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("core.link",),
+        ),
+        migrations.CreateModel(
+            name="Result",
+            fields=[],
+            options={
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("core.link",),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:30
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0039_search_vectors"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="contact",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="core_contact_name_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("email"), name="gin_trgm_ops"
+                ),
+                name="core_contact_email_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requirement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("code"), name="gin_trgm_ops"
+                ),
+                name="core_requirement_code_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requirement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="core_requirement_name_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requirement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("definition"),
+                    name="gin_trgm_ops",
+                ),
+                name="core_requirement_def_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="software",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="core_software_name_trgm_idx",
+            ),
+        ),
+    ]
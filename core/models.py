@@ -1,7 +1,63 @@
+import functools
+import operator
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Upper
 from django.urls import reverse
 
 
+# Text search configuration of the search_vector columns and of the queries
+# matched against them.
+SEARCH_CONFIG = 'english'
+
+
+def search_vector(*weighted_fields):
+    # A tsvector of the (field, weight) pairs, stored and kept up to date by
+    # Postgres on every write, bulk ones included.
+    return models.GeneratedField(
+        expression=functools.reduce(operator.add, [
+            SearchVector(field, weight=weight, config=SEARCH_CONFIG) for field, weight in weighted_fields
+        ]),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+
+def has_search_vector(model):
+    return any(field.name == 'search_vector' for field in model._meta.concrete_fields)
+
+
+class SearchVectorQuerySet(models.QuerySet):
+    # The search_vector columns are only read by core.search, inside the
+    # database. They are left out of the rows loaded by the model and by the
+    # relations it selects.
+    def select_related(self, *fields):
+        queryset = super().select_related(*fields)
+        deferred = []
+        for path in fields if fields != (None,) else ():
+            model = self.model
+            parts = path.split(LOOKUP_SEP)
+            for i, name in enumerate(parts, 1):
+                model = model._meta.get_field(name).related_model
+                if has_search_vector(model):
+                    deferred.append(LOOKUP_SEP.join(parts[:i] + ['search_vector']))
+        return queryset.defer(*deferred) if deferred else queryset
+
+
+class SearchVectorManager(models.Manager.from_queryset(SearchVectorQuerySet)):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return queryset.defer('search_vector') if has_search_vector(self.model) else queryset
+
+
+def trigram_index(field, name):
+    # Serves the UPPER(field) LIKE UPPER('%term%') of icontains lookups.
+    return GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=name)
+
+
 class Software(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
@@ -17,6 +73,7 @@ class Software(models.Model):
     class Meta:
         ordering = ['name']
         verbose_name_plural = 'software'
+        indexes = [trigram_index('name', 'core_software_name_trgm_idx')]
 
 
 class Contact(models.Model):
@@ -46,6 +103,10 @@ class Contact(models.Model):
     class Meta:
         ordering = ['name']
         unique_together = ['name', 'email']
+        indexes = [
+            trigram_index('name', 'core_contact_name_trgm_idx'),
+            trigram_index('email', 'core_contact_email_trgm_idx'),
+        ]
 
 
 class Component(models.Model):
@@ -62,6 +123,8 @@ class Component(models.Model):
     general_availability_date = models.DateField(null=True, blank=True)
     creation_datetime = models.DateTimeField(auto_now_add=True)
     modification_datetime = models.DateTimeField(auto_now=True)
+    search_vector = search_vector(('name', 'A'), ('description', 'B'))
+    objects = SearchVectorManager()
 
     def __str__(self):
         return self.name
@@ -71,6 +134,7 @@ class Component(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [GinIndex(fields=['search_vector'], name='core_component_search_idx')]
 
 
 class Feature(models.Model):
@@ -80,6 +144,8 @@ class Feature(models.Model):
     category = models.ForeignKey('FeatureCategory', on_delete=models.CASCADE, related_name="features", blank=True, null=True)
     creation_datetime = models.DateTimeField(auto_now_add=True)
     modification_datetime = models.DateTimeField(auto_now=True)
+    search_vector = search_vector(('name', 'A'), ('description', 'B'))
+    objects = SearchVectorManager()
 
     def __str__(self):
         return self.name
@@ -89,6 +155,7 @@ class Feature(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [GinIndex(fields=['search_vector'], name='core_feature_search_idx')]
 
 class FeatureCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -107,6 +174,8 @@ class Threat(models.Model):
     description = models.TextField(blank=True)
     creation_datetime = models.DateTimeField(auto_now_add=True)
     modification_datetime = models.DateTimeField(auto_now=True)
+    search_vector = search_vector(('name', 'A'), ('description', 'B'))
+    objects = SearchVectorManager()
 
     def __str__(self):
         return self.name
@@ -116,9 +185,30 @@ class Threat(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [GinIndex(fields=['search_vector'], name='core_threat_search_idx')]
+
+
+class LinkedRow:
+    # The Jira tickets, results and documents of a component feature or
+    # activity, all stored as its links. Iterating links.all() serves them
+    # from prefetch_related('links') when the links were prefetched.
+    def related_links(self, kind):
+        return [link for link in self.links.all() if link.kind == kind]
+
+    @property
+    def jira_tickets(self):
+        return self.related_links(Link.JIRA_TICKET)
 
+    @property
+    def results(self):
+        return self.related_links(Link.RESULT)
 
-class ComponentFeature(models.Model):
+    @property
+    def documents(self):
+        return self.related_links(Link.DOCUMENT)
+
+
+class ComponentFeature(LinkedRow, models.Model):
     PRIORITY_CHOICES = [
         (1, 'Low'),
         (2, 'Medium'),
@@ -147,6 +237,8 @@ class ComponentFeature(models.Model):
     jira_ticket_url = models.URLField(blank=True)
     creation_datetime = models.DateTimeField(auto_now_add=True)
     modification_datetime = models.DateTimeField(auto_now=True)
+    search_vector = search_vector(('description', 'B'))
+    objects = SearchVectorManager()
 
     def __str__(self):
         return f"{self.component.name} - {self.feature.name}"
@@ -154,6 +246,7 @@ class ComponentFeature(models.Model):
     class Meta:
         ordering = ['component__name', 'feature__name']
         unique_together = ['component', 'feature']
+        indexes = [GinIndex(fields=['search_vector'], name='core_compfeature_search_idx')]
 
 
 class Activity(models.Model):
@@ -161,6 +254,8 @@ class Activity(models.Model):
     description = models.TextField(blank=True)
     creation_datetime = models.DateTimeField(auto_now_add=True)
     modification_datetime = models.DateTimeField(auto_now=True)
+    search_vector = search_vector(('name', 'A'), ('description', 'B'))
+    objects = SearchVectorManager()
 
     def __str__(self):
         return self.name
@@ -168,11 +263,12 @@ class Activity(models.Model):
     class Meta:
         ordering = ['name']
         verbose_name_plural = 'activities'
+        indexes = [GinIndex(fields=['search_vector'], name='core_activity_search_idx')]
 
     def get_absolute_url(self):
         return reverse('activity_detail', kwargs={'pk': self.pk})
 
-class ComponentActivity(models.Model):
+class ComponentActivity(LinkedRow, models.Model):
     STATUS_CHOICES = [
         (1, 'To Do'),
         (2, 'In Progress'),
@@ -193,6 +289,8 @@ class ComponentActivity(models.Model):
     notes = models.TextField(blank=True)
     creation_datetime = models.DateTimeField(auto_now_add=True)
     modification_datetime = models.DateTimeField(auto_now=True)
+    search_vector = search_vector(('notes', 'B'))
+    objects = SearchVectorManager()
 
     def __str__(self):
         return f"{self.component.name} - {self.activity.name}"
@@ -200,34 +298,74 @@ class ComponentActivity(models.Model):
     class Meta:
         ordering = ['component__name', 'activity__name']
         unique_together = ['component', 'activity']
+        indexes = [GinIndex(fields=['search_vector'], name='core_compactivity_search_idx')]
 
     def get_absolute_url(self):
         return reverse('componentactivity_detail', kwargs={'pk': self.pk})
 
 
+class LinkKindManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(kind=self.model.link_kind)
+
+
 class Link(models.Model):
+    JIRA_TICKET = 'jira_ticket'
+    RESULT = 'result'
+    DOCUMENT = 'document'
+
+    KIND_CHOICES = [
+        (JIRA_TICKET, 'Jira Ticket'),
+        (RESULT, 'Result'),
+        (DOCUMENT, 'Document'),
+    ]
+
     url = models.URLField()
     name = models.CharField(max_length=255)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Indexed together with kind below, which also covers lookups by parent.
+    component_activity = models.ForeignKey(ComponentActivity, on_delete=models.CASCADE, related_name="links", blank=True, null=True, db_index=False)
+    component_feature = models.ForeignKey(ComponentFeature, on_delete=models.CASCADE, related_name="links", blank=True, null=True, db_index=False)
     creation_datetime = models.DateTimeField(auto_now_add=True)
     modification_datetime = models.DateTimeField(auto_now=True)
 
+    link_kind = None
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self.link_kind:
+            self.kind = self.link_kind
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['component_activity', 'kind'], name='core_link_activity_kind_idx'),
+            models.Index(fields=['component_feature', 'kind'], name='core_link_feature_kind_idx'),
+        ]
 
 class JiraTicket(Link):
-    component_activity = models.ForeignKey(ComponentActivity, on_delete=models.CASCADE, related_name="jira_tickets", blank=True, null=True)
-    component_feature = models.ForeignKey(ComponentFeature, on_delete=models.CASCADE, related_name="jira_tickets", blank=True, null=True)
+    link_kind = Link.JIRA_TICKET
+    objects = LinkKindManager()
+
+    class Meta:
+        proxy = True
 
 class Result(Link):
-    component_activity = models.ForeignKey(ComponentActivity, on_delete=models.CASCADE, related_name="results", blank=True, null=True)
-    component_feature = models.ForeignKey(ComponentFeature, on_delete=models.CASCADE, related_name="results", blank=True, null=True)
+    link_kind = Link.RESULT
+    objects = LinkKindManager()
+
+    class Meta:
+        proxy = True
 
 class Document(Link):
-    component_activity = models.ForeignKey(ComponentActivity, on_delete=models.CASCADE, related_name="documents", blank=True, null=True)
-    component_feature = models.ForeignKey(ComponentFeature, on_delete=models.CASCADE, related_name="documents", blank=True, null=True)
+    link_kind = Link.DOCUMENT
+    objects = LinkKindManager()
+
+    class Meta:
+        proxy = True
 
 class Campaign(models.Model):
     STATUS_CHOICES = [
@@ -253,6 +391,19 @@ class Campaign(models.Model):
     def get_absolute_url(self):
         return reverse('campaign_detail', kwargs={'pk': self.pk})
 
+    def contact_emails(self):
+        # Distinct, sorted emails of every contact of the components taking
+        # part in this campaign, resolved in a single query.
+        components = Component.objects.filter(
+            models.Q(component_activities__campaigns=self) | models.Q(component_features__campaigns=self)
+        ).values('pk')
+        contacts = Contact.objects.filter(
+            models.Q(engineering_components__in=components)
+            | models.Q(business_components__in=components)
+            | models.Q(psrd_components__in=components)
+        ).exclude(email='')
+        return list(contacts.order_by('email').values_list('email', flat=True).distinct())
+
     def __str__(self):
         return self.name
 
@@ -318,12 +469,23 @@ class Standard(models.Model):
 class ComponentStandard(models.Model):
     component = models.ForeignKey('Component', on_delete=models.CASCADE)
     standard = models.ForeignKey('Standard', on_delete=models.CASCADE)
+    # Materialized compliance of the component with the standard, kept up to
+    # date by core.compliance.refresh_compliance().
+    requirement_count = models.IntegerField(default=0)
+    covered_requirement_count = models.IntegerField(default=0)
     creation_datetime = models.DateTimeField(auto_now_add=True)
     modification_datetime = models.DateTimeField(auto_now=True)
+    objects = SearchVectorManager()
 
     def __str__(self):
         return f"{self.component.name} - {self.standard.name}"
 
+    @property
+    def compliance_percentage(self):
+        if not self.requirement_count:
+            return 0
+        return round(100 * self.covered_requirement_count / self.requirement_count)
+
     class Meta:
         ordering = ['component__name', 'standard__name']
         unique_together = ['component', 'standard']
@@ -337,6 +499,8 @@ class Requirement(models.Model):
     activities = models.ManyToManyField('Activity', through="ActivityRequirement", related_name="requirements")
     creation_datetime = models.DateTimeField(auto_now_add=True)
     modification_datetime = models.DateTimeField(auto_now=True)
+    search_vector = search_vector(('code', 'A'), ('name', 'A'), ('definition', 'B'))
+    objects = SearchVectorManager()
 
     def __str__(self):
         return f"{self.standard.name} - {self.definition}"
@@ -347,6 +511,12 @@ class Requirement(models.Model):
     class Meta:
         ordering = ['creation_datetime']
         unique_together = ['standard', 'definition']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='core_requirement_search_idx'),
+            trigram_index('code', 'core_requirement_code_trgm_idx'),
+            trigram_index('name', 'core_requirement_name_trgm_idx'),
+            trigram_index('definition', 'core_requirement_def_trgm_idx'),
+        ]
 
 class FeatureRequirement(models.Model):
     feature = models.ForeignKey('Feature', on_delete=models.CASCADE)
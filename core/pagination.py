@@ -0,0 +1,182 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from django.http import Http404
+
+
+def encode_cursor(values):
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise Http404('Invalid cursor.')
+    if not isinstance(values, list) or len(values) != length:
+        raise Http404('Invalid cursor.')
+    return values
+
+
+def ordering_field(queryset, path):
+    # The model field or annotation a keyset ordering path compares.
+    if path in queryset.query.annotations:
+        return queryset.query.annotations[path].output_field
+    model = queryset.model
+    for name in path.split(LOOKUP_SEP):
+        field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        model = field.related_model
+    return field
+
+
+def cursor_values(queryset, ordering, cursor):
+    # The values of a cursor converted to the types of the fields they are
+    # compared with, so that a tampered cursor is a 404 rather than a database
+    # error. The orderings never hold NULLs.
+    values = decode_cursor(cursor, len(ordering))
+    try:
+        values = [ordering_field(queryset, field).to_python(value) for (field, _), value in zip(ordering, values)]
+    except (ValidationError, TypeError, ValueError):
+        raise Http404('Invalid cursor.')
+    if any(value is None for value in values):
+        raise Http404('Invalid cursor.')
+    return values
+
+
+def keyset_filter(ordering, values, backwards=False):
+    # Rows strictly after (or before, when going backwards) the row holding
+    # ``values`` in ``ordering``: (a > x) OR (a = x AND b > y) OR ...
+    condition = Q()
+    equal = {}
+    for (field, descending), value in zip(ordering, values):
+        lookup = 'lt' if descending != backwards else 'gt'
+        condition |= Q(**equal, **{f'{field}__{lookup}': value})
+        equal[field] = value
+    return condition
+
+
+def row_value(obj, field):
+    for attr in field.split('__'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+class KeysetPaginationMixin:
+    # Seek pagination for ListViews: pages are addressed with ?after=/?before=
+    # cursors holding the ordering values of the boundary row, so every page
+    # costs the same index range scan however deep it is. ?page=N still falls
+    # back to the regular OFFSET paginator.
+    #
+    # sort_fields whitelists the ?sort= keys (prefix with "-" to descend) and
+    # maps each to the fields it orders by; the primary key is always added as
+    # a tie-breaker. Without ?sort= the model's Meta.ordering is used.
+    paginate_by = 50
+    sort_fields = {}
+    default_sort = None
+    list_select_related = ()
+
+    def get_sort(self):
+        sort = self.request.GET.get('sort', '')
+        if sort.lstrip('-') in self.sort_fields:
+            return sort
+        return self.default_sort
+
+    def get_keyset_ordering(self):
+        sort = self.get_sort()
+        if sort:
+            descending = sort.startswith('-')
+            ordering = [(field, descending) for field in self.sort_fields[sort.lstrip('-')]]
+        else:
+            ordering = [(field.lstrip('-'), field.startswith('-')) for field in self.model._meta.ordering]
+        ordering.append(('pk', ordering[-1][1] if ordering else False))
+        return ordering
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        self.keyset_ordering = self.get_keyset_ordering()
+        return queryset.order_by(*[('-' if descending else '') + field for field, descending in self.keyset_ordering])
+
+    def seek(self, queryset):
+        # The rows after ?after= or, in reverse order, before ?before=.
+        before = self.request.GET.get('before')
+        after = self.request.GET.get('after')
+        if before:
+            values = cursor_values(queryset, self.keyset_ordering, before)
+            return queryset.filter(keyset_filter(self.keyset_ordering, values, backwards=True)).reverse()
+        if after:
+            values = cursor_values(queryset, self.keyset_ordering, after)
+            return queryset.filter(keyset_filter(self.keyset_ordering, values))
+        return queryset
+
+    def get_page_queryset(self):
+        # The rows of the requested page and the one telling whether there is
+        # another, for the conditional GET validators. ?page=last and invalid
+        # numbers are left unsliced to the paginator.
+        queryset = self.get_queryset()
+        page_size = self.get_paginate_by(queryset)
+        if 'page' not in self.request.GET:
+            return self.seek(queryset)[:page_size + 1]
+        try:
+            number = int(self.request.GET['page'])
+        except ValueError:
+            return queryset
+        if number < 1:
+            return queryset
+        return queryset[(number - 1) * page_size:number * page_size + 1]
+
+    def paginate_queryset(self, queryset, page_size):
+        if 'page' in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+
+        ordering = self.keyset_ordering
+        after = self.request.GET.get('after')
+        before = self.request.GET.get('before')
+        queryset = self.seek(queryset)
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if before:
+            rows.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = bool(after), has_more
+
+        self.previous_cursor = encode_cursor([row_value(rows[0], f) for f, _ in ordering]) if rows and has_previous else None
+        self.next_cursor = encode_cursor([row_value(rows[-1], f) for f, _ in ordering]) if rows and has_next else None
+        return (None, None, rows, bool(self.previous_cursor or self.next_cursor))
+
+    def get_page_url(self, **params):
+        query = self.request.GET.copy()
+        for key in ('after', 'before', 'page'):
+            query.pop(key, None)
+        for key, value in params.items():
+            query[key] = value
+        return f'?{query.urlencode()}'
+
+    def get_context_data(self, **kwargs):
+        self.previous_cursor = self.next_cursor = None
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page:
+            # The ?page= fallback keeps the sort and filters like the cursors.
+            if page.has_previous():
+                context['previous_page_url'] = self.get_page_url(page=page.previous_page_number())
+            if page.has_next():
+                context['next_page_url'] = self.get_page_url(page=page.next_page_number())
+        if self.previous_cursor:
+            context['previous_page_url'] = self.get_page_url(before=self.previous_cursor)
+        if self.next_cursor:
+            context['next_page_url'] = self.get_page_url(after=self.next_cursor)
+        current = self.get_sort()
+        context['sort'] = current
+        context['sort_urls'] = {
+            key: self.get_page_url(sort=f'-{key}' if current == key else key)
+            for key in self.sort_fields
+        }
+        return context
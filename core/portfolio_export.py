@@ -0,0 +1,146 @@
+import csv
+import datetime
+import json
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import OuterRef, Subquery
+
+from .models import Component, ComponentActivity, ComponentActivityCampaign, ComponentFeature, ComponentFeatureCampaign
+
+
+CHUNK_SIZE = 2000
+
+# Rows sent to the client at once; the header goes out on its own.
+LINES_PER_WRITE = 500
+
+# The import_portfolio columns. Feature and activity rows repeat the
+# columns of their component, which the import ignores.
+COLUMNS = [
+    'type', 'software', 'component', 'engineering_contact', 'business_contact', 'psrd_contact', 'git_repo_url',
+    'dev_preview_date', 'tech_preview_date', 'general_availability_date', 'feature', 'activity', 'priority',
+    'status', 'description', 'notes', 'jira_ticket_url', 'component_version', 'estimated_completion_date',
+    'execution_start_date', 'execution_end_date', 'campaigns',
+]
+
+COMPONENT_COLUMNS = [
+    ('software', 'software__name'),
+    ('component', 'name'),
+    ('engineering_contact', 'engineering_contact__name'),
+    ('business_contact', 'business_contact__name'),
+    ('psrd_contact', 'psrd_contact__name'),
+    ('git_repo_url', 'git_repo_url'),
+    ('dev_preview_date', 'dev_preview_date'),
+    ('tech_preview_date', 'tech_preview_date'),
+    ('general_availability_date', 'general_availability_date'),
+]
+
+
+def campaign_names(through, field):
+    # The campaigns of each row as a correlated subquery, so rows stream out
+    # in order instead of waiting for a GROUP BY over the whole table.
+    return Subquery(
+        through.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+        .annotate(names=ArrayAgg('campaign__name', order_by='campaign__name')).values('names')
+    )
+
+
+def sources():
+    # (type, queryset, [(column, lookup)]) of every part of the export.
+    in_component = [(column, f'component__{lookup}') for column, lookup in COMPONENT_COLUMNS]
+    return [
+        ('component', Component.objects.order_by('name'), COMPONENT_COLUMNS + [
+            ('description', 'description'),
+            ('jira_ticket_url', 'jira_ticket_url'),
+        ]),
+        ('feature', ComponentFeature.objects.annotate(
+            campaign_names=campaign_names(ComponentFeatureCampaign, 'component_feature'),
+        ).order_by('component__name', 'feature__name'), in_component + [
+            ('feature', 'feature__name'),
+            ('priority', 'priority'),
+            ('status', 'status'),
+            ('description', 'description'),
+            ('jira_ticket_url', 'jira_ticket_url'),
+            ('campaigns', 'campaign_names'),
+        ]),
+        ('activity', ComponentActivity.objects.annotate(
+            campaign_names=campaign_names(ComponentActivityCampaign, 'component_activity'),
+        ).order_by('component__name', 'activity__name'), in_component + [
+            ('activity', 'activity__name'),
+            ('status', 'status'),
+            ('notes', 'notes'),
+            ('component_version', 'component_version'),
+            ('estimated_completion_date', 'estimated_completion_date'),
+            ('execution_start_date', 'execution_start_date'),
+            ('execution_end_date', 'execution_end_date'),
+            ('campaigns', 'campaign_names'),
+        ]),
+    ]
+
+
+def export_rows(chunk_size=CHUNK_SIZE):
+    # One dict per component, component feature and component activity, read
+    # with a single joined query each through a server-side cursor.
+    for kind, queryset, columns in sources():
+        names = [column for column, _ in columns]
+        # Choices are written as their labels, which the import accepts.
+        labels = {
+            field.name: dict(field.flatchoices) for field in queryset.model._meta.concrete_fields if field.choices
+        }
+        for values in queryset.values_list(*[lookup for _, lookup in columns]).iterator(chunk_size=chunk_size):
+            row = {'type': kind}
+            for column, value in zip(names, values):
+                if column in labels:
+                    value = labels[column][value]
+                elif column == 'campaigns':
+                    value = value or []
+                row[column] = value
+            yield row
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return '; '.join(value)
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow([csv_cell(row.get(column)) for column in COLUMNS])
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def buffered(lines, size=LINES_PER_WRITE):
+    # The first line right away, then the rest in groups so that every write
+    # to the client carries more than a single row.
+    lines = iter(lines)
+    yield next(lines, '')
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+FORMATS = {
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+}
@@ -0,0 +1,408 @@
+import csv
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import transaction
+from django.utils import timezone
+
+from .compliance import refresh_compliance
+from .fragments import invalidate_components
+from .models import (
+    Activity, Campaign, Component, ComponentActivity, ComponentActivityCampaign, ComponentFeature,
+    ComponentFeatureCampaign, Contact, Feature, Software,
+)
+
+
+BATCH_SIZE = 1000
+
+CONTACT_FIELDS = {
+    'engineering_contact': Contact.ENGINEERING,
+    'business_contact': Contact.BUSINESS,
+    'psrd_contact': Contact.PSRD,
+}
+
+
+# Returned by parsers for values that keep the current (or default) value.
+KEEP = object()
+
+
+class RowError(Exception):
+    pass
+
+
+def text(value):
+    return str(value).strip()
+
+
+def url(value):
+    value = text(value)
+    if value:
+        try:
+            URLValidator()(value)
+        except ValidationError:
+            raise RowError(f'{value!r} is not a valid URL')
+    return value
+
+
+def date(value):
+    value = text(value)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise RowError(f'{value!r} is not a YYYY-MM-DD date')
+
+
+def choice(choices):
+    # Accepts the stored value or its label, e.g. 2 or "In Progress".
+    values = {str(value): value for value, _ in choices}
+    values.update({label.lower(): value for value, label in choices})
+
+    def parse(value):
+        value = text(value)
+        if not value:
+            return KEEP
+        if value.lower() not in values:
+            raise RowError(f'{value!r} is not one of {", ".join(label for _, label in choices)}')
+        return values[value.lower()]
+    return parse
+
+
+def names(value):
+    # Campaigns are listed as "A; B" in CSV files and as a list in JSON.
+    if isinstance(value, list):
+        return [text(name) for name in value if text(name)]
+    return [name.strip() for name in text(value).split(';') if name.strip()]
+
+
+COMPONENT_FIELDS = {
+    'description': text,
+    'git_repo_url': url,
+    'jira_ticket_url': url,
+    'dev_preview_date': date,
+    'tech_preview_date': date,
+    'general_availability_date': date,
+}
+
+# Row type: (model, catalog field, catalog model, fields, campaign through model, through field)
+ROW_TYPES = {
+    'feature': (ComponentFeature, 'feature', Feature, {
+        'description': text,
+        'priority': choice(ComponentFeature.PRIORITY_CHOICES),
+        'status': choice(ComponentFeature.STATUS_CHOICES),
+        'jira_ticket_url': url,
+    }, ComponentFeatureCampaign, 'component_feature'),
+    'activity': (ComponentActivity, 'activity', Activity, {
+        'notes': text,
+        'status': choice(ComponentActivity.STATUS_CHOICES),
+        'component_version': text,
+        'estimated_completion_date': date,
+        'execution_start_date': date,
+        'execution_end_date': date,
+    }, ComponentActivityCampaign, 'component_activity'),
+}
+
+
+def read_csv(stream):
+    try:
+        yield from enumerate(csv.DictReader(stream), start=1)
+    except csv.Error as error:
+        raise ValueError(f'The CSV file is malformed: {error}')
+
+
+def read_json(stream, chunk_size=1 << 16):
+    # The elements of a top-level JSON array, or the lines of a JSON Lines
+    # file, decoded one at a time from chunks of the stream.
+    decoder = json.JSONDecoder()
+    buffer = ''
+    array = None
+    eof = False
+    number = 0
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,' if array else ' \t\r\n')
+        if array is None and buffer:
+            array = buffer.startswith('[')
+            buffer = buffer[1:] if array else buffer
+            continue
+        if array and buffer.startswith(']'):
+            return
+        if buffer:
+            try:
+                value, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError('The JSON file is malformed or truncated.')
+            else:
+                number += 1
+                yield number, value
+                buffer = buffer[end:]
+                continue
+        if eof:
+            if array:
+                raise ValueError('The JSON array is not closed.')
+            return
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+def detect_format(filename):
+    return 'csv' if filename.lower().endswith('.csv') else 'json'
+
+
+def display(value):
+    return '' if value is None else str(value)
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportReport:
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.rows = 0
+        self.counts = {}
+        self.changes = []
+        self.errors = []
+
+    def record(self, row, action, label, key, changes=None):
+        self.counts[label, action] = self.counts.get((label, action), 0) + 1
+        if action != 'unchanged':
+            self.changes.append((row, action, label, key, changes or {}))
+
+    def error(self, row, message):
+        self.errors.append((row, message))
+
+    @property
+    def written(self):
+        return not self.dry_run and not self.errors
+
+    def summary(self):
+        return [f'{label} {action}: {count}' for (label, action), count in sorted(self.counts.items())]
+
+    def lines(self):
+        yield f'{self.rows} rows read.'
+        yield from self.summary()
+        for row, action, label, key, changes in self.changes:
+            yield f'row {row}: {action} {label} {key}'
+            for field, (old, new) in changes.items():
+                yield f'    {field}: {display(old)!r} -> {display(new)!r}'
+        for row, message in self.errors:
+            yield f'row {row}: error: {message}'
+
+
+class PortfolioImporter:
+    # Creates or updates components and their features and activities from
+    # rows of dicts with a "type" of component, feature or activity. Software,
+    # contacts, features, activities and campaigns must already exist and are
+    # looked up by name with one query per model and batch. Everything runs in
+    # one transaction, rolled back on dry runs and when any row has an error.
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.cache = {model: {} for model in (Software, Contact, Feature, Activity, Campaign, Component)}
+        self.component_ids = set()
+        self.activity_component_ids = set()
+
+    def run(self, rows, dry_run=False):
+        self.report = ImportReport(dry_run)
+        with transaction.atomic():
+            for batch in batched(rows, self.batch_size):
+                self.import_batch(batch)
+            self.report.errors.sort()
+            if self.report.written:
+                if self.activity_component_ids:
+                    refresh_compliance(component_ids=self.activity_component_ids)
+                transaction.on_commit(lambda: invalidate_components(self.component_ids))
+            else:
+                transaction.set_rollback(True)
+        return self.report
+
+    def lookup(self, model, keys):
+        cache = self.cache[model]
+        missing = {key for key in keys if key and key not in cache}
+        if missing:
+            queryset = model.objects.all()
+            if model is Component:
+                queryset = queryset.select_related('software', 'engineering_contact', 'business_contact', 'psrd_contact')
+            cache.update(queryset.in_bulk(missing, field_name='name'))
+
+    def parse(self, row, data):
+        if not isinstance(data, dict):
+            raise RowError('expected an object')
+        data = {key.strip(): value for key, value in data.items() if key and value is not None}
+        kind = text(data.get('type', '')).lower()
+        if kind != 'component' and kind not in ROW_TYPES:
+            raise RowError(f'unknown type {data.get("type", "")!r}, expected component, feature or activity')
+        record = {'row': row, 'type': kind, 'component': text(data.get('component', ''))}
+        if not record['component']:
+            raise RowError('component is required')
+        if kind == 'component':
+            fields = COMPONENT_FIELDS
+            record['software'] = text(data.get('software', ''))
+            record['contacts'] = {name: text(data[name]) for name in CONTACT_FIELDS if name in data}
+        else:
+            _, catalog_field, _, fields, _, _ = ROW_TYPES[kind]
+            record['catalog'] = text(data.get(catalog_field, ''))
+            if not record['catalog']:
+                raise RowError(f'{catalog_field} is required')
+            record['campaigns'] = names(data['campaigns']) if 'campaigns' in data else None
+        # Only the columns present in the row are written.
+        values = {name: parse(data[name]) for name, parse in fields.items() if name in data}
+        record['values'] = {name: value for name, value in values.items() if value is not KEEP}
+        return record
+
+    def import_batch(self, batch):
+        records = []
+        for row, data in batch:
+            self.report.rows += 1
+            try:
+                records.append(self.parse(row, data))
+            except RowError as error:
+                self.report.error(row, str(error))
+
+        self.lookup(Component, {record['component'] for record in records})
+        self.lookup(Software, {record['software'] for record in records if record['type'] == 'component'})
+        self.lookup(Contact, {name for record in records if record['type'] == 'component' for name in record['contacts'].values()})
+        self.lookup(Campaign, {name for record in records for name in record.get('campaigns') or ()})
+        for kind, (_, _, catalog_model, _, _, _) in ROW_TYPES.items():
+            self.lookup(catalog_model, {record['catalog'] for record in records if record['type'] == kind})
+
+        self.import_components([record for record in records if record['type'] == 'component'])
+        for kind in ROW_TYPES:
+            self.import_rows(kind, [record for record in records if record['type'] == kind])
+
+    def import_components(self, records):
+        created, updated = {}, {}
+        for record in records:
+            try:
+                values = dict(record['values'])
+                if record['software']:
+                    values['software'] = self.resolve(Software, record['software'])
+                for name, value in record['contacts'].items():
+                    contact = self.resolve(Contact, value) if value else None
+                    if contact and contact.type != CONTACT_FIELDS[name]:
+                        raise RowError(f'{value!r} is a {contact.type} contact, expected {CONTACT_FIELDS[name]}')
+                    values[name] = contact
+            except RowError as error:
+                self.report.error(record['row'], str(error))
+                continue
+            component = self.cache[Component].get(record['component'])
+            if component is None:
+                if 'software' not in values:
+                    self.report.error(record['row'], 'software is required for new components')
+                    continue
+                component = self.cache[Component][record['component']] = created[record['component']] = Component(name=record['component'])
+                self.report.record(record['row'], 'create', 'component', component.name, self.apply(component, values, new=True))
+                continue
+            changes = self.apply(component, values)
+            if changes and component.pk is not None:
+                updated[component.pk] = component
+            self.report.record(record['row'], 'update' if changes else 'unchanged', 'component', component.name, changes)
+        self.save(Component, created.values(), updated.values())
+        self.component_ids.update(component.pk for component in [*created.values(), *updated.values()])
+
+    def import_rows(self, kind, records):
+        model, catalog_field, catalog_model, _, through, through_field = ROW_TYPES[kind]
+        resolved = []
+        for record in records:
+            try:
+                component = self.resolve(Component, record['component'])
+                resolved.append((record, component, self.resolve(catalog_model, record['catalog'])))
+            except RowError as error:
+                self.report.error(record['row'], str(error))
+        if not resolved:
+            return
+
+        existing = {
+            (obj.component_id, getattr(obj, f'{catalog_field}_id')): obj
+            for obj in model.objects.filter(
+                component__in={component.pk for _, component, _ in resolved},
+                **{f'{catalog_field}__in': {catalog.pk for _, _, catalog in resolved}},
+            ).order_by()
+        }
+        created, updated = {}, {}
+        for record, component, catalog in resolved:
+            key = (component.pk, catalog.pk)
+            label = f'{component.name} - {catalog.name}'
+            obj = existing.get(key)
+            if obj is None:
+                obj = existing[key] = created[key] = model(component=component, **{catalog_field: catalog})
+                self.report.record(record['row'], 'create', kind, label, self.apply(obj, record['values'], new=True))
+                continue
+            changes = self.apply(obj, record['values'])
+            if changes and key not in created:
+                updated[key] = obj
+            self.report.record(record['row'], 'update' if changes else 'unchanged', kind, label, changes)
+        self.save(model, created.values(), updated.values())
+        self.component_ids.update(component.pk for _, component, _ in resolved)
+        if kind == 'activity':
+            self.activity_component_ids.update(component.pk for _, component, _ in resolved)
+
+        # Campaign memberships are only ever added.
+        memberships = {}
+        for record, component, catalog in resolved:
+            obj = existing[component.pk, catalog.pk]
+            for name in record['campaigns'] or ():
+                campaign = self.cache[Campaign].get(name)
+                if campaign is None:
+                    self.report.error(record['row'], f'unknown campaign {name!r}')
+                    continue
+                memberships[obj.pk, campaign.pk] = (record['row'], f'{component.name} - {catalog.name}', campaign)
+        if memberships:
+            current = set(through.objects.filter(
+                **{f'{through_field}__in': {obj_pk for obj_pk, _ in memberships}},
+            ).values_list(f'{through_field}_id', 'campaign_id'))
+            missing = [key for key in memberships if key not in current]
+            through.objects.bulk_create(
+                [through(**{f'{through_field}_id': obj_pk}, campaign_id=campaign_pk) for obj_pk, campaign_pk in missing],
+                batch_size=self.batch_size,
+            )
+            for key in missing:
+                row, label, campaign = memberships[key]
+                self.report.record(row, 'create', f'{kind} campaign', f'{label} in {campaign.name}')
+
+    def resolve(self, model, name):
+        obj = self.cache[model].get(name)
+        if obj is None:
+            raise RowError(f'unknown {model._meta.verbose_name} {name!r}')
+        return obj
+
+    def apply(self, obj, values, new=False):
+        changes = {}
+        for name, value in values.items():
+            old = None if new else getattr(obj, name)
+            if new or old != value:
+                changes[name] = (old, value)
+                setattr(obj, name, value)
+        return changes
+
+    def save(self, model, created, updated):
+        created, updated = list(created), list(updated)
+        model.objects.bulk_create(created, batch_size=self.batch_size)
+        if updated:
+            # bulk_update() skips auto_now, which the conditional GETs rely on.
+            now = timezone.now()
+            for obj in updated:
+                obj.modification_datetime = now
+            fields = {
+                field.name for field in model._meta.concrete_fields
+                if not field.primary_key and not field.generated and field.name not in ('creation_datetime', 'name')
+            }
+            model.objects.bulk_update(updated, sorted(fields), batch_size=self.batch_size)
@@ -0,0 +1,62 @@
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Concat, Left, NullIf
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import SEARCH_CONFIG, Activity, Component, ComponentActivity, ComponentFeature, Feature, Requirement, Threat
+
+
+SEARCH_LIMIT = 50
+
+# Marks the matched words in snippets, turned into <mark> once the snippet
+# is escaped.
+START_SEL = '\x02'
+STOP_SEL = '\x03'
+
+# (kind, model, title, snippet field, URL name, field holding the URL pk).
+# Component features have no page of their own and link to their component.
+TARGETS = [
+    ('Component', Component, F('name'), 'description', 'component_detail', 'pk'),
+    ('Feature', Feature, F('name'), 'description', 'feature_detail', 'pk'),
+    ('Requirement', Requirement, Coalesce(NullIf('name', Value('')), NullIf('code', Value('')), Left('definition', 80)), 'definition', 'requirement_detail', 'pk'),
+    ('Threat', Threat, F('name'), 'description', 'threat_detail', 'pk'),
+    ('Activity', Activity, F('name'), 'description', 'activity_detail', 'pk'),
+    ('Component activity', ComponentActivity, Concat('component__name', Value(' - '), 'activity__name'), 'notes', 'componentactivity_detail', 'pk'),
+    ('Component feature', ComponentFeature, Concat('component__name', Value(' - '), 'feature__name'), 'description', 'component_detail', 'component_id'),
+]
+
+
+def snippet_html(snippet):
+    return mark_safe(escape(snippet).replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>'))
+
+
+def search(text, limit=SEARCH_LIMIT):
+    # The best matches of a web search style query (quoted phrases, "or",
+    # -excluded words) over every searchable model, ranked together in one
+    # UNION ALL query. Each branch is an index scan of its search_vector
+    # column limited to its own best rows, and snippets are only built for
+    # those.
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    branches = [
+        model._default_manager.filter(search_vector=query).annotate(
+            kind=Value(i),
+            link_pk=F(url_field),
+            title=title,
+            rank=SearchRank(F('search_vector'), query),
+            snippet=SearchHeadline(snippet_field, query, config=SEARCH_CONFIG, start_sel=START_SEL, stop_sel=STOP_SEL, max_fragments=2),
+        ).order_by('-rank').values_list('kind', 'link_pk', 'title', 'rank', 'snippet')[:limit]
+        for i, (_, model, title, snippet_field, _, url_field) in enumerate(TARGETS)
+    ]
+    rows = branches[0].union(*branches[1:], all=True).order_by('-rank', 'kind', 'title')[:limit]
+    return [
+        {
+            'kind': TARGETS[kind][0],
+            'url': reverse(TARGETS[kind][4], kwargs={'pk': link_pk}),
+            'title': title,
+            'rank': rank,
+            'snippet': snippet_html(snippet),
+        }
+        for kind, link_pk, title, rank, snippet in rows
+    ]
@@ -0,0 +1,236 @@
+import threading
+
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .compliance import refresh_compliance
+from .fragments import invalidate, invalidate_components, invalidate_rows
+from .models import (
+    Activity, ActivityRequirement, Campaign, Component, ComponentActivity, ComponentActivityCampaign,
+    ComponentFeature, ComponentFeatureCampaign, ComponentStandard, Contact, Document, Feature, JiraTicket,
+    Link, Requirement, Result, Software,
+)
+
+
+@receiver(pre_save, sender=ComponentActivity)
+def component_activity_saving(sender, instance, update_fields=None, **kwargs):
+    # A row moved to another component leaves the compliance and the page of
+    # the previous one behind. Moving it to another activity is covered by
+    # refreshing every standard of the component.
+    if instance._state.adding or (update_fields is not None and 'component' not in update_fields):
+        return
+    previous = ComponentActivity.objects.filter(pk=instance.pk).values_list('component_id', flat=True).first()
+    if previous != instance.component_id:
+        instance._previous_component_id = previous
+
+
+@receiver(post_save, sender=ComponentActivity)
+@receiver(post_delete, sender=ComponentActivity)
+def component_activity_changed(sender, instance, **kwargs):
+    refresh_compliance(component_ids=[instance.component_id, *previous_component_ids(instance)])
+
+
+def previous_component_ids(instance):
+    # Set by component_activity_saving, read by both post_save receivers.
+    previous = instance.__dict__.get('_previous_component_id')
+    return [] if previous is None else [previous]
+
+
+@receiver(pre_save, sender=Requirement)
+@receiver(pre_delete, sender=Requirement)
+def requirement_saving(sender, instance, update_fields=None, **kwargs):
+    # A requirement moved to another standard, or deleted after being moved,
+    # leaves the compliance of the previous one behind.
+    if instance._state.adding or (update_fields is not None and 'standard' not in update_fields):
+        return
+    previous = Requirement.objects.filter(pk=instance.pk).values_list('standard_id', flat=True).first()
+    if previous != instance.standard_id:
+        instance._previous_standard_id = previous
+
+
+@receiver(post_save, sender=Requirement)
+@receiver(post_delete, sender=Requirement)
+def requirement_changed(sender, instance, **kwargs):
+    previous = instance.__dict__.pop('_previous_standard_id', None)
+    refresh_compliance(standard_ids=[instance.standard_id, *([] if previous is None else [previous])])
+
+
+# Links a many-to-many manager is deleting, between its pre_ and
+# post_remove/clear signals, per thread. m2m_changed handles them in one go,
+# so the post_delete receivers of the through model skip them.
+_manager_deletes = threading.local()
+
+
+def manager_delete(sender, instance, model, pk_set):
+    # The link fields pointing at the instance and at the other side, the
+    # instance pk and the pks removed from the other side (all on clear).
+    source = next(field for field in sender._meta.concrete_fields if field.is_relation and isinstance(instance, field.related_model))
+    target = next(field for field in sender._meta.concrete_fields if field.is_relation and field.related_model is model and field is not source)
+    return (sender, source.attname, instance.pk, target.attname, None if pk_set is None else frozenset(pk_set))
+
+
+def track_manager_delete(sender, instance, action, model, pk_set):
+    deletes = _manager_deletes.__dict__.setdefault('deletes', [])
+    if action in ('pre_remove', 'pre_clear'):
+        deletes.append(manager_delete(sender, instance, model, pk_set))
+    elif action in ('post_remove', 'post_clear'):
+        deletes.remove(manager_delete(sender, instance, model, pk_set))
+
+
+def deleted_by_manager(sender, link):
+    return any(
+        model is sender and getattr(link, source) == pk and (pks is None or getattr(link, target) in pks)
+        for model, source, pk, target, pks in _manager_deletes.__dict__.get('deletes', ())
+    )
+
+
+@receiver(post_save, sender=ActivityRequirement)
+@receiver(post_delete, sender=ActivityRequirement)
+def activity_requirement_changed(sender, instance, **kwargs):
+    if deleted_by_manager(sender, instance):
+        return
+    # The requirement may already be gone when the link is deleted in cascade,
+    # in which case requirement_changed takes care of the refresh.
+    refresh_compliance(requirement_ids=[instance.requirement_id])
+
+
+@receiver(m2m_changed, sender=ActivityRequirement)
+def activity_requirements_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    track_manager_delete(sender, instance, action, model, pk_set)
+    if not reverse:
+        # requirement.activities.add/remove/clear()
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_compliance(standard_ids=[instance.standard_id])
+        return
+    # activity.requirements.add/remove/clear()
+    if action == 'pre_clear':
+        instance._cleared_standard_ids = list(instance.requirements.values_list('standard_id', flat=True).order_by().distinct())
+    elif action == 'post_clear':
+        refresh_compliance(standard_ids=instance.__dict__.pop('_cleared_standard_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_compliance(requirement_ids=list(pk_set))
+
+
+@receiver(post_save, sender=ComponentStandard)
+def component_standard_saved(sender, instance, created, **kwargs):
+    if created:
+        refresh_compliance(component_ids=[instance.component_id], standard_ids=[instance.standard_id])
+
+
+@receiver(m2m_changed, sender=ComponentStandard)
+def component_standards_changed(sender, instance, action, reverse, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if reverse:
+            refresh_compliance(component_ids=[instance.pk])
+        else:
+            refresh_compliance(standard_ids=[instance.pk])
+
+
+# Cached fragments of the component and campaign pages.
+
+@receiver(post_save, sender=ComponentFeature)
+@receiver(post_delete, sender=ComponentFeature)
+@receiver(post_save, sender=ComponentActivity)
+@receiver(post_delete, sender=ComponentActivity)
+def component_row_changed(sender, instance, **kwargs):
+    invalidate('component', [instance.component_id, *previous_component_ids(instance)])
+    instance.__dict__.pop('_previous_component_id', None)
+    if kwargs.get('signal') is post_save:
+        # Deleted rows take their campaign links with them, which are handled
+        # by campaign_link_changed.
+        if sender is ComponentFeature:
+            campaign_ids = ComponentFeatureCampaign.objects.filter(component_feature=instance)
+        else:
+            campaign_ids = ComponentActivityCampaign.objects.filter(component_activity=instance)
+        invalidate('campaign', campaign_ids.values_list('campaign_id', flat=True))
+
+
+@receiver(post_save, sender=Link)
+@receiver(post_delete, sender=Link)
+@receiver(post_save, sender=JiraTicket)
+@receiver(post_delete, sender=JiraTicket)
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def link_changed(sender, instance, **kwargs):
+    invalidate_rows([instance.component_feature_id], [instance.component_activity_id])
+
+
+@receiver(post_save, sender=ComponentFeatureCampaign)
+@receiver(post_delete, sender=ComponentFeatureCampaign)
+@receiver(post_save, sender=ComponentActivityCampaign)
+@receiver(post_delete, sender=ComponentActivityCampaign)
+def campaign_link_changed(sender, instance, **kwargs):
+    if deleted_by_manager(sender, instance):
+        return
+    invalidate('campaign', [instance.campaign_id])
+    if sender is ComponentFeatureCampaign:
+        invalidate('component', ComponentFeature.objects.filter(pk=instance.component_feature_id).values_list('component_id', flat=True))
+    else:
+        invalidate('component', ComponentActivity.objects.filter(pk=instance.component_activity_id).values_list('component_id', flat=True))
+
+
+@receiver(m2m_changed, sender=ComponentFeatureCampaign)
+@receiver(m2m_changed, sender=ComponentActivityCampaign)
+def campaign_links_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    track_manager_delete(sender, instance, action, model, pk_set)
+    field = 'component_feature' if sender is ComponentFeatureCampaign else 'component_activity'
+    if reverse:
+        # component_feature.campaigns.add/remove/clear()
+        if action == 'pre_clear':
+            instance._fragment_campaign_ids = list(instance.campaigns.values_list('pk', flat=True))
+        elif action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate('campaign', instance.__dict__.pop('_fragment_campaign_ids', None) or pk_set or ())
+            invalidate('component', [instance.component_id])
+    else:
+        # campaign.component_features.add/remove/clear()
+        if action == 'pre_clear':
+            instance._fragment_component_ids = list(sender.objects.filter(campaign=instance).values_list(f'{field}__component_id', flat=True))
+        elif action in ('post_add', 'post_remove', 'post_clear'):
+            component_ids = instance.__dict__.pop('_fragment_component_ids', None)
+            if component_ids is None:
+                component_ids = model.objects.filter(pk__in=pk_set).values_list('component_id', flat=True)
+            invalidate('campaign', [instance.pk])
+            invalidate('component', component_ids)
+
+
+@receiver(post_save, sender=Feature)
+def feature_saved(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_rows(component_feature_ids=instance.component_features.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Activity)
+def activity_saved(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_rows(component_activity_ids=instance.component_activities.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Campaign)
+def campaign_saved(sender, instance, created, **kwargs):
+    if not created:
+        invalidate('campaign', [instance.pk])
+        invalidate('component', ComponentFeature.objects.filter(campaigns=instance).values_list('component_id', flat=True))
+        invalidate('component', ComponentActivity.objects.filter(campaigns=instance).values_list('component_id', flat=True))
+
+
+@receiver(post_save, sender=Component)
+def component_saved(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_components([instance.pk])
+
+
+@receiver(post_save, sender=Software)
+def software_saved(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_components(instance.components.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Contact)
+def contact_saved(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_components(Component.objects.filter(
+            Q(engineering_contact=instance) | Q(business_contact=instance) | Q(psrd_contact=instance),
+        ).values_list('pk', flat=True))
@@ -0,0 +1,41 @@
+// Selects rendered by core.autocomplete widgets only hold their selected
+// options. Typing in the search box above them loads the matching ones.
+function setUpAutocomplete(select) {
+    var input = document.createElement('input');
+    input.type = 'search';
+    input.className = 'form-control mb-1';
+    input.placeholder = 'Type to search';
+    select.parentNode.insertBefore(input, select);
+    var timer = null;
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(function() {
+            loadAutocompleteOptions(select, input.value);
+        }, 250);
+    });
+}
+
+function loadAutocompleteOptions(select, term) {
+    var url = new URL(select.dataset.autocompleteUrl, window.location.href);
+    url.searchParams.set('q', term);
+    fetch(url).then(function(response) {
+        return response.json();
+    }).then(function(data) {
+        // Keep the selected options and the empty one, replace the rest.
+        Array.from(select.options).forEach(function(option) {
+            if (option.value && !option.selected) {
+                option.remove();
+            }
+        });
+        var present = Array.from(select.options).map(function(option) {
+            return option.value;
+        });
+        data.results.forEach(function(result) {
+            if (present.indexOf(String(result.id)) === -1) {
+                select.add(new Option(result.text, result.id));
+            }
+        });
+    });
+}
+
+document.querySelectorAll('select[data-autocomplete-url]').forEach(setUpAutocomplete);
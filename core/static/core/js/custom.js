@@ -1,5 +1,18 @@
 function copyContactsToClipboard(eng, bus, psrd) {
-  const text = [eng, bus, psrd].join(';');
+  copyTextToClipboard([eng, bus, psrd].join(';'));
+}
+
+function copyCampaignContactsToClipboard(url) {
+  fetch(url).then(function(response) {
+    return response.json();
+  }).then(function(data) {
+    copyTextToClipboard(data.emails.join(';'));
+  }, function(err) {
+    alert('Failed to load contacts: ' + err);
+  });
+}
+
+function copyTextToClipboard(text) {
   if (navigator.clipboard) {
     navigator.clipboard.writeText(text).then(function() {
       alert('Contacts copied to clipboard: ' + text);
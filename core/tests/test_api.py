@@ -0,0 +1,100 @@
+import datetime
+from django.test import TestCase
+from django.urls import reverse
+from core.models import Activity, Campaign, Component, ComponentActivity, ComponentFeature, Feature, Requirement, Software, Standard
+from core.pagination import encode_cursor
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.software = Software.objects.create(name='OpenShift')
+        cls.kubelet = Component.objects.create(name='Kubelet', software=cls.software, general_availability_date=datetime.date(2025, 3, 1))
+        Component.objects.create(name='CRI-O', software=cls.software)
+        cls.cf = ComponentFeature.objects.create(component=cls.kubelet, feature=Feature.objects.create(name='FIPS'), priority=ComponentFeature.HIGH)
+        ca = ComponentActivity.objects.create(component=cls.kubelet, activity=Activity.objects.create(name='SAR'))
+        campaign = Campaign.objects.create(name='FIPS readiness')
+        cls.cf.campaigns.add(campaign)
+        ca.campaigns.add(campaign)
+        standard = Standard.objects.create(name='FIPS 140-3', code='FIPS-140-3')
+        Requirement.objects.create(standard=standard, definition='Approved algorithms')
+
+    def get(self, name, params=None, **kwargs):
+        return self.client.get(reverse(name, kwargs=kwargs), params or {})
+
+    def test_detail_serializes_default_fields(self):
+        response = self.get('api_component_detail', pk=self.kubelet.pk)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = response.json()['data']
+        self.assertEqual((data['id'], data['name'], data['software']), (self.kubelet.pk, 'Kubelet', self.software.pk))
+        self.assertEqual(data['general_availability_date'], '2025-03-01')
+        self.assertIsNone(data['engineering_contact'])
+        self.assertNotIn('component_features', data)
+
+    def test_sparse_fieldsets_and_includes(self):
+        response = self.get('api_component_detail', {
+            'fields': 'name',
+            'include': 'software,component_features.campaigns',
+            'fields[component-features]': 'priority',
+            'fields[campaigns]': 'name',
+            'fields[software]': 'name',
+        }, pk=self.kubelet.pk)
+        self.assertEqual(response.json()['data'], {
+            'id': self.kubelet.pk,
+            'name': 'Kubelet',
+            'software': {'id': self.software.pk, 'name': 'OpenShift'},
+            'component_features': [{
+                'id': self.cf.pk,
+                'priority': ComponentFeature.HIGH,
+                'campaigns': [{'id': Campaign.objects.get().pk, 'name': 'FIPS readiness'}],
+            }],
+        })
+
+    def test_includes_do_not_add_queries_per_row(self):
+        for i in range(10):
+            component = Component.objects.create(name=f'Component {i}', software=self.software)
+            ComponentFeature.objects.create(component=component, feature=Feature.objects.get())
+        # The validators, the components with their software, the component
+        # features and their campaigns.
+        with self.assertNumQueries(4):
+            response = self.get('api_component_list', {'include': 'software,component_features.campaigns'})
+        self.assertEqual(len(response.json()['data']), 12)
+
+    def test_list_pages_with_a_cursor(self):
+        response = self.get('api_component_list', {'limit': 1, 'fields': 'name'})
+        first = response.json()
+        self.assertEqual(first['data'], [{'id': self.kubelet.pk, 'name': 'Kubelet'}])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['name'] for row in second['data']], ['CRI-O'])
+        self.assertIsNone(second['next'])
+
+    def test_reverse_many_to_many_and_every_type(self):
+        data = self.get('api_campaign_list', {'include': 'component_features.component,component_activities'}).json()['data']
+        self.assertEqual(data[0]['component_features'][0]['component']['name'], 'Kubelet')
+        self.assertEqual(len(data[0]['component_activities']), 1)
+        for name in ['software', 'componentactivity', 'standard', 'requirement']:
+            self.assertEqual(self.get(f'api_{name}_list').status_code, 200)
+
+    def test_errors(self):
+        for params in [{'fields': 'secret'}, {'include': 'contacts'}, {'fields[gadgets]': 'name'}, {'limit': 'all'}, {'limit': 0}, {'after': 'x'}, {'after': encode_cursor(['x'])}, {'after': encode_cursor([None])}, {'include': 'component_features.component.component_features.campaigns'}]:
+            response = self.get('api_component_list', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('errors', response.json())
+        self.assertEqual(self.get('api_component_detail', pk=0).status_code, 404)
+
+    def test_conditional_get(self):
+        response = self.get('api_component_detail', pk=self.kubelet.pk)
+        response = self.client.get(reverse('api_component_detail', kwargs={'pk': self.kubelet.pk}), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_conditional_get_only_reads_the_rows_of_the_page(self):
+        url = reverse('api_component_list')
+        params = {'limit': 1, 'include': 'component_features.campaigns'}
+        etag = self.client.get(url, params)['ETag']
+        # CRI-O is on the next page, the feature of Kubelet on this one.
+        crio = Component.objects.get(name='CRI-O')
+        ComponentFeature.objects.create(component=crio, feature=Feature.objects.create(name='SBOM'))
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.cf.campaigns.clear()
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(url, {'limit': 0}).status_code, 400)
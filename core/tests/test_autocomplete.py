@@ -0,0 +1,61 @@
+from django.test import TestCase
+from django.urls import reverse
+from core.forms import ActivityForm, ComponentForm
+from core.models import Activity, Component, Contact, Requirement, Software, Standard
+
+
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.openshift = Software.objects.create(name='OpenShift')
+        Software.objects.create(name='OpenStack')
+        Software.objects.create(name='RHEL')
+        cls.alice = Contact.objects.create(name='Alice', email='alice@example.com', type=Contact.ENGINEERING)
+        Contact.objects.create(name='Alicia', email='alicia@example.com', type=Contact.BUSINESS)
+        standard = Standard.objects.create(name='FIPS 140-3', code='FIPS')
+        cls.requirements = [
+            Requirement.objects.create(standard=standard, code=f'AS{i:02}', definition=f'Requirement {i} on approved algorithms')
+            for i in range(30)
+        ]
+
+    def results(self, name, params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        return [result['text'] for result in response.json()['results']]
+
+    def test_matches(self):
+        self.assertEqual(self.results('autocomplete_software', {'q': 'open'}), ['OpenShift', 'OpenStack'])
+        self.assertEqual(self.results('autocomplete_software', {'q': 'shift'}), ['OpenShift'])
+        self.assertEqual(self.results('autocomplete_software', {'q': 'o'}), [])
+        self.assertEqual(self.results('autocomplete_software', {'q': ' op '}), [])
+        self.assertEqual(self.results('autocomplete_contacts', {'q': 'ali'}), ['Alice', 'Alicia'])
+        self.assertEqual(self.results('autocomplete_contacts', {'q': 'ali', 'type': Contact.BUSINESS}), ['Alicia'])
+        self.assertEqual(self.results('autocomplete_contacts', {'q': 'alicia@'}), ['Alicia'])
+        self.assertEqual(len(self.results('autocomplete_requirements', {'q': 'algorithms'})), 20)
+        self.assertEqual(self.results('autocomplete_requirements', {'q': 'AS07'}), ['FIPS 140-3 - Requirement 7 on approved algorithms'])
+
+    def test_widgets_render_only_selected_options(self):
+        component = Component.objects.create(name='Kubelet', software=self.openshift, engineering_contact=self.alice)
+        html = str(ComponentForm(instance=component)['software'])
+        self.assertIn('data-autocomplete-url="/autocomplete/software/"', html)
+        self.assertIn('<option value="%d" selected>OpenShift</option>' % self.openshift.pk, html)
+        self.assertNotIn('OpenStack', html)
+        self.assertIn('data-autocomplete-url="/autocomplete/contacts/?type=Engineering"', str(ComponentForm(instance=component)['engineering_contact']))
+
+        activity = Activity.objects.create(name='SAR')
+        activity.requirements.set(self.requirements[:2])
+        form = ActivityForm(instance=activity)
+        with self.assertNumQueries(2):
+            html = str(form['requirements'])
+        self.assertEqual(html.count('<option'), 2)
+
+    def test_submitted_values_are_validated(self):
+        form = ComponentForm({'name': 'Kubelet', 'software': self.openshift.pk, 'business_contact': self.alice.pk})
+        self.assertEqual(list(form.errors), ['business_contact'])
+        self.assertNotIn('Alice', str(form['business_contact']))
+        form = ActivityForm({'name': 'SAR', 'requirements': [self.requirements[0].pk, 'x']})
+        self.assertFalse(form.is_valid())
+        str(form['requirements'])
+        form = ActivityForm({'name': 'SAR', 'requirements': [self.requirements[0].pk]})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(list(form.save().requirements.all()), [self.requirements[0]])
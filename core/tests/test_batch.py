@@ -0,0 +1,122 @@
+import datetime
+import json
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.models import Activity, Campaign, Component, ComponentActivity, ComponentFeature, Feature, JiraTicket, Link, Result, Software
+
+TOKEN = 'ci-secret'
+
+
+@override_settings(API_TOKENS=[TOKEN])
+class BatchApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        software = Software.objects.create(name='OpenShift')
+        cls.campaign = Campaign.objects.create(name='FIPS readiness')
+        cls.other_campaign = Campaign.objects.create(name='Pentest 2026')
+        activity = Activity.objects.create(name='SAR')
+        feature = Feature.objects.create(name='FIPS')
+        cls.activities = []
+        for i in range(20):
+            component = Component.objects.create(name=f'Component {i}', software=software)
+            component_activity = ComponentActivity.objects.create(component=component, activity=activity)
+            component_activity.campaigns.add(cls.campaign)
+            cls.activities.append(component_activity)
+        cls.feature = ComponentFeature.objects.create(component=component, feature=feature)
+        cls.ticket = JiraTicket.objects.create(name='SEC-1', url='https://issues.example.com/SEC-1', component_activity=cls.activities[0])
+
+    def post(self, operations, token=TOKEN):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        return self.client.post(reverse('api_batch'), json.dumps({'operations': operations}), content_type='application/json', headers=headers)
+
+    def test_requires_token(self):
+        for token in (None, 'wrong'):
+            response = self.post([{'op': 'update', 'type': 'component-activities', 'id': self.activities[0].pk, 'values': {'status': 'Done'}}], token)
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+        self.assertFalse(ComponentActivity.objects.filter(status=ComponentActivity.DONE).exists())
+
+    def test_nightly_run(self):
+        operations = []
+        for activity in self.activities:
+            operations.append({'op': 'update', 'type': 'component-activities', 'id': activity.pk, 'values': {'status': 'Done', 'execution_end_date': '2026-10-01'}})
+            operations.append({'op': 'add_link', 'type': 'component-activities', 'id': activity.pk, 'kind': 'result', 'name': 'Scan', 'url': f'https://scans.example.com/{activity.pk}'})
+            operations.append({'op': 'add_campaign', 'type': 'component-activities', 'id': activity.pk, 'campaign': 'Pentest 2026'})
+        operations += [
+            {'op': 'remove_link', 'type': 'component-activities', 'id': self.activities[0].pk, 'kind': 'jira_ticket', 'url': self.ticket.url},
+            {'op': 'remove_campaign', 'type': 'component-activities', 'id': self.activities[1].pk, 'campaign': self.campaign.pk},
+            {'op': 'update', 'type': 'component-features', 'id': self.feature.pk, 'values': {'status': ComponentFeature.IN_PROGRESS}},
+        ]
+        # However many rows: loading and locking, one bulk statement per kind
+        # of change, the compliance refresh and the fragment invalidation.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(operations)
+        self.assertEqual(len(queries), 23)
+        self.assertIn('FOR UPDATE OF', next(query['sql'] for query in queries if 'core_componentactivity' in query['sql']))
+        self.assertEqual(response.status_code, 200, response.content)
+        results = response.json()['results']
+        self.assertEqual(len(results), 63)
+        self.assertTrue(all(result['ok'] for result in results))
+        self.assertEqual(results[-3]['removed'], 1)
+        self.assertTrue(results[-2]['changed'])
+
+        self.assertEqual(ComponentActivity.objects.filter(status=ComponentActivity.DONE, execution_end_date=datetime.date(2026, 10, 1)).count(), 20)
+        self.assertEqual(Result.objects.filter(name='Scan').count(), 20)
+        self.assertEqual(Result.objects.get(pk=results[1]['id']).component_activity, self.activities[0])
+        self.assertFalse(Link.objects.filter(pk=self.ticket.pk).exists())
+        self.assertEqual(self.other_campaign.component_activities.count(), 20)
+        self.assertNotIn(self.activities[1], self.campaign.component_activities.all())
+        self.assertEqual(ComponentFeature.objects.get().status, ComponentFeature.IN_PROGRESS)
+
+    def test_empty_values_are_rejected(self):
+        for values, error in [
+            ({'status': ' '}, 'values must set at least one field, empty values are ignored'),
+            ({'status': None}, 'status cannot be cleared'),
+        ]:
+            response = self.post([{'op': 'update', 'type': 'component-activities', 'id': self.activities[0].pk, 'values': values}])
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['results'][0]['error'], error)
+
+    def test_null_clears_dates(self):
+        ComponentActivity.objects.filter(pk=self.activities[0].pk).update(execution_start_date=datetime.date(2026, 9, 1), execution_end_date=datetime.date(2026, 9, 30))
+        response = self.post([{'op': 'update', 'type': 'component-activities', 'id': self.activities[0].pk, 'values': {'execution_end_date': None}}])
+        self.assertEqual(response.status_code, 200)
+        activity = ComponentActivity.objects.get(pk=self.activities[0].pk)
+        self.assertEqual((activity.execution_start_date, activity.execution_end_date), (datetime.date(2026, 9, 1), None))
+
+    def test_campaign_operations_apply_in_order(self):
+        pk = self.activities[0].pk
+        response = self.post([
+            {'op': 'add_campaign', 'type': 'component-activities', 'id': pk, 'campaign': self.campaign.pk},
+            {'op': 'remove_campaign', 'type': 'component-activities', 'id': pk, 'campaign': self.campaign.pk},
+            {'op': 'add_campaign', 'type': 'component-activities', 'id': pk, 'campaign': self.other_campaign.pk},
+        ])
+        self.assertEqual([result['changed'] for result in response.json()['results']], [False, True, True])
+        self.assertEqual(list(self.activities[0].campaigns.all()), [self.other_campaign])
+
+    def test_errors_write_nothing(self):
+        response = self.post([
+            {'op': 'update', 'type': 'component-activities', 'id': self.activities[0].pk, 'values': {'status': 'Done'}},
+            {'op': 'update', 'type': 'component-activities', 'id': self.activities[1].pk, 'values': {'notes': 'x'}},
+            {'op': 'update', 'type': 'component-activities', 'id': 0, 'values': {'status': 'Done'}},
+            {'op': 'add_link', 'type': 'component-features', 'id': self.feature.pk, 'kind': 'result', 'name': 'Scan', 'url': 'nope'},
+            {'op': 'add_campaign', 'type': 'component-activities', 'id': self.activities[0].pk, 'campaign': 'Unknown'},
+            {'op': 'archive', 'type': 'component-activities', 'id': self.activities[0].pk},
+            {'op': 'update', 'type': ['component-activities'], 'id': self.activities[0].pk, 'values': {'status': 'Done'}},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], ['6 operations have errors, nothing was written'])
+        results = response.json()['results']
+        self.assertEqual(results[0], {'ok': True})
+        self.assertEqual(results[1]['error'], 'notes cannot be updated, expected status, estimated_completion_date, execution_start_date, execution_end_date')
+        self.assertEqual(results[2]['error'], 'component-activities 0 not found')
+        self.assertEqual(results[3]['error'], "'nope' is not a valid URL")
+        self.assertEqual(results[4]['error'], "unknown campaign 'Unknown'")
+        self.assertEqual(results[6]['error'], "unknown type ['component-activities'], expected one of component-activities, component-features")
+        self.assertFalse(ComponentActivity.objects.filter(status=ComponentActivity.DONE).exists())
+
+        for body in ['{', '[]', json.dumps({'operations': []})]:
+            response = self.client.post(reverse('api_batch'), body, content_type='application/json', headers={'Authorization': f'Bearer {TOKEN}'})
+            self.assertEqual(response.status_code, 400)
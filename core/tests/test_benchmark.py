@@ -0,0 +1,44 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from core.benchmark import run_benchmark
+from core.models import Component, ComponentFeature, Contact
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'seed_portfolio', stdout=StringIO(),
+            software=1, components=2, features=10, activities=5, campaigns=1, standards=1, requirements=5, contacts=2,
+        )
+
+    def test_creates_are_posted_and_rolled_back(self):
+        counts = [model.objects.count() for model in (Contact, ComponentFeature, Component)]
+        results = run_benchmark(repeat=2, only=['contact_add', 'feature_add_to_component', 'component_add_to_software'])
+        self.assertEqual(
+            {label: result['status'] for label, result in results.items()},
+            {
+                'contact_add GET': 200, 'contact_add POST': 302,
+                'feature_add_to_component GET': 200, 'feature_add_to_component POST': 302,
+                'component_add_to_software GET': 200, 'component_add_to_software POST': 302,
+            },
+        )
+        self.assertEqual([model.objects.count() for model in (Contact, ComponentFeature, Component)], counts)
+
+    def test_reports_every_metric_per_view(self):
+        results = run_benchmark(repeat=2, only=['component_detail', 'campaign_detail', 'contact_update'])
+        self.assertEqual(set(results), {
+            'component_detail GET', 'campaign_detail GET', 'contact_update GET', 'contact_update POST',
+            'api_component_detail GET', 'api_campaign_detail GET',
+        })
+        self.assertEqual(results['api_component_detail GET']['status'], 200)
+        self.assertEqual(results['contact_update POST']['status'], 302)
+        self.assertEqual(results['component_detail GET']['queries'], 9)
+        # The feature and activity tables come from the fragment cache.
+        self.assertEqual(results['component_detail GET']['warm_queries'], 3)
+        for result in results.values():
+            self.assertGreater(result['p95_ms'], 0)
+            self.assertGreaterEqual(result['p95_ms'], result['p50_ms'])
+            self.assertGreater(result['peak_memory_kb'], 0)
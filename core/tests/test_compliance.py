@@ -0,0 +1,93 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from core.models import Software, Component, Standard, Requirement, Activity, ActivityRequirement, ComponentActivity, ComponentStandard
+
+
+class ComplianceMatrixTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.component = Component.objects.create(name='Kubelet', software=Software.objects.create(name='OpenShift'))
+        cls.standard = Standard.objects.create(name='ISO 27001', code='ISO27001')
+        cls.first = Requirement.objects.create(standard=cls.standard, definition='Review the architecture')
+        cls.second = Requirement.objects.create(standard=cls.standard, definition='Scan the code')
+        cls.activity = Activity.objects.create(name='SAR')
+        cls.activity.requirements.add(cls.first)
+        cls.standard.components.add(cls.component)
+
+    def get_cell(self):
+        return ComponentStandard.objects.get(component=self.component, standard=self.standard)
+
+    def test_cell_refreshes_on_component_activity_changes(self):
+        self.assertEqual((self.get_cell().covered_requirement_count, self.get_cell().requirement_count), (0, 2))
+        ca = ComponentActivity.objects.create(component=self.component, activity=self.activity, status=ComponentActivity.DONE)
+        self.assertEqual(self.get_cell().covered_requirement_count, 1)
+        self.assertEqual(self.get_cell().compliance_percentage, 50)
+        ca.status = ComponentActivity.IN_PROGRESS
+        ca.save()
+        self.assertEqual(self.get_cell().covered_requirement_count, 0)
+
+    def test_requirement_is_covered_only_when_every_activity_is_done(self):
+        ComponentActivity.objects.create(component=self.component, activity=self.activity, status=ComponentActivity.DONE)
+        scan = ComponentActivity.objects.create(component=self.component, activity=Activity.objects.create(name='SAST'), status=ComponentActivity.IN_PROGRESS)
+        scan.activity.requirements.add(self.first)
+        self.assertEqual(self.get_cell().covered_requirement_count, 0)
+        scan.status = ComponentActivity.DONE
+        scan.save()
+        self.assertEqual(self.get_cell().covered_requirement_count, 1)
+
+    def test_cell_refreshes_when_component_activity_moves(self):
+        other = Component.objects.create(name='CRI-O', software=self.component.software)
+        self.standard.components.add(other)
+        ca = ComponentActivity.objects.create(component=self.component, activity=self.activity, status=ComponentActivity.DONE)
+        ca.component = other
+        ca.save()
+        self.assertEqual(self.get_cell().covered_requirement_count, 0)
+        self.assertEqual(ComponentStandard.objects.get(component=other).covered_requirement_count, 1)
+        ca.activity = Activity.objects.create(name='Pentest')
+        ca.save()
+        self.assertEqual(ComponentStandard.objects.get(component=other).covered_requirement_count, 0)
+
+    def test_cell_refreshes_on_requirement_changes(self):
+        ComponentActivity.objects.create(component=self.component, activity=self.activity, status=ComponentActivity.DONE)
+        self.activity.requirements.add(self.second)
+        self.assertEqual(self.get_cell().compliance_percentage, 100)
+        self.activity.requirements.clear()
+        self.assertEqual(self.get_cell().covered_requirement_count, 0)
+        Requirement.objects.create(standard=self.standard, definition='Train the staff')
+        self.assertEqual(self.get_cell().requirement_count, 3)
+
+    def test_cell_refreshes_when_requirement_moves(self):
+        other = Standard.objects.create(name='SOC 2', code='SOC2')
+        other.components.add(self.component)
+        ComponentActivity.objects.create(component=self.component, activity=self.activity, status=ComponentActivity.DONE)
+        self.first.standard = other
+        self.first.save()
+        self.assertEqual((self.get_cell().covered_requirement_count, self.get_cell().requirement_count), (0, 1))
+        cell = ComponentStandard.objects.get(component=self.component, standard=other)
+        self.assertEqual((cell.covered_requirement_count, cell.requirement_count), (1, 1))
+        requirement = Requirement.objects.get(pk=self.second.pk)
+        Requirement.objects.filter(pk=requirement.pk).update(standard=other)
+        requirement.delete()
+        cell.refresh_from_db()
+        self.assertEqual((cell.covered_requirement_count, cell.requirement_count), (1, 1))
+
+    def test_cell_refreshes_when_links_are_deleted_by_a_queryset(self):
+        ComponentActivity.objects.create(component=self.component, activity=self.activity, status=ComponentActivity.DONE)
+        self.activity.requirements.remove(self.second)
+        self.assertEqual(self.get_cell().covered_requirement_count, 1)
+        ActivityRequirement.objects.filter(activity=self.activity).delete()
+        self.assertEqual(self.get_cell().covered_requirement_count, 0)
+
+    def test_rebuild_command(self):
+        ComponentActivity.objects.create(component=self.component, activity=self.activity, status=ComponentActivity.DONE)
+        ComponentStandard.objects.update(requirement_count=0, covered_requirement_count=0)
+        call_command('rebuild_compliance_matrix', stdout=StringIO())
+        self.assertEqual((self.get_cell().covered_requirement_count, self.get_cell().requirement_count), (1, 2))
+
+    def test_matrix_view(self):
+        response = self.client.get(reverse('compliance_matrix'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'core/compliance_matrix.html')
+        self.assertContains(response, '0%')
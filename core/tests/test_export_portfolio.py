@@ -0,0 +1,74 @@
+import csv
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from core.models import Activity, Campaign, Component, ComponentActivity, ComponentFeature, Contact, Feature, Software
+from core.portfolio_export import buffered
+
+
+class ExportPortfolioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        software = Software.objects.create(name='OpenShift')
+        engineering = Contact.objects.create(name='Eng', email='eng@example.com', type=Contact.ENGINEERING)
+        kubelet = Component.objects.create(name='Kubelet', software=software, engineering_contact=engineering, description='Node agent', general_availability_date=datetime.date(2025, 3, 1))
+        Component.objects.create(name='CRI-O', software=software)
+        cf = ComponentFeature.objects.create(component=kubelet, feature=Feature.objects.create(name='FIPS'), status=ComponentFeature.IN_PROGRESS, priority=ComponentFeature.HIGH)
+        ca = ComponentActivity.objects.create(component=kubelet, activity=Activity.objects.create(name='SAR'), execution_end_date=datetime.date(2025, 1, 31), notes='Passed')
+        cf.campaigns.add(Campaign.objects.create(name='FIPS readiness'))
+        ca.campaigns.add(Campaign.objects.create(name='SBOM'), Campaign.objects.get(name='FIPS readiness'))
+
+    def get(self, name):
+        response = self.client.get(reverse(name))
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response, content = self.get('portfolio_export_csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="portfolio.csv"')
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([(row['type'], row['component'], row['feature'], row['activity']) for row in rows], [
+            ('component', 'CRI-O', '', ''),
+            ('component', 'Kubelet', '', ''),
+            ('feature', 'Kubelet', 'FIPS', ''),
+            ('activity', 'Kubelet', '', 'SAR'),
+        ])
+        self.assertEqual((rows[1]['engineering_contact'], rows[1]['general_availability_date']), ('Eng', '2025-03-01'))
+        self.assertEqual((rows[2]['status'], rows[2]['priority'], rows[2]['campaigns']), ('In Progress', 'High', 'FIPS readiness'))
+        self.assertEqual((rows[3]['execution_end_date'], rows[3]['campaigns']), ('2025-01-31', 'FIPS readiness; SBOM'))
+
+    def test_ndjson(self):
+        _, content = self.get('portfolio_export_ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[3]['campaigns'], ['FIPS readiness', 'SBOM'])
+        self.assertEqual(rows[3]['execution_end_date'], '2025-01-31')
+        self.assertIsNone(rows[3]['estimated_completion_date'])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for i in range(20):
+            component = Component.objects.create(name=f'Component {i}', software=Software.objects.get())
+            ComponentFeature.objects.create(component=component, feature=Feature.objects.get())
+        # One joined query each for components, features and activities.
+        with self.assertNumQueries(3):
+            self.get('portfolio_export_csv')
+
+    def test_buffered(self):
+        self.assertEqual(list(buffered(['header\n'] + [f'{i}\n' for i in range(5)], size=2)), ['header\n', '0\n1\n', '2\n3\n', '4\n'])
+        self.assertEqual(list(buffered([])), [''])
+
+    def test_round_trip(self):
+        _, content = self.get('portfolio_export_csv')
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.unlink, f.name)
+        stdout = StringIO()
+        call_command('import_portfolio', f.name, dry_run=True, stdout=stdout)
+        self.assertIn('component unchanged: 2', stdout.getvalue())
+        self.assertIn('feature unchanged: 1', stdout.getvalue())
+        self.assertIn('activity unchanged: 1', stdout.getvalue())
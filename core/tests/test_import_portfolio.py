@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from core.models import Activity, Campaign, Component, ComponentActivity, ComponentFeature, Contact, Feature, Software
+from core.portfolio_import import PortfolioImporter, read_json
+
+CSV = """type,software,component,engineering_contact,description,feature,activity,status,priority,campaigns
+component,OpenShift,Kubelet,Eng,Node agent,,,,,
+component,OpenShift,CRI-O,,,,,,,
+feature,,Kubelet,,FIPS mode,FIPS,,In Progress,High,FIPS readiness
+activity,,Kubelet,,,,SAR,3,,FIPS readiness; SBOM
+activity,,CRI-O,,,,SAR,,,
+"""
+
+
+class ImportPortfolioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Software.objects.create(name='OpenShift')
+        Contact.objects.create(name='Eng', email='eng@example.com', type=Contact.ENGINEERING)
+        Contact.objects.create(name='Bus', email='bus@example.com', type=Contact.BUSINESS)
+        Feature.objects.create(name='FIPS')
+        Activity.objects.create(name='SAR')
+        Campaign.objects.create(name='FIPS readiness')
+        Campaign.objects.create(name='SBOM')
+
+    def import_file(self, content, suffix='.csv', **options):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.unlink, f.name)
+        stdout = StringIO()
+        call_command('import_portfolio', f.name, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_creates_components_features_and_activities(self):
+        output = self.import_file(CSV)
+        kubelet = Component.objects.get(name='Kubelet')
+        self.assertEqual(kubelet.engineering_contact.name, 'Eng')
+        self.assertEqual(kubelet.description, 'Node agent')
+        cf = ComponentFeature.objects.get(component=kubelet)
+        self.assertEqual((cf.feature.name, cf.status, cf.priority, cf.description), ('FIPS', 2, 3, 'FIPS mode'))
+        self.assertEqual([campaign.name for campaign in cf.campaigns.all()], ['FIPS readiness'])
+        ca = ComponentActivity.objects.get(component=kubelet)
+        self.assertEqual(ca.status, 3)
+        self.assertEqual(sorted(campaign.name for campaign in ca.campaigns.all()), ['FIPS readiness', 'SBOM'])
+        self.assertEqual(ComponentActivity.objects.get(component__name='CRI-O').status, ComponentActivity.TO_DO)
+        self.assertIn('component create: 2', output)
+        self.assertIn('row 3: create feature Kubelet - FIPS', output)
+
+    def test_reimport_updates_only_what_changed(self):
+        self.import_file(CSV)
+        before = Component.objects.get(name='CRI-O').modification_datetime
+        output = self.import_file(CSV.replace('Node agent', 'Node daemon').replace(',3,', ',2,'))
+        self.assertIn("row 1: update component Kubelet\n    description: 'Node agent' -> 'Node daemon'", output)
+        self.assertIn('component unchanged: 1', output)
+        self.assertIn('activity update: 1', output)
+        self.assertEqual(ComponentActivity.objects.get(component__name='Kubelet').status, 2)
+        self.assertGreater(Component.objects.get(name='Kubelet').modification_datetime, before)
+        self.assertEqual(Component.objects.get(name='CRI-O').modification_datetime, before)
+
+    def test_dry_run_reports_without_writing(self):
+        output = self.import_file(CSV, dry_run=True)
+        self.assertIn('row 1: create component Kubelet', output)
+        self.assertIn('Dry run', output)
+        self.assertFalse(Component.objects.exists())
+
+    def test_row_errors_roll_everything_back(self):
+        content = CSV + 'feature,,Kubelet,,,Unknown,,,,\nactivity,,Kubelet,,,,SAR,Later,,\ncomponent,,etcd,Bus,,,,,,\n'
+        with self.assertRaisesMessage(CommandError, '3 rows have errors'):
+            self.import_file(content)
+        self.assertFalse(Component.objects.exists())
+
+    def test_row_errors_are_listed(self):
+        report = PortfolioImporter().run(enumerate([
+            {'type': 'feature', 'component': 'Kubelet', 'feature': 'FIPS'},
+            {'type': 'component', 'component': 'etcd', 'software': 'OpenShift', 'engineering_contact': 'Bus'},
+            {'type': 'gadget', 'component': 'etcd'},
+            {'type': 'activity', 'component': 'etcd', 'activity': 'SAR', 'execution_end_date': 'tomorrow'},
+        ], start=1))
+        self.assertEqual(report.errors, [
+            (1, "unknown component 'Kubelet'"),
+            (2, "'Bus' is a Business contact, expected Engineering"),
+            (3, "unknown type 'gadget', expected component, feature or activity"),
+            (4, "'tomorrow' is not a YYYY-MM-DD date"),
+        ])
+
+    def test_json_array_and_lines(self):
+        rows = [
+            {'type': 'component', 'software': 'OpenShift', 'component': 'Kubelet'},
+            {'type': 'feature', 'component': 'Kubelet', 'feature': 'FIPS', 'campaigns': ['SBOM']},
+        ]
+        self.import_file(json.dumps(rows), suffix='.json')
+        self.assertEqual(ComponentFeature.objects.get().campaigns.get().name, 'SBOM')
+        self.assertEqual(list(read_json(StringIO('\n'.join(json.dumps(row) for row in rows)), chunk_size=7)), list(enumerate(rows, start=1)))
+        with self.assertRaises(ValueError):
+            list(read_json(StringIO(json.dumps(rows)[:-3])))
+
+    def test_lookups_are_batched(self):
+        rows = [('component', f'Component {i}') for i in range(20)] + [('feature', f'Component {i}') for i in range(20)]
+        content = 'type,software,component,feature\n' + ''.join(f'{kind},OpenShift,{name},FIPS\n' for kind, name in rows)
+        # The savepoint; the component and software lookups and the insert of
+        # the first batch; the feature and component feature lookups and the
+        # insert of the second. Names already looked up are not queried again.
+        with self.assertNumQueries(8):
+            self.import_file(content, batch_size=20)
+        self.assertEqual(ComponentFeature.objects.count(), 20)
+
+    def test_upload_view(self):
+        upload = SimpleUploadedFile('portfolio.csv', CSV.encode())
+        response = self.client.post(reverse('portfolio_import'), {'file': upload, 'dry_run': 'on'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Dry run')
+        self.assertContains(response, 'create component Kubelet')
+        self.assertFalse(Component.objects.exists())
+        upload = SimpleUploadedFile('portfolio.csv', CSV.encode())
+        response = self.client.post(reverse('portfolio_import'), {'file': upload})
+        self.assertContains(response, 'Imported')
+        self.assertEqual(Component.objects.count(), 2)
@@ -0,0 +1,49 @@
+from django.test import TestCase
+from core.forms import ComponentFeatureJiraTicketFormSet
+from core.models import Activity, Component, ComponentActivity, ComponentFeature, Document, Feature, JiraTicket, Link, Result, Software
+
+
+class LinkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        component = Component.objects.create(name='Kubelet', software=Software.objects.create(name='OpenShift'))
+        cls.cf = ComponentFeature.objects.create(component=component, feature=Feature.objects.create(name='FIPS'))
+        cls.ca = ComponentActivity.objects.create(component=component, activity=Activity.objects.create(name='SAR'))
+        JiraTicket.objects.create(name='JIRA-1', url='https://issues.example.com/', component_feature=cls.cf)
+        Result.objects.create(name='Result 1', url='https://results.example.com/', component_feature=cls.cf)
+        Document.objects.create(name='Document 1', url='https://docs.example.com/', component_activity=cls.ca)
+
+    def test_links_share_one_table(self):
+        self.assertEqual(
+            sorted(Link.objects.values_list('kind', 'name')),
+            [(Link.DOCUMENT, 'Document 1'), (Link.JIRA_TICKET, 'JIRA-1'), (Link.RESULT, 'Result 1')],
+        )
+        self.assertEqual([link.name for link in JiraTicket.objects.all()], ['JIRA-1'])
+
+    def test_related_links_are_limited_to_their_kind(self):
+        self.assertEqual([link.name for link in self.cf.jira_tickets], ['JIRA-1'])
+        self.assertEqual([link.name for link in self.cf.results], ['Result 1'])
+        self.assertEqual(self.cf.documents, [])
+        self.assertEqual([link.name for link in self.ca.related_links(Link.DOCUMENT)], ['Document 1'])
+
+    def test_related_links_use_the_prefetched_links(self):
+        with self.assertNumQueries(2):
+            cf = ComponentFeature.objects.prefetch_related('links').get(pk=self.cf.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual([link.name for link in cf.jira_tickets], ['JIRA-1'])
+            self.assertEqual([link.name for link in cf.results], ['Result 1'])
+            self.assertEqual(cf.documents, [])
+
+    def test_inline_formset_saves_the_kind(self):
+        formset = ComponentFeatureJiraTicketFormSet({
+            'jira-TOTAL_FORMS': '2',
+            'jira-INITIAL_FORMS': '1',
+            'jira-0-id': str(JiraTicket.objects.get(component_feature=self.cf).pk),
+            'jira-0-name': 'JIRA-1',
+            'jira-0-url': 'https://issues.example.com/',
+            'jira-1-name': 'JIRA-2',
+            'jira-1-url': 'https://issues.example.com/2',
+        }, instance=self.cf, prefix='jira')
+        self.assertTrue(formset.is_valid(), formset.errors)
+        formset.save()
+        self.assertEqual(sorted(self.cf.links.values_list('kind', 'name')), [(Link.JIRA_TICKET, 'JIRA-1'), (Link.JIRA_TICKET, 'JIRA-2'), (Link.RESULT, 'Result 1')])
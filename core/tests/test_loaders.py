@@ -0,0 +1,78 @@
+import json
+from django.test import TestCase
+from django.urls import reverse
+from core.models import Activity, Campaign, Component, ComponentActivity, Contact, Document, JiraTicket, Software
+
+QUERY = {
+    'type': 'campaigns',
+    'fields': ['name'],
+    'include': {
+        'component_activities': {
+            'fields': ['status'],
+            'include': {
+                'component': {
+                    'fields': ['name'],
+                    'include': {
+                        'software': {'fields': ['name']},
+                        'engineering_contact': {'fields': ['name', 'email']},
+                    },
+                },
+                'jira_tickets': {'fields': ['name']},
+                'documents': {'fields': ['url']},
+            },
+        },
+    },
+}
+
+
+class NestedQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        software = Software.objects.create(name='OpenShift')
+        contact = Contact.objects.create(name='Eng', email='eng@example.com', type=Contact.ENGINEERING)
+        cls.campaign = Campaign.objects.create(name='FIPS readiness')
+        for name in ['Kubelet', 'CRI-O']:
+            component = Component.objects.create(name=name, software=software, engineering_contact=contact)
+            for activity in ['SAR', 'Pentest']:
+                ca = ComponentActivity.objects.create(component=component, activity=Activity.objects.get_or_create(name=activity)[0])
+                ca.campaigns.add(cls.campaign)
+                JiraTicket.objects.create(name=f'{name} {activity}', url='https://issues.example.com/', component_activity=ca)
+        Document.objects.create(name='Report', url='https://docs.example.com/', component_activity=ComponentActivity.objects.first())
+
+    def query(self, document):
+        return self.client.post(reverse('api_query'), json.dumps(document), content_type='application/json')
+
+    def test_nested_query(self):
+        response = self.query(QUERY)
+        self.assertEqual(response.status_code, 200)
+        [campaign] = response.json()['data']
+        self.assertEqual(campaign['name'], 'FIPS readiness')
+        activities = campaign['component_activities']
+        self.assertEqual(len(activities), 4)
+        component = activities[0]['component']
+        self.assertEqual(set(component), {'id', 'name', 'software', 'engineering_contact'})
+        self.assertEqual(component['software']['name'], 'OpenShift')
+        self.assertEqual(component['engineering_contact'], {'id': Contact.objects.get().pk, 'name': 'Eng', 'email': 'eng@example.com'})
+        self.assertEqual(sorted(ticket['name'] for activity in activities for ticket in activity['jira_tickets']), ['CRI-O Pentest', 'CRI-O SAR', 'Kubelet Pentest', 'Kubelet SAR'])
+        self.assertEqual(sum(len(activity['documents']) for activity in activities), 1)
+
+    def test_one_query_per_relation(self):
+        for i in range(5):
+            campaign = Campaign.objects.create(name=f'Campaign {i}')
+            campaign.component_activities.set(ComponentActivity.objects.all())
+        # Campaigns, component activities, components, software, contacts,
+        # Jira tickets and documents, however many rows each level has.
+        with self.assertNumQueries(7):
+            response = self.query(QUERY)
+        self.assertEqual(len(response.json()['data']), 6)
+
+    def test_get_with_ids(self):
+        response = self.client.get(reverse('api_query'), {'q': json.dumps({'type': 'components', 'ids': [Component.objects.get(name='CRI-O').pk], 'fields': ['name']})})
+        self.assertEqual([row['name'] for row in response.json()['data']], ['CRI-O'])
+
+    def test_errors(self):
+        for document in [[], {'type': 'gadgets'}, {'type': 'campaigns', 'fields': ['secret']}, {'type': 'campaigns', 'include': {'contacts': {}}}, {'type': 'campaigns', 'limit': 0}, {'type': 'campaigns', 'sort': 'name'}]:
+            response = self.query(document)
+            self.assertEqual(response.status_code, 400, document)
+            self.assertIn('errors', response.json())
+        self.assertEqual(self.client.post(reverse('api_query'), '{', content_type='application/json').status_code, 400)
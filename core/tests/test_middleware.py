@@ -0,0 +1,41 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core.models import Software, Component
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.software = Software.objects.create(name='OpenShift')
+        for name in ['Kubelet', 'CRI-O', 'etcd']:
+            Component.objects.create(name=name, software=cls.software)
+
+    @override_settings(QUERY_BUDGETS={'software_detail': 1})
+    def test_logs_over_budget_requests_with_repeated_statements(self):
+        with self.assertLogs('core.querybudget', 'WARNING') as logs:
+            response = self.client.get(reverse('software_detail', kwargs={'pk': self.software.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('Query budget exceeded for software_detail', logs.output[0])
+        self.assertIn('Most repeated statements:\n  2x SELECT', logs.output[0])
+        self.assertEqual(response.wsgi_request.query_stats.count, 4)
+
+    @override_settings(QUERY_BUDGETS={}, QUERY_BUDGET_DEFAULT=10)
+    def test_within_budget_requests_are_not_logged(self):
+        with self.assertNoLogs('core.querybudget', 'WARNING'):
+            self.client.get(reverse('software_list'))
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    @override_settings(SERVER_TIMING=True)
+    def test_header_breaks_request_time_down(self):
+        Software.objects.create(name='OpenShift')
+        response = self.client.get(reverse('software_list'))
+        metrics = dict(metric.split(';', 1) for metric in response['Server-Timing'].split(', '))
+        self.assertEqual(set(metrics), {'total', 'view', 'render', 'middleware', 'db'})
+        self.assertIn('desc="2 queries"', metrics['db'])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse('software_list'))
+        self.assertNotIn('Server-Timing', response)
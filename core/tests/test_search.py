@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.models import Activity, Component, ComponentActivity, ComponentFeature, ComponentStandard, Feature, Requirement, Software, Standard, Threat
+from core.search import search
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        software = Software.objects.create(name='OpenShift')
+        cls.kubelet = Component.objects.create(name='Kubelet', software=software, description='Node agent with FIPS validated crypto')
+        cls.crio = crio = Component.objects.create(name='CRI-O', software=software)
+        cls.fips = Feature.objects.create(name='FIPS', description='Validated cryptographic modules')
+        ComponentFeature.objects.create(component=crio, feature=cls.fips, description='Uses the host FIPS & OpenSSL provider')
+        ComponentActivity.objects.create(component=crio, activity=Activity.objects.create(name='SAR'), notes='Passed, no FIPS findings')
+        Requirement.objects.create(standard=Standard.objects.create(name='FIPS 140-3', code='FIPS'), code='AS02.01', definition='Cryptographic modules shall use approved algorithms')
+        Threat.objects.create(name='Weak crypto', description='Unapproved algorithms')
+
+    def test_ranks_matches_across_models(self):
+        results = search('fips')
+        self.assertEqual(results[0]['title'], 'FIPS')
+        self.assertEqual(results[0]['url'], self.fips.get_absolute_url())
+        self.assertEqual({result['kind'] for result in results}, {'Component', 'Feature', 'Component feature', 'Component activity'})
+        feature = next(result for result in results if result['kind'] == 'Component feature')
+        self.assertEqual((feature['title'], feature['url']), ('CRI-O - FIPS', self.crio.get_absolute_url()))
+        self.assertEqual(feature['snippet'], 'Uses the host <mark>FIPS</mark> &amp; OpenSSL provider')
+
+    def test_stemming_and_web_search_syntax(self):
+        self.assertEqual({result['kind'] for result in search('algorithm')}, {'Requirement', 'Threat'})
+        self.assertEqual([result['kind'] for result in search('algorithm -weak')], ['Requirement'])
+        self.assertEqual([result['title'] for result in search('"validated crypto"')], ['Kubelet'])
+
+    def test_vectors_follow_updates(self):
+        Component.objects.filter(pk=self.kubelet.pk).update(description='Node agent')
+        self.assertNotIn('Kubelet', [result['title'] for result in search('validated')])
+
+    def test_view(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('search'), {'q': 'fips'})
+        self.assertContains(response, '<mark>FIPS</mark>')
+        self.assertContains(self.client.get(reverse('search'), {'q': 'kubernetes'}), 'Nothing matches')
+
+    def test_vectors_are_not_loaded_with_rows(self):
+        querysets = [
+            Component.objects.all(),
+            ComponentActivity.objects.select_related('component__software', 'activity'),
+            ComponentStandard.objects.select_related('component', 'standard'),
+            self.crio.component_features.all(),
+        ]
+        for queryset in querysets:
+            with CaptureQueriesContext(connection) as queries:
+                list(queryset)
+            self.assertNotIn('search_vector', queries[0]['sql'])
@@ -0,0 +1,53 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from core.models import Software, Component, ComponentFeature, ComponentActivity, ComponentActivityCampaign, ComponentStandard, JiraTicket, Link, Requirement
+
+
+class SeedPortfolioCommandTests(TestCase):
+    options = {
+        'software': 2, 'components': 3, 'features': 20, 'activities': 8, 'campaigns': 2,
+        'standards': 2, 'requirements': 10, 'contacts': 3, 'batch_size': 7,
+    }
+
+    def seed(self, **options):
+        call_command('seed_portfolio', stdout=StringIO(), **{**self.options, **options})
+
+    def snapshot(self, prefix):
+        # The rows seeded with ``prefix``, with the prefix and the primary
+        # keys left out.
+        def rows(queryset, *fields):
+            values = queryset.values_list(*fields)
+            return sorted(tuple(value.removeprefix(prefix) if isinstance(value, str) else value for value in row) for row in values)
+
+        components = Component.objects.filter(name__startswith=f'{prefix} ')
+        return [
+            rows(components, 'name', 'software__name', 'engineering_contact__name', 'business_contact__name', 'psrd_contact__name'),
+            rows(ComponentFeature.objects.filter(component__in=components), 'component__name', 'feature__name', 'status'),
+            rows(ComponentActivity.objects.filter(component__in=components), 'component__name', 'activity__name', 'status'),
+            rows(ComponentActivityCampaign.objects.filter(component_activity__component__in=components), 'component_activity__component__name', 'component_activity__activity__name', 'campaign__name'),
+            rows(Requirement.objects.filter(code__startswith=f'{prefix}-'), 'code', 'activities__name'),
+            rows(ComponentStandard.objects.filter(component__in=components), 'component__name', 'standard__name', 'covered_requirement_count'),
+            rows(Link.objects.filter(component_activity__component__in=components), 'component_activity__component__name', 'component_activity__activity__name', 'kind'),
+            rows(Link.objects.filter(component_feature__component__in=components), 'component_feature__component__name', 'component_feature__feature__name', 'kind'),
+        ]
+
+    def test_generates_the_requested_volumes(self):
+        self.seed()
+        self.assertEqual(Software.objects.count(), 2)
+        self.assertEqual(Component.objects.count(), 6)
+        self.assertEqual(Requirement.objects.count(), 20)
+        self.assertTrue(JiraTicket.objects.exists())
+        self.assertEqual(Link.objects.count(), sum(model.objects.count() for model in Link.__subclasses__()))
+        cell = ComponentStandard.objects.order_by('pk').first()
+        self.assertIsNotNone(cell)
+        self.assertEqual(cell.requirement_count, 10)
+
+    def test_same_seed_same_portfolio(self):
+        self.seed(seed=42, prefix='first')
+        self.seed(seed=42, prefix='again')
+        first = self.snapshot('first')
+        self.assertTrue(all(first))
+        self.assertEqual(first, self.snapshot('again'))
+        self.seed(seed=7, prefix='other')
+        self.assertNotEqual(first, self.snapshot('other'))
@@ -0,0 +1,121 @@
+import datetime
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from core.models import Activity, Campaign, Component, ComponentActivity, ComponentFeature, Feature, Software
+
+
+# The component page reads its cached fragments.
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class StatusGridTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        software = Software.objects.create(name='OpenShift')
+        cls.campaign = Campaign.objects.create(name='FIPS readiness')
+        activities = [Activity.objects.create(name=f'Activity {i}') for i in range(5)]
+        features = [Feature.objects.create(name=f'Feature {i}') for i in range(2)]
+        for i in range(6):
+            component = Component.objects.create(name=f'Component {i}', software=software)
+            for activity in activities:
+                ComponentActivity.objects.create(component=component, activity=activity).campaigns.add(cls.campaign)
+            for feature in features:
+                ComponentFeature.objects.create(component=component, feature=feature).campaigns.add(cls.campaign)
+        cls.url = reverse('campaign_status_grid', kwargs={'pk': cls.campaign.pk})
+
+    def data(self, activity_changes=None, feature_changes=None):
+        # The grid as the browser submits it, with some rows changed.
+        data = {}
+        for prefix, queryset, fields, changes in [
+            ('activities', ComponentActivity.objects.all(), ['status', 'execution_start_date', 'execution_end_date', 'estimated_completion_date'], activity_changes or {}),
+            ('features', ComponentFeature.objects.all(), ['status'], feature_changes or {}),
+        ]:
+            rows = list(queryset)
+            data.update({f'{prefix}-TOTAL_FORMS': len(rows), f'{prefix}-INITIAL_FORMS': len(rows)})
+            for i, row in enumerate(rows):
+                data[f'{prefix}-{i}-id'] = row.pk
+                data[f'{prefix}-{i}-loaded'] = row.modification_datetime.isoformat()
+                for field in fields:
+                    value = getattr(row, field)
+                    data[f'initial-{prefix}-{i}-{field}'] = '' if value is None else value
+                    value = changes.get(row.pk, {}).get(field, value)
+                    data[f'{prefix}-{i}-{field}'] = '' if value is None else value
+        return data
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['activity_formset'].forms), 30)
+        self.assertEqual(len(response.context['feature_formset'].forms), 12)
+        self.assertContains(response, 'name="activities-29-execution_end_date"')
+        self.assertContains(response, 'name="initial-activities-29-execution_end_date"')
+        self.assertContains(response, 'name="activities-29-loaded"')
+
+    def test_bulk_update(self):
+        activities = list(ComponentActivity.objects.all()[:20])
+        feature = ComponentFeature.objects.first()
+        done = datetime.date(2026, 3, 31)
+        data = self.data(
+            {activity.pk: {'status': ComponentActivity.DONE, 'execution_end_date': done} for activity in activities},
+            {feature.pk: {'status': ComponentFeature.IN_PROGRESS}},
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data)
+        self.assertEqual(len(queries), 16)
+        # The rows are locked before they are compared with the posted ones.
+        locked = [query['sql'] for query in queries if 'FOR UPDATE' in query['sql']]
+        self.assertEqual(len(locked), 2)
+        self.assertIn('FOR UPDATE OF "core_componentactivity"', locked[0])
+        self.assertRedirects(response, self.campaign.get_absolute_url(), fetch_redirect_response=False)
+        self.assertEqual(ComponentActivity.objects.filter(status=ComponentActivity.DONE, execution_end_date=done).count(), 20)
+        self.assertEqual(ComponentFeature.objects.get(status=ComponentFeature.IN_PROGRESS), feature)
+        self.assertGreater(ComponentActivity.objects.get(pk=activities[0].pk).modification_datetime, activities[0].modification_datetime)
+
+    def test_stale_rows_are_not_written(self):
+        first, second = ComponentActivity.objects.all()[:2]
+        data = self.data({first.pk: {'status': ComponentActivity.DONE}, second.pk: {'status': ComponentActivity.IN_PROGRESS}})
+        # Changed by someone else after the grid was loaded.
+        ComponentActivity.objects.filter(pk=first.pk).update(status=ComponentActivity.IN_PROGRESS, modification_datetime=timezone.now())
+        third = ComponentActivity.objects.all()[2]
+        third.notes = 'Rescheduled'
+        third.status = ComponentActivity.IN_PROGRESS
+        third.save()
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Changed by someone else since the page was loaded')
+        self.assertEqual(list(response.context['activity_formset'].errors[0]), ['__all__'])
+        self.assertEqual(ComponentActivity.objects.get(pk=second.pk).status, ComponentActivity.TO_DO)
+
+        # Rows the user left alone are not written back with the values they
+        # were shown with.
+        data = self.data({second.pk: {'status': ComponentActivity.IN_PROGRESS}})
+        third.status = ComponentActivity.DONE
+        third.save()
+        self.assertEqual(self.client.post(self.url, data).status_code, 302)
+        self.assertEqual(ComponentActivity.objects.get(pk=second.pk).status, ComponentActivity.IN_PROGRESS)
+        self.assertEqual(ComponentActivity.objects.get(pk=third.pk).status, ComponentActivity.DONE)
+
+    def test_errors_are_shown_inline(self):
+        activities = list(ComponentActivity.objects.all()[:2])
+        response = self.client.post(self.url, self.data({
+            activities[0].pk: {'status': ComponentActivity.DONE},
+            activities[1].pk: {'execution_start_date': 'soon', 'status': 7},
+        }))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Enter a valid date.')
+        self.assertContains(response, 'Select a valid choice. 7 is not one of the available choices.')
+        self.assertEqual(list(response.context['activity_formset'].errors[1]), ['status', 'execution_start_date'])
+        self.assertFalse(ComponentActivity.objects.filter(status=ComponentActivity.DONE).exists())
+
+        # Rows of other campaigns cannot be edited through this one.
+        other = ComponentActivity.objects.create(component=Component.objects.first(), activity=Activity.objects.create(name='Pentest'))
+        data = self.data()
+        data['activities-0-id'] = other.pk
+        self.assertEqual(list(self.client.post(self.url, data).context['activity_formset'].errors[0]), ['id'])
+
+    def test_component_grid(self):
+        component = Component.objects.get(name='Component 0')
+        response = self.client.get(reverse('component_status_grid', kwargs={'pk': component.pk}))
+        self.assertEqual(len(response.context['activity_formset'].forms), 5)
+        self.assertContains(self.client.get(component.get_absolute_url()), reverse('component_status_grid', kwargs={'pk': component.pk}))
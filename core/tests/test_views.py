@@ -1,6 +1,16 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from core.models import Software, Feature, Activity, Threat, Campaign
+from django.utils import timezone
+from core.models import Software, Feature, Activity, Threat, Campaign, Component, Contact, ComponentFeature, ComponentActivity, JiraTicket, Result, Document, Standard, Requirement, FeatureCategory
+from core.pagination import encode_cursor
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
 
 ########################################################
 ####### Start Test List views ##########################
@@ -36,6 +46,38 @@ class FeatureListViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'core/feature_list.html')
 
+    def test_view_groups_features_in_a_single_query(self):
+        crypto = FeatureCategory.objects.create(name='Cryptography')
+        isolation = FeatureCategory.objects.create(name='Isolation')
+        fips = Feature.objects.create(name='FIPS', category=crypto)
+        Feature.objects.create(name='TLS 1.3', category=crypto)
+        Feature.objects.create(name='SELinux', category=isolation)
+        Feature.objects.create(name='SBOM')
+        software = Software.objects.create(name='OpenShift')
+        for name in ['Kubelet', 'CRI-O']:
+            ComponentFeature.objects.create(component=Component.objects.create(name=name, software=software), feature=fips)
+        # The conditional GET validators, the page and the category totals.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('feature_list'))
+        groups = response.context['feature_groups']
+        self.assertEqual([group['category'] for group in groups], [crypto, isolation, None])
+        self.assertEqual([feature.name for feature in groups[0]['features']], ['FIPS', 'TLS 1.3'])
+        self.assertEqual(groups[0]['adoption_count'], 2)
+        self.assertEqual(groups[0]['features'][0].adoption_count, 2)
+        self.assertContains(response, 'No category')
+
+    def test_view_counts_categories_across_pages(self):
+        crypto = FeatureCategory.objects.create(name='Cryptography')
+        isolation = FeatureCategory.objects.create(name='Isolation')
+        Feature.objects.bulk_create(Feature(name=f'Cipher {i:02}', category=crypto) for i in range(49))
+        Feature.objects.bulk_create(Feature(name=f'Namespace {i}', category=isolation) for i in range(3))
+        first = self.client.get(reverse('feature_list'))
+        second = self.client.get(reverse('feature_list') + first.context['next_page_url'])
+        for response, count in [(first, 1), (second, 2)]:
+            group = response.context['feature_groups'][-1]
+            self.assertEqual((group['category'], len(group['features']), group['feature_count']), (isolation, count, 3))
+            self.assertContains(response, '(3 features, 0 component uses)')
+
 class ThreatListViewTests(TestCase):
     def test_view_url_exists_at_desired_location(self):
         response = self.client.get('/threats/')
@@ -81,6 +123,81 @@ class StandardListViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'core/standard_list.html')
 
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Software.objects.bulk_create([Software(name=f'Software {i:03}') for i in range(120)])
+        standards = [Standard.objects.create(name=f'Standard {i}', code=f'S{i}') for i in range(3)]
+        Requirement.objects.bulk_create([Requirement(standard=standards[i % 3], definition=f'Requirement {i}', name=f'R{i:02}') for i in range(60)])
+
+    def walk(self, url, key):
+        names, response = [], self.client.get(url)
+        while True:
+            names.extend(str(obj) for obj in response.context[key])
+            if 'next_page_url' not in response.context:
+                return names, response
+            response = self.client.get(url.split('?')[0] + response.context['next_page_url'])
+
+    def test_walks_all_pages_forward_and_back(self):
+        names, last = self.walk(reverse('software_list'), 'software_list')
+        self.assertEqual(names, [f'Software {i:03}' for i in range(120)])
+        self.assertEqual(len(last.context['software_list']), 20)
+        previous = self.client.get(reverse('software_list') + last.context['previous_page_url'])
+        self.assertEqual(str(previous.context['software_list'][0]), 'Software 050')
+        self.assertIn('next_page_url', previous.context)
+
+    def test_sorts_descending_on_whitelisted_columns(self):
+        names, _ = self.walk(reverse('software_list') + '?sort=-name', 'software_list')
+        self.assertEqual(names, [f'Software {i:03}' for i in reversed(range(120))])
+        response = self.client.get(reverse('software_list') + '?sort=description')
+        self.assertEqual(str(response.context['software_list'][0]), 'Software 000')
+
+    def test_list_answers_if_modified_since(self):
+        url = reverse('software_list')
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, headers={'If-Modified-Since': last_modified}).status_code, 304)
+        # Last-Modified has a one second resolution.
+        Software.objects.filter(name='Software 000').update(modification_datetime=timezone.now() + datetime.timedelta(seconds=2))
+        self.assertEqual(self.client.get(url, headers={'If-Modified-Since': last_modified}).status_code, 200)
+
+    def test_list_validators_only_read_the_page(self):
+        url = reverse('software_list')
+        with CaptureQueriesContext(connection) as queries:
+            etag = self.client.get(url)['ETag']
+        self.assertIn('LIMIT 51', queries[0]['sql'])
+        # Rows past the page leave it alone, deleting one of its rows brings
+        # the next one in.
+        Software.objects.filter(name='Software 100').update(modification_datetime=timezone.now() + datetime.timedelta(seconds=2))
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+        Software.objects.filter(name='Software 010').delete()
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_requirement_list_single_query(self):
+        # The conditional GET validators and the page.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('requirement_list') + '?sort=standard')
+        self.assertEqual(response.context['requirement_list'][0].standard.name, 'Standard 0')
+
+    def test_offset_pagination_still_available(self):
+        response = self.client.get(reverse('software_list') + '?page=3')
+        self.assertEqual(str(response.context['software_list'][0]), 'Software 100')
+        response = self.client.get(reverse('software_list') + '?sort=-name&page=2')
+        self.assertEqual(response.context['previous_page_url'], '?sort=-name&page=1')
+        self.assertEqual(response.context['next_page_url'], '?sort=-name&page=3')
+        self.assertContains(response, 'href="?sort=-name&amp;page=3"')
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('software_list') + '?after=garbage')
+        self.assertEqual(response.status_code, 404)
+        for url, values in [
+            (reverse('software_list'), ['Software 010', 'x']),
+            (reverse('software_list'), [None, 1]),
+            (reverse('requirement_list') + '?sort=created', ['yesterday', 1]),
+            (reverse('feature_list'), [[], '', 'FIPS', 1]),
+        ]:
+            response = self.client.get(url, {'before': encode_cursor(values)})
+            self.assertEqual(response.status_code, 404, values)
+
 ########################################################
 ####### End Test List views ############################
 ########################################################
@@ -141,6 +258,7 @@ class ThreatDetailViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'core/threat_detail.html')
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class CampaignDetailViewTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -148,8 +266,339 @@ class CampaignDetailViewTests(TestCase):
             name='All components with a SAR',
             description='All components with a SAR activity',
         )
-    
+
+    def setUp(self):
+        cache.clear()
+
     def test_view_detail_campaign_exists(self):
         response = self.client.get(f'/campaigns/{self.campaign.pk}/')
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'core/campaign_detail.html')
+
+    def test_view_detail_campaign_status_totals(self):
+        software = Software.objects.create(name='OpenShift')
+        component = Component.objects.create(name='Kubelet', software=software)
+        for i, status in enumerate([1, 1, 2, 3]):
+            ca = ComponentActivity.objects.create(component=component, activity=Activity.objects.create(name=f'Activity {i}'), status=status)
+            ca.campaigns.add(self.campaign)
+        for i, status in enumerate([2, 3, 3]):
+            cf = ComponentFeature.objects.create(component=component, feature=Feature.objects.create(name=f'Feature {i}'), status=status)
+            cf.campaigns.add(self.campaign)
+        response = self.client.get(reverse('campaign_detail', kwargs={'pk': self.campaign.pk}))
+        self.assertEqual(response.context['todo_total'], 2)
+        self.assertEqual(response.context['in_progress_total'], 2)
+        self.assertEqual(response.context['done_total'], 3)
+        self.assertEqual(response.context['pending_total'], 4)
+        self.assertEqual(len(response.context['done_component_features']), 2)
+        self.assertEqual(len(response.context['component_activities']), 4)
+
+    def test_view_detail_campaign_query_count_is_constant(self):
+        software = Software.objects.create(name='OpenShift')
+        for i in range(5):
+            component = Component.objects.create(name=f'Component {i}', software=software)
+            ca = ComponentActivity.objects.create(component=component, activity=Activity.objects.create(name=f'Activity {i}'))
+            cf = ComponentFeature.objects.create(component=component, feature=Feature.objects.create(name=f'Feature {i}'))
+            ca.campaigns.add(self.campaign)
+            cf.campaigns.add(self.campaign)
+            JiraTicket.objects.create(name=f'JIRA-{i}', url='https://issues.example.com/', component_activity=ca)
+            Result.objects.create(name=f'Result {i}', url='https://results.example.com/', component_feature=cf)
+        with self.assertNumQueries(8):
+            response = self.client.get(reverse('campaign_detail', kwargs={'pk': self.campaign.pk}))
+        self.assertContains(response, 'JIRA-4')
+
+    def test_view_detail_campaign_tables_are_cached_until_changed(self):
+        url = reverse('campaign_detail', kwargs={'pk': self.campaign.pk})
+        component = Component.objects.create(name='Kubelet', software=Software.objects.create(name='OpenShift'))
+        ca = ComponentActivity.objects.create(component=component, activity=Activity.objects.create(name='SAR'))
+        cf = ComponentFeature.objects.create(component=component, feature=Feature.objects.create(name='FIPS'))
+        self.campaign.component_activities.add(ca)
+        self.campaign.component_features.add(cf)
+        ticket = JiraTicket.objects.create(name='JIRA-1', url='https://issues.example.com/', component_activity=ca)
+        self.client.get(url)
+        # The validators, the campaign and the two status totals.
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertContains(response, 'JIRA-1')
+        ticket.name = 'JIRA-2'
+        # The fragments are invalidated once the write commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.save()
+        self.assertContains(self.client.get(url), 'JIRA-2')
+        component.name = 'CRI-O'
+        with self.captureOnCommitCallbacks(execute=True):
+            component.save()
+        self.assertContains(self.client.get(url), 'CRI-O')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.component_features.clear()
+        self.assertContains(self.client.get(url), 'There are no component features.')
+
+    def test_view_detail_campaign_answers_conditional_requests(self):
+        url = reverse('campaign_detail', kwargs={'pk': self.campaign.pk})
+        component = Component.objects.create(name='Kubelet', software=Software.objects.create(name='OpenShift'))
+        ca = ComponentActivity.objects.create(component=component, activity=Activity.objects.create(name='SAR'))
+        self.campaign.component_activities.add(ca)
+        ticket = JiraTicket.objects.create(name='JIRA-1', url='https://issues.example.com/', component_activity=ca)
+        response = self.client.get(url)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        with self.settings(RELEASE='next'):
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+        ticket.delete()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.campaign.component_activities.remove(ca)
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_view_campaign_contact_emails(self):
+        software = Software.objects.create(name='OpenShift')
+        eng = Contact.objects.create(name='Eng', email='eng@example.com', type=Contact.ENGINEERING)
+        psrd = Contact.objects.create(name='Psrd', email='psrd@example.com', type=Contact.PSRD)
+        bus = Contact.objects.create(name='Bus', email='', type=Contact.BUSINESS)
+        first = Component.objects.create(name='Kubelet', software=software, engineering_contact=eng, business_contact=bus)
+        second = Component.objects.create(name='CRI-O', software=software, engineering_contact=eng, psrd_contact=psrd)
+        Component.objects.create(name='Unrelated', software=software, psrd_contact=Contact.objects.create(name='Other', email='other@example.com', type=Contact.PSRD))
+        ComponentActivity.objects.create(component=first, activity=Activity.objects.create(name='SAR')).campaigns.add(self.campaign)
+        ComponentFeature.objects.create(component=second, feature=Feature.objects.create(name='FIPS')).campaigns.add(self.campaign)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.campaign.contact_emails(), ['eng@example.com', 'psrd@example.com'])
+        response = self.client.get(reverse('campaign_contact_emails', kwargs={'pk': self.campaign.pk}))
+        self.assertEqual(response.json(), {'emails': ['eng@example.com', 'psrd@example.com']})
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ComponentDetailViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        software = Software.objects.create(name='OpenShift')
+        cls.component = Component.objects.create(
+            name='Kubelet',
+            software=software,
+            engineering_contact=Contact.objects.create(name='Eng', email='eng@example.com', type=Contact.ENGINEERING),
+            business_contact=Contact.objects.create(name='Bus', email='bus@example.com', type=Contact.BUSINESS),
+            psrd_contact=Contact.objects.create(name='Psrd', email='psrd@example.com', type=Contact.PSRD),
+        )
+        Standard.objects.create(name='ISO 27001', code='ISO27001')
+        cls.campaign = Campaign.objects.create(name='FIPS readiness')
+
+    def setUp(self):
+        cache.clear()
+
+    def add_rows(self, start, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(start, start + count):
+                cf = ComponentFeature.objects.create(component=self.component, feature=Feature.objects.create(name=f'Feature {i}'))
+                ca = ComponentActivity.objects.create(component=self.component, activity=Activity.objects.create(name=f'Activity {i}'))
+                cf.campaigns.add(self.campaign)
+                ca.campaigns.add(self.campaign)
+                for parent in ({'component_feature': cf}, {'component_activity': ca}):
+                    JiraTicket.objects.create(name=f'JIRA-{i}', url='https://issues.example.com/', **parent)
+                    Result.objects.create(name=f'Result {i}', url='https://results.example.com/', **parent)
+                    Document.objects.create(name=f'Document {i}', url='https://docs.example.com/', **parent)
+
+    def test_view_detail_component_exists(self):
+        response = self.client.get(f'/components/{self.component.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'core/component_detail.html')
+
+    def test_view_detail_component_query_count_is_constant(self):
+        url = reverse('component_detail', kwargs={'pk': self.component.pk})
+        self.add_rows(0, 2)
+        with self.assertNumQueries(9):
+            response = self.client.get(url)
+        self.assertContains(response, 'Feature 1')
+        self.assertContains(response, 'JIRA-1')
+        self.add_rows(2, 10)
+        with self.assertNumQueries(9):
+            response = self.client.get(url)
+        self.assertContains(response, 'Activity 11')
+
+    def test_view_detail_component_tables_are_cached_until_changed(self):
+        url = reverse('component_detail', kwargs={'pk': self.component.pk})
+        self.add_rows(0, 2)
+        self.client.get(url)
+        # The validators, the component and the standards.
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertContains(response, 'Document 1')
+        # The fragments are invalidated once the write commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            Document.objects.filter(name='Document 1', component_feature__isnull=False).get().delete()
+        response = self.client.get(url)
+        self.assertEqual(response.content.decode().count('Document 1'), 1)
+        self.campaign.name = 'FIPS 140-3 readiness'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.save()
+        self.assertContains(self.client.get(url), 'FIPS 140-3 readiness')
+        with self.captureOnCommitCallbacks(execute=True):
+            ComponentActivity.objects.get(activity__name='Activity 0').campaigns.remove(self.campaign)
+        self.assertContains(self.client.get(url), 'FIPS 140-3 readiness', count=3)
+
+    def test_view_detail_component_tables_are_invalidated_on_commit(self):
+        url = reverse('component_detail', kwargs={'pk': self.component.pk})
+        self.add_rows(0, 2)
+        self.client.get(url)
+        with self.captureOnCommitCallbacks() as callbacks, transaction.atomic():
+            for document in Document.objects.filter(name='Document 1'):
+                document.name = 'Document 2'
+                document.save()
+            # Still cached until the commit, so no concurrent reader can cache
+            # the old rows under a new version.
+            self.assertContains(self.client.get(url), 'Document 1')
+        with mock.patch.object(cache, 'delete_many', wraps=cache.delete_many) as delete_many:
+            for callback in callbacks:
+                callback()
+        delete_many.assert_called_once()
+        self.assertNotContains(self.client.get(url), 'Document 1')
+
+class StandardDetailViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.standard = Standard.objects.create(name='ISO 27001', code='ISO27001')
+        cls.requirement = Requirement.objects.create(standard=cls.standard, definition='Review the architecture')
+        Requirement.objects.create(standard=cls.standard, definition='Train the staff')
+        software = Software.objects.create(name='OpenShift')
+        for i in range(3):
+            activity = Activity.objects.create(name=f'Activity {i}')
+            activity.requirements.add(cls.requirement)
+            Feature.objects.create(name=f'Feature {i}').requirements.add(cls.requirement)
+            for j, status in enumerate([ComponentActivity.DONE, ComponentActivity.TO_DO]):
+                component, _ = Component.objects.get_or_create(name=f'Component {j}', software=software)
+                ComponentActivity.objects.create(component=component, activity=activity, status=status)
+
+    def test_view_annotated_requirements(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('standard_detail', kwargs={'pk': self.standard.pk}))
+        first, second = response.context['requirements']
+        self.assertEqual((first.activity_count, first.feature_count, first.done_component_count), (3, 3, 1))
+        self.assertEqual((second.activity_count, second.feature_count, second.done_component_count), (0, 0, 0))
+
+class ComponentStandardComplianceViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.component = Component.objects.create(name='Kubelet', software=Software.objects.create(name='OpenShift'))
+        cls.standard = Standard.objects.create(name='ISO 27001', code='ISO27001')
+        cls.covered = Requirement.objects.create(standard=cls.standard, definition='Review the architecture')
+        cls.partial = Requirement.objects.create(standard=cls.standard, definition='Scan the code')
+        cls.uncovered = Requirement.objects.create(standard=cls.standard, definition='Train the staff')
+        sar = Activity.objects.create(name='SAR')
+        sast = Activity.objects.create(name='SAST')
+        dast = Activity.objects.create(name='DAST')
+        sar.requirements.add(cls.covered)
+        sast.requirements.add(cls.partial)
+        dast.requirements.add(cls.partial)
+        ComponentActivity.objects.create(component=cls.component, activity=sar, status=ComponentActivity.DONE)
+        ComponentActivity.objects.create(component=cls.component, activity=sast, status=ComponentActivity.DONE)
+        ComponentActivity.objects.create(component=cls.component, activity=dast, status=ComponentActivity.TO_DO)
+
+    def test_view_statement_of_applicability(self):
+        url = reverse('component_standard_compliance', kwargs={'pk': self.component.pk, 'standard_pk': self.standard.pk})
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        rows = response.context['statement_of_applicability']
+        self.assertEqual([row['requirement'] for row in rows], [self.covered, self.partial, self.uncovered])
+        self.assertEqual([row['status'] for row in rows], [ComponentActivity.DONE, ComponentActivity.IN_PROGRESS, None])
+        self.assertEqual([ca.activity.name for ca in rows[1]['component_activities']], ['DAST', 'SAST'])
+
+    def test_view_unknown_standard(self):
+        url = reverse('component_standard_compliance', kwargs={'pk': self.component.pk, 'standard_pk': 0})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+########################################################
+####### Start Test Edit views ##########################
+########################################################
+
+class ComponentActivityUpdateViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        component = Component.objects.create(name='Kubelet', software=Software.objects.create(name='OpenShift'))
+        cls.activity = Activity.objects.create(name='SAR')
+        cls.component_activity = ComponentActivity.objects.create(component=component, activity=cls.activity)
+        standard = Standard.objects.create(name='ISO 27001', code='ISO27001')
+        cls.requirements = [Requirement.objects.create(standard=standard, definition=f'Requirement {i}') for i in range(50)]
+        cls.campaigns = [Campaign.objects.create(name=f'Campaign {i}') for i in range(3)]
+        cls.activity.requirements.set(cls.requirements[:40])
+        cls.component_activity.campaigns.set(cls.campaigns[:2])
+
+    def post(self, requirements, campaigns):
+        data = {
+            'activity': self.activity.pk,
+            'component': self.component_activity.component_id,
+            'status': ComponentActivity.IN_PROGRESS,
+            'requirements': [requirement.pk for requirement in requirements],
+            'campaigns': [campaign.pk for campaign in campaigns],
+        }
+        for prefix in ('jira', 'result', 'document'):
+            data.update({f'{prefix}-TOTAL_FORMS': '0', f'{prefix}-INITIAL_FORMS': '0'})
+        return self.client.post(reverse('componentactivity_update', kwargs={'pk': self.component_activity.pk}), data)
+
+    def test_many_to_many_writes_are_diffs(self):
+        with self.assertNumQueries(27):
+            response = self.post(self.requirements[10:50], self.campaigns[1:])
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(self.activity.requirements.order_by('pk')), self.requirements[10:50])
+        self.assertEqual(list(self.component_activity.campaigns.order_by('pk')), self.campaigns[1:])
+
+
+class LinkFormsetEditorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.component = Component.objects.create(name='Kubelet', software=Software.objects.create(name='OpenShift'))
+        cls.activity = Activity.objects.create(name='SAR')
+        cls.feature = Feature.objects.create(name='FIPS')
+
+    def links(self, **rows):
+        data = {}
+        for prefix in ('jira', 'result', 'document'):
+            links = rows.get(prefix, [])
+            data.update({f'{prefix}-TOTAL_FORMS': str(len(links)), f'{prefix}-INITIAL_FORMS': '0'})
+            for i, (name, url) in enumerate(links):
+                data.update({f'{prefix}-{i}-name': name, f'{prefix}-{i}-url': url})
+        return data
+
+    def test_create_activity_with_links(self):
+        data = {'activity': self.activity.pk, 'component': self.component.pk, 'status': ComponentActivity.TO_DO}
+        data.update(self.links(
+            jira=[(f'SEC-{i}', f'https://issues.example.com/SEC-{i}') for i in range(3)],
+            result=[('Scan', 'https://scans.example.com/1')],
+        ))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('activity_add_to_component', kwargs={'component_pk': self.component.pk}), data)
+        self.assertRedirects(response, self.component.get_absolute_url(), fetch_redirect_response=False)
+        component_activity = ComponentActivity.objects.get()
+        self.assertEqual([ticket.name for ticket in component_activity.jira_tickets], ['SEC-0', 'SEC-1', 'SEC-2'])
+        self.assertEqual([result.kind for result in component_activity.results], [Result.RESULT])
+        # One INSERT per formset with new rows.
+        self.assertEqual(sum(query['sql'].startswith('INSERT INTO "core_link"') for query in queries), 2)
+
+    def test_invalid_link_saves_nothing(self):
+        data = {'feature': self.feature.pk, 'priority': ComponentFeature.MEDIUM, 'status': ComponentFeature.TO_DO}
+        data.update(self.links(jira=[('SEC-1', 'https://issues.example.com/SEC-1')], document=[('Design', 'not a url')]))
+        url = reverse('feature_add_to_component', kwargs={'component_pk': self.component.pk})
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Enter a valid URL.')
+        self.assertEqual(response.context['document_formset'].data['document-0-url'], 'not a url')
+        self.assertFalse(ComponentFeature.objects.exists())
+        self.assertFalse(JiraTicket.objects.exists())
+
+        data['document-0-url'] = 'https://docs.example.com/design'
+        self.assertEqual(self.client.post(url, data).status_code, 302)
+        component_feature = ComponentFeature.objects.get(component=self.component)
+        self.assertEqual([ticket.name for ticket in component_feature.jira_tickets], ['SEC-1'])
+
+    def test_update_feature_links(self):
+        component_feature = ComponentFeature.objects.create(component=self.component, feature=self.feature)
+        ticket = JiraTicket.objects.create(name='SEC-1', url='https://issues.example.com/SEC-1', component_feature=component_feature)
+        data = {'feature': self.feature.pk, 'priority': ComponentFeature.HIGH, 'status': ComponentFeature.DONE}
+        data.update(self.links(result=[('Scan', 'https://scans.example.com/1')], document=[('Design', 'https://docs.example.com/design')]))
+        data.update({'jira-TOTAL_FORMS': '1', 'jira-INITIAL_FORMS': '1', 'jira-0-id': ticket.pk, 'jira-0-name': 'SEC-1', 'jira-0-url': ticket.url, 'jira-0-DELETE': 'on'})
+        response = self.client.post(reverse('componentfeature_update', kwargs={'pk': component_feature.pk}), data)
+        self.assertEqual(response.status_code, 302)
+        component_feature.refresh_from_db()
+        self.assertEqual(component_feature.status, ComponentFeature.DONE)
+        self.assertEqual(sorted(link.kind for link in component_feature.links.all()), [Document.DOCUMENT, Result.RESULT])
@@ -1,5 +1,7 @@
 from django.urls import path
 from . import views as core_views
+from .api import RESOURCES
+from .models import Contact, Requirement, Software
 
 
 urlpatterns = [
@@ -14,6 +16,7 @@ urlpatterns = [
     path('components/add/', core_views.ComponentCreate.as_view(), name='component_add'),
     path('components/<int:pk>/edit/', core_views.ComponentUpdate.as_view(), name='component_update'),
     path('components/<int:pk>/delete/', core_views.ComponentDelete.as_view(), name='component_delete'),
+    path('components/<int:pk>/status/', core_views.ComponentStatusGrid.as_view(), name='component_status_grid'),
     path('componentfeature/<int:pk>/delete/', core_views.ComponentFeatureDelete.as_view(), name='componentfeature_delete'),
     path('features/', core_views.FeatureList.as_view(), name='feature_list'),
     path('features/<int:pk>/', core_views.FeatureDetail.as_view(), name='feature_detail'),
@@ -36,6 +39,8 @@ urlpatterns = [
     path('campaigns/add/', core_views.CampaignCreate.as_view(), name='campaign_add'),
     path('campaigns/<int:pk>/edit/', core_views.CampaignUpdate.as_view(), name='campaign_update'),
     path('campaigns/<int:pk>/delete/', core_views.CampaignDelete.as_view(), name='campaign_delete'),
+    path('campaigns/<int:pk>/status/', core_views.CampaignStatusGrid.as_view(), name='campaign_status_grid'),
+    path('campaigns/<int:pk>/contact-emails/', core_views.CampaignContactEmails.as_view(), name='campaign_contact_emails'),
     path('components/<int:component_pk>/features/add/', core_views.ComponentFeatureCreate.as_view(), name='feature_add_to_component'),
     path('componentfeatures/<int:pk>/edit/', core_views.ComponentFeatureUpdate.as_view(), name='componentfeature_update'),
     path('componentfeatures/<int:pk>/delete/', core_views.ComponentFeatureDelete.as_view(), name='componentfeature_delete'),
@@ -59,9 +64,28 @@ urlpatterns = [
     path('componentactivities/<int:pk>/edit/', core_views.ComponentActivityUpdate.as_view(), name='componentactivity_update'),
     path('componentactivities/<int:pk>/delete/', core_views.ComponentActivityDelete.as_view(), name='componentactivity_delete'),
     path('components/<int:pk>/standard/<int:standard_pk>/', core_views.ComponentStandardCompliance.as_view(), name='component_standard_compliance'),
+    path('compliance/', core_views.ComplianceMatrix.as_view(), name='compliance_matrix'),
+    path('search/', core_views.Search.as_view(), name='search'),
+    path('autocomplete/software/', core_views.Autocomplete.as_view(model=Software), name='autocomplete_software'),
+    path('autocomplete/contacts/', core_views.Autocomplete.as_view(model=Contact), name='autocomplete_contacts'),
+    path('autocomplete/requirements/', core_views.Autocomplete.as_view(model=Requirement), name='autocomplete_requirements'),
+    path('import/', core_views.PortfolioImport.as_view(), name='portfolio_import'),
+    path('api/v1/query/', core_views.ApiNestedQuery.as_view(), name='api_query'),
+    path('api/v1/batch/', core_views.ApiBatch.as_view(), name='api_batch'),
+    path('export/portfolio.csv', core_views.PortfolioExport.as_view(format='csv'), name='portfolio_export_csv'),
+    path('export/portfolio.ndjson', core_views.PortfolioExport.as_view(format='ndjson'), name='portfolio_export_ndjson'),
     path('contacts/', core_views.ContactList.as_view(), name='contact_list'),
     path('contacts/<int:pk>/', core_views.ContactDetail.as_view(), name='contact_detail'),
     path('contacts/add/', core_views.ContactCreate.as_view(), name='contact_add'),
     path('contacts/<int:pk>/edit/', core_views.ContactUpdate.as_view(), name='contact_update'),
     path('contacts/<int:pk>/delete/', core_views.ContactDelete.as_view(), name='contact_delete'),
 ]
+
+urlpatterns += [
+    pattern
+    for resource in RESOURCES.values()
+    for pattern in [
+        path(f'api/v1/{resource.name}/', core_views.ApiList.as_view(model=resource.model), name=f'api_{resource.model._meta.model_name}_list'),
+        path(f'api/v1/{resource.name}/<int:pk>/', core_views.ApiDetail.as_view(model=resource.model), name=f'api_{resource.model._meta.model_name}_detail'),
+    ]
+]
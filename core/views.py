@@ -1,10 +1,30 @@
-from django.views.generic import ListView
+import io
+
+from django.conf import settings
+from django.views.generic import FormView, ListView, TemplateView, View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
-from django.shortcuts import redirect
-from .models import Software, Component, Feature, Threat, ComponentFeature, ComponentActivity, Activity, Campaign, FeatureCategory, Standard, Requirement, Contact
-from .forms import ComponentForm, SoftwareForm, ComponentFeatureForm, ComponentFeatureDocumentFormSet, ComponentActivityForm, ComponentActivityDocumentFormSet, ComponentActivityJiraTicketFormSet, ComponentActivityResultFormSet, ActivityForm, ComponentFeatureJiraTicketFormSet, ComponentFeatureResultFormSet
+from django.shortcuts import redirect, get_object_or_404
+from django.http import HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.db import transaction
+from django.db.models import BooleanField, Count, Exists, ExpressionWrapper, OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import Software, Component, Feature, Threat, ComponentFeature, ComponentActivity, Activity, Campaign, FeatureCategory, Standard, Requirement, Contact, ComponentStandard, FeatureRequirement, ComponentActivityCampaign, ComponentFeatureCampaign, JiraTicket, Link, Result, Document
+from .pagination import KeysetPaginationMixin
+from .api import RESOURCES_BY_MODEL, ApiError, ApiQuery, json_response
+from .autocomplete import autocomplete
+from .batch import Batch, authenticate
+from .compliance import statement_of_applicability
+from .conditional import ConditionalGetMixin
+from .fragments import fragment_version, lazy_rows, lazy_status_rows
+from .loaders import NestedQuery
+from .portfolio_export import FORMATS, buffered, export_rows
+from .portfolio_import import READERS, PortfolioImporter, detect_format
+from .search import search
+from .forms import ComponentForm, SoftwareForm, ComponentFeatureForm, ComponentFeatureDocumentFormSet, ComponentActivityForm, ComponentActivityDocumentFormSet, ComponentActivityJiraTicketFormSet, ComponentActivityResultFormSet, ActivityForm, ComponentFeatureJiraTicketFormSet, ComponentFeatureResultFormSet, PortfolioImportForm, ComponentActivityStatusFormSet, ComponentFeatureStatusFormSet
 
 
 class SoftwareCreate(CreateView):
@@ -12,11 +32,20 @@ class SoftwareCreate(CreateView):
     form_class = SoftwareForm
     success_url = reverse_lazy('software_list')
 
-class SoftwareDetail(DetailView):
+class SoftwareDetail(ConditionalGetMixin, DetailView):
     model = Software
 
-class SoftwareList(ListView):
+    def get_validator_sources(self):
+        pk = self.kwargs['pk']
+        return [
+            Software.objects.filter(pk=pk),
+            Component.objects.filter(software=pk),
+            Contact.objects.filter(Q(engineering_components__software=pk) | Q(business_components__software=pk) | Q(psrd_components__software=pk)),
+        ]
+
+class SoftwareList(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Software
+    sort_fields = {'name': ['name']}
 
 class SoftwareUpdate(UpdateView):
     model = Software
@@ -64,14 +93,85 @@ class ComponentCreate(CreateView):
     def get_success_url(self):
         return reverse_lazy('component_detail', kwargs={'pk': self.object.pk})
 
-class ComponentDetail(DetailView):
+class ComponentDetail(ConditionalGetMixin, DetailView):
     model = Component
+    queryset = Component.objects.select_related('software', 'engineering_contact', 'business_contact', 'psrd_contact')
+
+    def get_validator_sources(self):
+        pk = self.kwargs['pk']
+        links = Q(component_feature__component=pk) | Q(component_activity__component=pk)
+        return [
+            Component.objects.filter(pk=pk),
+            Software.objects.filter(components=pk),
+            Contact.objects.filter(Q(engineering_components=pk) | Q(business_components=pk) | Q(psrd_components=pk)),
+            ComponentFeature.objects.filter(component=pk),
+            ComponentActivity.objects.filter(component=pk),
+            Feature.objects.filter(component_features__component=pk),
+            Activity.objects.filter(component_activities__component=pk),
+            ComponentFeatureCampaign.objects.filter(component_feature__component=pk),
+            ComponentActivityCampaign.objects.filter(component_activity__component=pk),
+            Campaign.objects.filter(Q(component_features__component=pk) | Q(component_activities__component=pk)),
+            JiraTicket.objects.filter(links),
+            Result.objects.filter(links),
+            Document.objects.filter(links),
+            Standard.objects.all(),
+        ]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # The feature and activity tables are cached template fragments: their
+        # rows are only fetched, all at once, when the fragment is rendered.
+        context['component_features'] = lazy_rows(
+            self.object.component_features.select_related('feature')
+            .prefetch_related('campaigns', 'links')
+        )
+        context['component_activities'] = lazy_rows(
+            self.object.component_activities.select_related('activity')
+            .prefetch_related('campaigns', 'links')
+        )
+        context['fragment_version'] = fragment_version('component', self.object.pk)
+        context['fragment_cache_timeout'] = settings.FRAGMENT_CACHE_TIMEOUT
         context['standards'] = Standard.objects.all()
         return context
 
+class StatusGridMixin:
+    # Spreadsheet-style editor of the status and dates of every feature and
+    # activity listed on a component or campaign page. Each formset is bound
+    # once and the changed rows of both are saved in one transaction, or the
+    # grid is rendered again with the errors next to their row. A posted grid
+    # locks its rows in that transaction, so that no other save lands between
+    # the check that a row is unchanged since the page was loaded and its
+    # update.
+    template_name = 'core/status_grid.html'
+
+    def get_formsets(self, data=None):
+        activities = self.object.component_activities.select_related('component', 'activity')
+        features = self.object.component_features.select_related('component', 'feature')
+        if data is not None:
+            activities = activities.select_for_update(of=('self',))
+            features = features.select_for_update(of=('self',))
+        return {
+            'activity_formset': ComponentActivityStatusFormSet(data, prefix='activities', queryset=activities),
+            'feature_formset': ComponentFeatureStatusFormSet(data, prefix='features', queryset=features),
+        }
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return self.render_to_response(self.get_context_data(**self.get_formsets()))
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        with transaction.atomic():
+            formsets = self.get_formsets(request.POST)
+            if all([formset.is_valid() for formset in formsets.values()]):
+                for formset in formsets.values():
+                    formset.save()
+                return HttpResponseRedirect(self.object.get_absolute_url())
+        return self.render_to_response(self.get_context_data(**formsets))
+
+class ComponentStatusGrid(StatusGridMixin, DetailView):
+    model = Component
+
 class ComponentUpdate(UpdateView):
     model = Component
     form_class = ComponentForm
@@ -92,16 +192,58 @@ class FeatureCreate(CreateView):
 
     success_url = reverse_lazy('feature_list')
 
-class FeatureList(ListView):
+class FeatureList(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Feature
+    # Features without a category sort last; the coalesced name keeps the
+    # keyset comparisons free of NULLs.
+    queryset = Feature.objects.select_related('category').annotate(
+        adoption_count=Count('component_features'),
+        uncategorized=ExpressionWrapper(Q(category__isnull=True), output_field=BooleanField()),
+        category_name=Coalesce('category__name', Value('')),
+    )
+    sort_fields = {'category': ['uncategorized', 'category_name', 'name']}
+    default_sort = 'category'
+
+    def get_validator_sources(self):
+        # Every feature of the categories on the page, whose totals it shows.
+        page = Feature.objects.filter(pk__in=self.get_page_queryset().values('pk'))
+        features = Feature.objects.filter(
+            Q(category__in=page.values('category')) | Q(category__isnull=True) & Exists(page.filter(category__isnull=True))
+        )
+        return [
+            features,
+            FeatureCategory.objects.filter(pk__in=page.values('category')),
+            ComponentFeature.objects.filter(feature__in=features),
+        ]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['featurecategory_list'] = FeatureCategory.objects.all()
-        context['features_without_category'] = Feature.objects.filter(category__isnull=True)
+        # Group the ordered page by category in memory; features without a
+        # category come last. A category can span several pages, so its
+        # totals come from one grouped query over the categories of the page.
+        groups = []
+        for feature in context['feature_list']:
+            if not groups or groups[-1]['category_id'] != feature.category_id:
+                groups.append({'category_id': feature.category_id, 'category': feature.category, 'features': []})
+            groups[-1]['features'].append(feature)
+        if groups:
+            category_ids = {group['category_id'] for group in groups}
+            categories = Q(category__in=category_ids - {None})
+            if None in category_ids:
+                categories |= Q(category__isnull=True)
+            totals = {
+                category_id: (feature_count, adoption_count)
+                for category_id, feature_count, adoption_count in Feature.objects.filter(categories)
+                .order_by()
+                .values_list('category')
+                .annotate(feature_count=Count('pk', distinct=True), adoption_count=Count('component_features'))
+            }
+            for group in groups:
+                group['feature_count'], group['adoption_count'] = totals[group['category_id']]
+        context['feature_groups'] = groups
         return context
 
-class FeatureDetail(DetailView):
+class FeatureDetail(ConditionalGetMixin, DetailView):
     model = Feature
 
 class FeatureUpdate(UpdateView):
@@ -120,7 +262,7 @@ class FeatureCategoryCreate(CreateView):
 
     success_url = reverse_lazy('featurecategory_list')
 
-class FeatureCategoryDetail(DetailView):
+class FeatureCategoryDetail(ConditionalGetMixin, DetailView):
     model = FeatureCategory
 
 class FeatureCategoryUpdate(UpdateView):
@@ -132,84 +274,72 @@ class FeatureCategoryDelete(DeleteView):
 
     success_url = reverse_lazy('featurecategory_list')
 
-class FeatureCategoryList(ListView):
+class FeatureCategoryList(ConditionalGetMixin, ListView):
     model = FeatureCategory
 
 
-class ComponentFeatureCreate(CreateView):
-    model = ComponentFeature
-    form_class = ComponentFeatureForm
+class FormsetEditorMixin:
+    # Create and update views of an object together with inline formsets of
+    # its child rows, keyed by prefix in formset_classes. The form and each
+    # formset are bound and validated once per request; the object and all
+    # its rows are saved in one transaction, or the page is rendered again
+    # from the same bound form and formsets.
+    formset_classes = {}
 
-    def get_initial(self):
-        initial = super().get_initial()
-        component_pk = self.kwargs.get('component_pk')
-        if component_pk:
-            initial['component'] = component_pk
-        return initial
+    def get_formsets(self, form):
+        if not hasattr(self, 'formsets'):
+            data = self.request.POST if self.request.method == 'POST' else None
+            self.formsets = {
+                f'{prefix}_formset': formset_class(data, instance=form.instance, prefix=prefix)
+                for prefix, formset_class in self.formset_classes.items()
+            }
+        return self.formsets
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.POST:
-            context['jira_formset'] = ComponentFeatureJiraTicketFormSet(self.request.POST, prefix='jira')
-            context['result_formset'] = ComponentFeatureResultFormSet(self.request.POST, prefix='result')
-            context['document_formset'] = ComponentFeatureDocumentFormSet(self.request.POST, prefix='document')
-        else:
-            context['jira_formset'] = ComponentFeatureJiraTicketFormSet(prefix='jira')
-            context['result_formset'] = ComponentFeatureResultFormSet(prefix='result')
-            context['document_formset'] = ComponentFeatureDocumentFormSet(prefix='document')
+        context.update(self.get_formsets(context['form']))
         return context
 
     def form_valid(self, form):
-        context = self.get_context_data()
-        document_formset = context['document_formset']
-        jira_formset = context['jira_formset']
-        result_formset = context['result_formset']
-        self.object = form.save()
-        selected_campaigns = form.cleaned_data.get('campaigns')
-        if selected_campaigns is not None:
-            self.object.campaigns.set(selected_campaigns)
-        if document_formset.is_valid() and jira_formset.is_valid() and result_formset.is_valid():
-            document_formset.instance = self.object
-            document_formset.save()
-            jira_formset.save()
-            result_formset.save()
+        formsets = self.get_formsets(form).values()
+        if not all([formset.is_valid() for formset in formsets]):
+            return self.form_invalid(form)
+        with transaction.atomic():
+            # The formsets hold form.instance, which gets its primary key here.
+            self.object = form.save()
+            for formset in formsets:
+                formset.save()
         return redirect(self.get_success_url())
 
+
+class ComponentFeatureCreate(FormsetEditorMixin, CreateView):
+    model = ComponentFeature
+    form_class = ComponentFeatureForm
+    formset_classes = {
+        'jira': ComponentFeatureJiraTicketFormSet,
+        'result': ComponentFeatureResultFormSet,
+        'document': ComponentFeatureDocumentFormSet,
+    }
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        # The form has no component field, features are added from the page
+        # of their component.
+        form.instance.component_id = self.kwargs['component_pk']
+        return form
+
     def get_success_url(self):
         return reverse_lazy('component_detail', kwargs={'pk': self.object.component.pk})
 
 
-class ComponentFeatureUpdate(UpdateView):
+class ComponentFeatureUpdate(FormsetEditorMixin, UpdateView):
     model = ComponentFeature
     form_class = ComponentFeatureForm
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.request.POST:
-            context['document_formset'] = ComponentFeatureDocumentFormSet(self.request.POST, instance=self.object, prefix='document')
-            context['jira_formset'] = ComponentFeatureJiraTicketFormSet(self.request.POST, instance=self.object, prefix='jira')
-            context['result_formset'] = ComponentFeatureResultFormSet(self.request.POST, instance=self.object, prefix='result')
-        else:
-            context['document_formset'] = ComponentFeatureDocumentFormSet(instance=self.object, prefix='document')
-            context['jira_formset'] = ComponentFeatureJiraTicketFormSet(instance=self.object, prefix='jira')
-            context['result_formset'] = ComponentFeatureResultFormSet(instance=self.object, prefix='result')
-        return context
-
-    def form_valid(self, form):
-        context = self.get_context_data()
-        document_formset = context['document_formset']
-        jira_formset = context['jira_formset']
-        result_formset = context['result_formset']
-        self.object = form.save()
-        selected_campaigns = form.cleaned_data.get('campaigns')
-        if selected_campaigns is not None:
-            self.object.campaigns.set(selected_campaigns)
-        if document_formset.is_valid() and jira_formset.is_valid() and result_formset.is_valid():
-            document_formset.instance = self.object
-            document_formset.save()
-            jira_formset.save()
-            result_formset.save()
-        return redirect(self.get_success_url())
+    formset_classes = {
+        'jira': ComponentFeatureJiraTicketFormSet,
+        'result': ComponentFeatureResultFormSet,
+        'document': ComponentFeatureDocumentFormSet,
+    }
 
     def get_success_url(self):
         return reverse_lazy('component_detail', kwargs={'pk': self.object.component.pk})
@@ -223,9 +353,14 @@ class ComponentFeatureDelete(DeleteView):
         return component.get_absolute_url()
 
 
-class ComponentActivityCreate(CreateView):
+class ComponentActivityCreate(FormsetEditorMixin, CreateView):
     model = ComponentActivity
     form_class = ComponentActivityForm
+    formset_classes = {
+        'jira': ComponentActivityJiraTicketFormSet,
+        'result': ComponentActivityResultFormSet,
+        'document': ComponentActivityDocumentFormSet,
+    }
 
     def get_initial(self):
         initial = super().get_initial()
@@ -234,83 +369,34 @@ class ComponentActivityCreate(CreateView):
             initial['component'] = component_pk
         return initial
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.request.POST:
-            context['jira_formset'] = ComponentActivityJiraTicketFormSet(self.request.POST, prefix='jira')
-            context['result_formset'] = ComponentActivityResultFormSet(self.request.POST, prefix='result')
-            context['document_formset'] = ComponentActivityDocumentFormSet(self.request.POST, prefix='document')
-        else:
-            context['jira_formset'] = ComponentActivityJiraTicketFormSet(prefix='jira')
-            context['result_formset'] = ComponentActivityResultFormSet(prefix='result')
-            context['document_formset'] = ComponentActivityDocumentFormSet(prefix='document')
-        return context
-
-    def form_valid(self, form):
-        context = self.get_context_data()
-        jira_formset = context['jira_formset']
-        result_formset = context['result_formset']
-        document_formset = context['document_formset']
-        self.object = form.save()
-        if (jira_formset.is_valid() and result_formset.is_valid() and document_formset.is_valid()):
-            form.save_m2m() if hasattr(form, 'save_m2m') else None
-            # Save selected existing campaigns only
-            selected_campaigns = form.cleaned_data.get('campaigns')
-            if selected_campaigns is not None:
-                self.object.campaigns.set(selected_campaigns)
-            jira_formset.instance = self.object
-            result_formset.instance = self.object
-            document_formset.instance = self.object
-            jira_formset.save()
-            result_formset.save()
-            document_formset.save()
-            return redirect(self.get_success_url())
-        else:
-            return self.form_invalid(form)
-
     def get_success_url(self):
         return reverse_lazy('component_detail', kwargs={'pk': self.object.component.pk})
 
-class ComponentActivityDetail(DetailView):
+class ComponentActivityDetail(ConditionalGetMixin, DetailView):
     model = ComponentActivity
-
-class ComponentActivityUpdate(UpdateView):
+    queryset = ComponentActivity.objects.prefetch_related('links')
+
+    def get_validator_sources(self):
+        pk = self.kwargs['pk']
+        return [
+            ComponentActivity.objects.filter(pk=pk),
+            Activity.objects.filter(component_activities=pk),
+            Component.objects.filter(component_activities=pk),
+            ComponentActivityCampaign.objects.filter(component_activity=pk),
+            Campaign.objects.filter(component_activities=pk),
+            JiraTicket.objects.filter(component_activity=pk),
+            Result.objects.filter(component_activity=pk),
+            Document.objects.filter(component_activity=pk),
+        ]
+
+class ComponentActivityUpdate(FormsetEditorMixin, UpdateView):
     model = ComponentActivity
     form_class = ComponentActivityForm
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.request.POST:
-            context['jira_formset'] = ComponentActivityJiraTicketFormSet(self.request.POST, instance=self.object, prefix='jira')
-            context['result_formset'] = ComponentActivityResultFormSet(self.request.POST, instance=self.object, prefix='result')
-            context['document_formset'] = ComponentActivityDocumentFormSet(self.request.POST, instance=self.object, prefix='document')
-        else:
-            context['jira_formset'] = ComponentActivityJiraTicketFormSet(instance=self.object, prefix='jira')
-            context['result_formset'] = ComponentActivityResultFormSet(instance=self.object, prefix='result')
-            context['document_formset'] = ComponentActivityDocumentFormSet(instance=self.object, prefix='document')
-        return context
-
-    def form_valid(self, form):
-        context = self.get_context_data()
-        jira_formset = context['jira_formset']
-        result_formset = context['result_formset']
-        document_formset = context['document_formset']
-        self.object = form.save()
-        if (jira_formset.is_valid() and result_formset.is_valid() and document_formset.is_valid()):
-            form.save_m2m() if hasattr(form, 'save_m2m') else None
-            # Save selected existing campaigns only
-            selected_campaigns = form.cleaned_data.get('campaigns')
-            if selected_campaigns is not None:
-                self.object.campaigns.set(selected_campaigns)
-            jira_formset.instance = self.object
-            result_formset.instance = self.object
-            document_formset.instance = self.object
-            jira_formset.save()
-            result_formset.save()
-            document_formset.save()
-            return redirect(self.get_success_url())
-        else:
-            return self.form_invalid(form)
+    formset_classes = {
+        'jira': ComponentActivityJiraTicketFormSet,
+        'result': ComponentActivityResultFormSet,
+        'document': ComponentActivityDocumentFormSet,
+    }
 
     def get_success_url(self):
         return reverse_lazy('component_detail', kwargs={'pk': self.object.component.pk})
@@ -330,10 +416,11 @@ class ThreatCreate(CreateView):
 
     success_url = reverse_lazy('threat_list')
 
-class ThreatList(ListView):
+class ThreatList(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Threat
+    sort_fields = {'name': ['name']}
 
-class ThreatDetail(DetailView):
+class ThreatDetail(ConditionalGetMixin, DetailView):
     model = Threat
 
 class ThreatUpdate(UpdateView):
@@ -350,8 +437,9 @@ class ActivityCreate(CreateView):
     model = Activity
     form_class = ActivityForm
 
-class ActivityList(ListView):
+class ActivityList(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Activity
+    sort_fields = {'name': ['name']}
 
 class ActivityDetail(DetailView):
     model = Activity
@@ -377,54 +465,84 @@ class CampaignCreate(CreateView):
 
     success_url = reverse_lazy('campaign_list')
 
-class CampaignDetail(DetailView):
+# Count the rows of a ComponentActivity/ComponentFeature queryset per status
+# with a single conditional aggregate query.
+def status_totals(queryset):
+    return queryset.aggregate(
+        todo=Count('pk', filter=Q(status=1)),
+        in_progress=Count('pk', filter=Q(status=2)),
+        done=Count('pk', filter=Q(status=3)),
+    )
+
+class CampaignDetail(ConditionalGetMixin, DetailView):
     model = Campaign
 
+    def get_validator_sources(self):
+        pk = self.kwargs['pk']
+        components = Component.objects.filter(Q(component_activities__campaigns=pk) | Q(component_features__campaigns=pk)).values('pk')
+        links = Q(component_feature__campaigns=pk) | Q(component_activity__campaigns=pk)
+        return [
+            Campaign.objects.filter(pk=pk),
+            ComponentActivityCampaign.objects.filter(campaign=pk),
+            ComponentFeatureCampaign.objects.filter(campaign=pk),
+            ComponentActivity.objects.filter(campaigns=pk),
+            ComponentFeature.objects.filter(campaigns=pk),
+            Activity.objects.filter(component_activities__campaigns=pk),
+            Feature.objects.filter(component_features__campaigns=pk),
+            Component.objects.filter(pk__in=components),
+            Software.objects.filter(components__in=components),
+            Contact.objects.filter(Q(engineering_components__in=components) | Q(business_components__in=components) | Q(psrd_components__in=components)),
+            JiraTicket.objects.filter(links),
+            Result.objects.filter(links),
+        ]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['pending_component_activities'] = self.object.component_activities.filter(status__in=[1, 2])
-        context['todo_component_activities'] = self.object.component_activities.filter(status=1)
-        context['in_progress_component_activities'] = self.object.component_activities.filter(status=2)
-        context['done_component_activities'] = self.object.component_activities.filter(status=3)
-        context['pending_component_features'] = self.object.component_features.filter(status__in=[1, 2])
-        context['todo_component_features'] = self.object.component_features.filter(status=1)
-        context['in_progress_component_features'] = self.object.component_features.filter(status=2)
-        context['done_component_features'] = self.object.component_features.filter(status=3)
-        context['pending_total'] = context['pending_component_activities'].count() + context['pending_component_features'].count()
-        context['todo_total'] = context['todo_component_activities'].count() + context['todo_component_features'].count()
-        context['in_progress_total'] = context['in_progress_component_activities'].count() + context['in_progress_component_features'].count()
-        context['done_total'] = context['done_component_activities'].count() + context['done_component_features'].count()
-
-        # Collect all unique components related to this campaign through activities and features
-        components = set()
-        for ca in self.object.component_activities.select_related('component').all():
-            if ca.component:
-                components.add(ca.component)
-        for cf in self.object.component_features.select_related('component').all():
-            if cf.component:
-                components.add(cf.component)
-
-        # Collect emails
-        engineering_emails = set()
-        business_emails = set()
-        psrd_emails = set()
-        for c in components:
-            if c.engineering_contact and c.engineering_contact.email:
-                engineering_emails.add(c.engineering_contact.email)
-            if c.business_contact and c.business_contact.email:
-                business_emails.add(c.business_contact.email)
-            if c.psrd_contact and c.psrd_contact.email:
-                psrd_emails.add(c.psrd_contact.email)
-
-        # Combine all emails into a single set and store as a sorted list in context
-        all_emails = engineering_emails | business_emails | psrd_emails
-        context['contacts_all_emails'] = sorted(all_emails)
+        component_activities = lazy_rows(
+            self.object.component_activities
+            .select_related('component__software', 'component__psrd_contact', 'activity')
+            .prefetch_related(Prefetch('links', queryset=Link.objects.filter(kind__in=[Link.JIRA_TICKET, Link.RESULT])))
+        )
+        component_features = lazy_rows(
+            self.object.component_features
+            .select_related('component__software', 'component__engineering_contact', 'component__business_contact', 'component__psrd_contact', 'feature')
+            .prefetch_related(Prefetch('links', queryset=Link.objects.filter(kind__in=[Link.JIRA_TICKET, Link.RESULT])))
+        )
+        context['component_activities'] = component_activities
+        context['component_features'] = component_features
+        context['pending_component_activities'] = lazy_status_rows(component_activities, 1, 2)
+        context['todo_component_activities'] = lazy_status_rows(component_activities, 1)
+        context['in_progress_component_activities'] = lazy_status_rows(component_activities, 2)
+        context['done_component_activities'] = lazy_status_rows(component_activities, 3)
+        context['pending_component_features'] = lazy_status_rows(component_features, 1, 2)
+        context['todo_component_features'] = lazy_status_rows(component_features, 1)
+        context['in_progress_component_features'] = lazy_status_rows(component_features, 2)
+        context['done_component_features'] = lazy_status_rows(component_features, 3)
+        context['fragment_version'] = fragment_version('campaign', self.object.pk)
+        context['fragment_cache_timeout'] = settings.FRAGMENT_CACHE_TIMEOUT
+
+        activity_totals = status_totals(self.object.component_activities.order_by())
+        feature_totals = status_totals(self.object.component_features.order_by())
+        context['todo_total'] = activity_totals['todo'] + feature_totals['todo']
+        context['in_progress_total'] = activity_totals['in_progress'] + feature_totals['in_progress']
+        context['done_total'] = activity_totals['done'] + feature_totals['done']
+        context['pending_total'] = context['todo_total'] + context['in_progress_total']
 
         return context
 
-class CampaignList(ListView):
+class CampaignStatusGrid(StatusGridMixin, DetailView):
+    model = Campaign
+
+class CampaignContactEmails(DetailView):
     model = Campaign
 
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse({'emails': self.object.contact_emails()})
+
+class CampaignList(ConditionalGetMixin, KeysetPaginationMixin, ListView):
+    model = Campaign
+    sort_fields = {'name': ['name'], 'status': ['status', 'name']}
+
 class CampaignUpdate(UpdateView):
     model = Campaign
     fields = ['name', 'description', 'status', 'due_date', 'jira_ticket_url']
@@ -443,6 +561,24 @@ class StandardCreate(CreateView):
 class StandardDetail(DetailView):
     model = Standard
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Feature links are counted in a subquery so they do not multiply the
+        # activity x component activity rows being grouped.
+        feature_count = FeatureRequirement.objects.filter(
+            requirement=OuterRef('pk'),
+        ).order_by().values('requirement').annotate(count=Count('pk')).values('count')
+        context['requirements'] = self.object.requirements.annotate(
+            activity_count=Count('activities', distinct=True),
+            feature_count=Coalesce(Subquery(feature_count), 0),
+            done_component_count=Count(
+                'activities__component_activities__component',
+                filter=Q(activities__component_activities__status=ComponentActivity.DONE),
+                distinct=True,
+            ),
+        )
+        return context
+
 class StandardUpdate(UpdateView):
     model = Standard
     fields = ['name', 'code', 'description']
@@ -451,8 +587,9 @@ class StandardDelete(DeleteView):
     model = Standard
     success_url = reverse_lazy('standard_list')
 
-class StandardList(ListView):
+class StandardList(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Standard
+    sort_fields = {'name': ['name'], 'code': ['code']}
 
 
 class RequirementCreate(CreateView):
@@ -485,8 +622,14 @@ class RequirementDelete(DeleteView):
     def get_success_url(self):
         return reverse_lazy('standard_detail', kwargs={'pk': self.object.standard.pk})
 
-class RequirementList(ListView):
+class RequirementList(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Requirement
+    list_select_related = ['standard']
+    sort_fields = {'name': ['name'], 'code': ['code'], 'standard': ['standard__name', 'name'], 'created': ['creation_datetime']}
+
+    def get_validator_sources(self):
+        page = Requirement.objects.filter(pk__in=self.get_page_queryset().values('pk'))
+        return [page, Standard.objects.filter(pk__in=page.values('standard'))]
 
 class ComponentStandardCompliance(DetailView):
     model = Component
@@ -494,20 +637,52 @@ class ComponentStandardCompliance(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        standard = Standard.objects.get(pk=self.kwargs.get('standard_pk'))
+        standard = get_object_or_404(Standard, pk=self.kwargs.get('standard_pk'))
         context['standard'] = standard
-        requirements = Requirement.objects.filter(standard=standard)
-        statement_of_applicability = {}
-        for requirement in requirements:
-            activities = requirement.activities.all()
-            component_activities = []
-            for activity in activities:
-                ca_qs = activity.component_activities.filter(component=self.object)
-                component_activities.extend(list(ca_qs))
-            statement_of_applicability[requirement] = component_activities
-        context['statement_of_applicability'] = statement_of_applicability
+        context['statement_of_applicability'] = statement_of_applicability(self.object, standard)
         return context
 
+class ComplianceMatrix(ListView):
+    model = ComponentStandard
+    template_name = 'core/compliance_matrix.html'
+
+    def get_queryset(self):
+        return ComponentStandard.objects.select_related('component', 'standard').order_by('component__name', 'standard__name')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        standards = {}
+        cells_by_component = {}
+        for cell in context['object_list']:
+            standards.setdefault(cell.standard_id, cell.standard)
+            cells_by_component.setdefault(cell.component, {})[cell.standard_id] = cell
+        standards = sorted(standards.values(), key=lambda standard: standard.name)
+        context['standards'] = standards
+        context['matrix'] = [
+            (component, [cells.get(standard.pk) for standard in standards])
+            for component, cells in cells_by_component.items()
+        ]
+        return context
+
+
+class Search(TemplateView):
+    template_name = 'core/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['q'] = self.request.GET.get('q', '').strip()
+        context['results'] = search(context['q']) if context['q'] else []
+        return context
+
+
+class Autocomplete(View):
+    # JSON matches for the autocomplete widgets; as_view(model=...) picks the model.
+    model = None
+
+    def get(self, request, *args, **kwargs):
+        objects = autocomplete(self.model, request.GET.get('q', ''), request.GET)
+        return JsonResponse({'results': [{'id': obj.pk, 'text': str(obj)} for obj in objects]})
+
 
 class ContactCreate(CreateView):
     model = Contact
@@ -516,11 +691,12 @@ class ContactCreate(CreateView):
     def get_success_url(self):
         return reverse_lazy('contact_detail', kwargs={'pk': self.object.pk})
 
-class ContactDetail(DetailView):
+class ContactDetail(ConditionalGetMixin, DetailView):
     model = Contact
 
-class ContactList(ListView):
+class ContactList(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Contact
+    sort_fields = {'name': ['name'], 'email': ['email'], 'type': ['type', 'name']}
 
 class ContactUpdate(UpdateView):
     model = Contact
@@ -534,3 +710,117 @@ class ContactDelete(DeleteView):
 
     def get_success_url(self):
         return reverse_lazy('contact_list')
+
+
+class PortfolioImport(FormView):
+    form_class = PortfolioImportForm
+    template_name = 'core/portfolio_import.html'
+    # Changes listed on the page; the counts cover every row.
+    max_changes = 500
+
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        read = READERS[detect_format(upload.name)]
+        try:
+            report = PortfolioImporter().run(read(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')), dry_run=form.cleaned_data['dry_run'])
+        except ValueError as error:
+            form.add_error('file', str(error))
+            return self.form_invalid(form)
+        return self.render_to_response(self.get_context_data(
+            form=form,
+            report=report,
+            changes=report.changes[:self.max_changes],
+            hidden_changes=max(0, len(report.changes) - self.max_changes),
+        ))
+
+
+class PortfolioExport(View):
+    format = 'csv'
+
+    def get(self, request, *args, **kwargs):
+        # Rows are produced while the response is sent, so memory does not
+        # grow with the portfolio and the header goes out immediately.
+        lines, content_type = FORMATS[self.format]
+        response = StreamingHttpResponse(buffered(lines(export_rows())), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="portfolio.{self.format}"'
+        return response
+
+
+class ApiView(View):
+    # Read-only JSON for the types of core.api; as_view(model=...) picks one.
+    model = None
+
+    def dispatch(self, request, *args, **kwargs):
+        # Invalid parameters are reported as soon as they are parsed, which
+        # for ApiList may be by the conditional GET validators.
+        try:
+            self.query = ApiQuery(RESOURCES_BY_MODEL[self.model], request.GET)
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return json_response({'errors': [str(error)]}, status=400)
+
+    def get(self, request, *args, **kwargs):
+        try:
+            return json_response(self.get_data())
+        except self.model.DoesNotExist:
+            return json_response({'errors': ['not found']}, status=404)
+
+
+class ApiList(ConditionalGetMixin, ApiView):
+    paginate_by = 100
+    max_paginate_by = 500
+
+    def get_validator_sources(self):
+        # The row past the page only tells whether there is a next one.
+        queryset, size = self.query.page_queryset(self.request.GET, self.paginate_by, self.max_paginate_by)
+        rows = self.model._default_manager.filter(pk__in=queryset.values('pk')[:size])
+        return [self.model._default_manager.filter(pk__in=queryset.values('pk')[:size + 1]), *self.query.validator_sources(rows)]
+
+    def get_data(self):
+        rows, next_url = self.query.page(self.request.GET, self.request.path, self.paginate_by, self.max_paginate_by)
+        serialize = self.query.serializer()
+        return {'data': [serialize(row) for row in rows], 'next': next_url}
+
+
+class ApiDetail(ConditionalGetMixin, ApiView):
+    def get_validator_sources(self):
+        return self.query.validator_sources(self.model._default_manager.filter(pk=self.kwargs['pk']))
+
+    def get_data(self):
+        return {'data': self.query.serializer()(self.query.queryset().get(pk=self.kwargs['pk']))}
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ApiNestedQuery(View):
+    # Runs a core.loaders query document, sent as the POST body or as ?q=.
+    # It only reads, so it needs no CSRF token.
+    def get(self, request, *args, **kwargs):
+        return self.run(request.GET.get('q', ''))
+
+    def post(self, request, *args, **kwargs):
+        return self.run(request.body)
+
+    def run(self, document):
+        try:
+            return json_response({'data': NestedQuery.from_json(document).run()})
+        except ApiError as error:
+            return json_response({'errors': [str(error)]}, status=400)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ApiBatch(View):
+    # Applies a core.batch list of write operations. Callers authenticate
+    # with a bearer token from settings.API_TOKENS instead of a session, so
+    # it needs no CSRF token.
+    def post(self, request, *args, **kwargs):
+        if not authenticate(request.headers.get('Authorization', '')):
+            response = json_response({'errors': ['a valid API token is required']}, status=401)
+            response['WWW-Authenticate'] = 'Bearer'
+            return response
+        try:
+            batch = Batch.from_json(request.body)
+        except ApiError as error:
+            return json_response({'errors': [str(error)]}, status=400)
+        if not batch.run():
+            return json_response({'errors': [f'{batch.errors} operations have errors, nothing was written'], 'results': batch.results}, status=400)
+        return json_response({'results': batch.results})
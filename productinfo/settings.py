@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "crispy_forms",
     "crispy_bootstrap5",
     "customauth.apps.CustomauthConfig",
@@ -53,6 +54,8 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 AUTH_USER_MODEL = "customauth.CustomUser"
 
 MIDDLEWARE = [
+    "core.middleware.ServerTimingMiddleware",
+    "core.middleware.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -62,6 +65,31 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Emit a Server-Timing header with the view, render, middleware and database
+# time of every request, e.g. SERVER_TIMING=1 in .env.
+SERVER_TIMING = os.getenv("SERVER_TIMING") == "1"
+
+# Identifies the deployed code, e.g. RELEASE=2026.10.2 or the commit hash in
+# .env. It is part of every ETag, so pages and API responses cached by
+# clients are not revalidated across a deploy that changes them.
+RELEASE = os.getenv("RELEASE", "")
+
+# Bearer tokens accepted by the batch write API, comma separated, e.g.
+# API_TOKENS=ci-token-1,ci-token-2 in .env.
+API_TOKENS = [token for token in os.getenv("API_TOKENS", "").split(",") if token]
+
+# Maximum number of SQL queries per request, by URL name. Requests going over
+# budget are logged by core.middleware.QueryBudgetMiddleware together with
+# their most repeated statements.
+QUERY_BUDGET_DEFAULT = 30
+QUERY_BUDGETS = {
+    "component_detail": 15,
+    "campaign_detail": 12,
+    "component_standard_compliance": 8,
+    "standard_detail": 5,
+    "feature_list": 5,
+}
+
 ROOT_URLCONF = "productinfo.urls"
 
 TEMPLATES = [
@@ -96,6 +124,31 @@ DATABASES = {
 	}
 }
 
+# Cached template fragments are invalidated in the cache of the process
+# saving the change, so a deployment running several worker processes needs
+# a cache they share: set REDIS_URL, e.g. REDIS_URL=redis://cache:6379/1 in
+# .env, and install redis from requirements.txt. Without it each process
+# keeps a local memory cache, which is only right for a single process such
+# as runserver.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Lifetime in seconds of the cached feature and activity tables of the
+# component and campaign pages. They are invalidated by model signals, the
+# timeout only bounds how long stale versions linger in the cache.
+FRAGMENT_CACHE_TIMEOUT = 86400
+
 
 
 # Password validation
@@ -139,3 +192,10 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'core/static/core'),]
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# The status grid editor posts ten fields per activity of a campaign (its id,
+# the time it was loaded and four values with their initial copies) and four
+# per feature (its id, the time it was loaded and the status with its initial
+# copy), plus the management forms. Django's default of 1000 is exceeded from
+# 100 activities; this allows 2000 activities and 1000 features.
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 2000 * 10 + 1000 * 4 + 100